@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Benchmark for the time it takes to import jsonvectorizer
+
+Imports the package in fresh interpreters, and reports the median import
+time. Exits with an error if modules that should only be imported on
+demand (e.g., scikit-learn) are imported by ``import jsonvectorizer``,
+or if the median import time exceeds the provided limit.
+
+Usage: python benchmarks/import_time.py [-n REPEAT] [--max-time SECONDS]
+
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+# Modules that must not be imported eagerly
+LAZY_MODULES = ['dateutil', 'sklearn']
+
+SCRIPT = '''
+import json, sys, time
+start = time.time()
+import jsonvectorizer
+elapsed = time.time() - start
+print(json.dumps([elapsed, [m for m in {} if m in sys.modules]]))
+'''.format(LAZY_MODULES)
+
+
+def measure():
+    # Import the package in a fresh interpreter
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT])
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '-n', '--repeat', type=int, default=5,
+        help='number of fresh interpreters (default: 5)'
+    )
+    parser.add_argument(
+        '--max-time', type=float, default=None,
+        help='maximum median import time in seconds'
+    )
+    args = parser.parse_args()
+
+    times = []
+    for _ in range(args.repeat):
+        elapsed, imported = measure()
+        if imported:
+            sys.exit(
+                'import jsonvectorizer eagerly imports: {}'
+                .format(', '.join(imported))
+            )
+
+        times.append(elapsed)
+
+    median = sorted(times)[len(times) // 2]
+    print('import jsonvectorizer: {:.3f}s (median of {})'.format(
+        median, args.repeat
+    ))
+    if args.max_time is not None and median > args.max_time:
+        sys.exit('import time exceeds {:.3f}s'.format(args.max_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,35 @@
 """Tools for extracting vector representations of JSON documents"""
 
-__all__ = ['Schema', 'JsonVectorizer', 'vectorizers', 'utils']
+import importlib
+import sys
+
+__all__ = [
+    'Schema', 'JsonVectorizer', 'FeatureSelection', 'sketches', 'vectorizers',
+    'utils'
+]
 __version__ = '0.1.0'
 
-from . import vectorizers, utils
+from . import sketches, utils
 from .schema import Schema
-from .jsonvectorizer import JsonVectorizer
+from .jsonvectorizer import FeatureSelection, JsonVectorizer
+
+
+def __getattr__(name):
+    # Lazily import the vectorizers subpackage (PEP 562), which depends
+    # on scikit-learn (slow to import) and is not needed for loading
+    # saved vectorizers
+    if name == 'vectorizers':
+        return importlib.import_module('.vectorizers', __name__)
+
+    raise AttributeError(
+        'module {!r} has no attribute {!r}'.format(__name__, name)
+    )
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if sys.version_info < (3, 7):
+    # Module-level __getattr__ is not supported
+    from . import vectorizers
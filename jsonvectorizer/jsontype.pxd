@@ -1,6 +1,10 @@
 # Supported types for JSON documents
 cdef enum JsonType: OBJECT, ARRAY, JNULL, BOOLEAN, INTEGER, NUMBER, STRING, TIMESTAMP
 
+cdef bint maybe_timestamp(str doc)
+
+cdef bint is_timestamp(str doc) except -1
+
 cdef JsonType typeof(object doc) except? JNULL
 
 cdef JsonType str2type(str json_type) except? JNULL
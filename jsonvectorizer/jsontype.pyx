@@ -5,6 +5,63 @@ import sys
 # Python version (for handling unicode strings)
 cdef int VERSION = sys.version_info.major
 
+# Format of strings that are recognized as timestamps
+cdef str TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+cdef inline bint isdigit(Py_UCS4 c):
+	# Determine whether a character is an ASCII digit
+	return c >= u'0' and c <= u'9'
+
+
+cdef bint maybe_timestamp(str doc):
+	# Cheap necessary condition for matching TIMESTAMP_FORMAT, i.e., a
+	# four-digit year followed by a dash, and a trailing 'Z' (strptime
+	# ignores case, and allows 15 to 20 characters for this format)
+	cdef Py_ssize_t n = len(doc)
+	if n < 15 or n > 20:
+		return False
+	if doc[4] != u'-' or (doc[n - 1] != u'Z' and doc[n - 1] != u'z'):
+		return False
+
+	return (
+		doc[0].isdecimal() and doc[1].isdecimal() and
+		doc[2].isdecimal() and doc[3].isdecimal()
+	)
+
+
+cdef bint is_timestamp(str doc) except -1:
+	# Determine whether a string matches TIMESTAMP_FORMAT
+	cdef Py_ssize_t i
+	if not maybe_timestamp(doc):
+		return False
+
+	# Parse the canonical layout (e.g., '2017-01-01T00:00:00Z') directly
+	if (
+		len(doc) == 20 and doc[7] == u'-' and doc[10] == u'T' and
+		doc[13] == u':' and doc[16] == u':' and doc[19] == u'Z'
+	):
+		for i in (0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18):
+			if not isdigit(doc[i]):
+				break
+		else:
+			try:
+				datetime.datetime(
+					int(doc[0:4]), int(doc[5:7]), int(doc[8:10]),
+					int(doc[11:13]), int(doc[14:16]), int(doc[17:19])
+				)
+				return True
+			except ValueError:
+				return False
+
+	# Fall back to strptime for other layouts (e.g., '2017-1-1T0:0:0Z')
+	try:
+		datetime.datetime.strptime(doc, TIMESTAMP_FORMAT)
+		return True
+	except (ValueError,TypeError):
+		return False
+
+
 cdef JsonType typeof(object doc) except? JNULL:
 	# Find the type of the provided JSON document
 	if doc is None:
@@ -22,10 +79,9 @@ cdef JsonType typeof(object doc) except? JNULL:
 	elif json_type is float:
 		return NUMBER
 	elif json_type is str:
-		try:
-			datetime.datetime.strptime(doc, "%Y-%m-%dT%H:%M:%SZ")
+		if is_timestamp(doc):
 			return TIMESTAMP
-		except (ValueError,TypeError):
+		else:
 			return STRING
 	elif VERSION == 2 and json_type is unicode:
 		return STRING
@@ -2,40 +2,108 @@ cimport cython
 cimport numpy as np
 
 import copy
+import pickle
+import multiprocessing
 import numpy as np
-import re
+import random
 import scipy.sparse as sp
+import sys
+import time
 
 from .jsontype cimport *
-from .lil cimport *
+from .matrix cimport MatrixBuilder, check_format, get_builder
+from .plan cimport PlanNode, TransformPlan, ValueCache, transform_value
+from .rules cimport PatternMatcher, VectorizerRules
 from .schema cimport Schema
+from . import serialization
+from .sketches import FrequencySketch, QuantileSketch
+from .utils import _parallel, _validation
+from .utils._timestamps import parse_timestamp
+from .utils.io import read_docs
 
 
-cdef tuple get_vectorizer(dict[:] vectorizers, JsonType json_type, str path):
-    # Return the first matching vectorizer from the provided list
-    for d in vectorizers:
-        if 'type' in d:
-            if isinstance(d['type'], str):
-                if type2str(json_type) != d['type']:
-                    continue
-            else:
-                if type2str(json_type) not in d['type']:
-                    continue
-        if 'pattern' in d and not re.search(d['pattern'], path):
-            continue
+# Default number of documents per chunk for chunked transforms
+DEFAULT_CHUNK_SIZE = 10000
+
+# Maximum number of documents transformed one by one, rather than with
+# a compiled plan that calls each vectorizer once per batch
+SMALL_BATCH_SIZE = 32
+
+# Fitted vectorizer in worker processes for parallel transforms
+_worker_vectorizer = None
+
+
+def _init_worker(vectorizer):
+    # Store the fitted vectorizer once in each worker process
+    global _worker_vectorizer
+    _worker_vectorizer = vectorizer
+
+
+def _transform_chunk(args):
+    # Transform a chunk of documents in a worker process
+    docs, format = args
+    return _worker_vectorizer.transform(docs, format=format)
+
+
+def _fit_vectorizer(args):
+    # Fit a vectorizer for a single node and data type, possibly in a
+    # worker process, and return it along with the elapsed time
+    Vectorizer, args_, kwargs_, values, n_total, path = args
+    start = time.perf_counter()
+    vectorizer = Vectorizer(*args_, **kwargs_).fit(
+        values, n_total=n_total, path=path
+    )
+    return vectorizer, time.perf_counter() - start
+
 
-        return d['vectorizer'], d.get('args', []), d.get('kwargs', {})
+def _sizeof(values):
+    # Approximate memory usage of collected values (or a sketch)
+    if isinstance(values, list):
+        return sys.getsizeof(values) + sum(map(sys.getsizeof, values))
 
-    return None
+    return len(pickle.dumps(values, pickle.HIGHEST_PROTOCOL))
 
 
-cdef int hasmatch(str s, str[:] patterns) except -1:
-    # Determine whether a string matches any of the given regex patterns
-    for pattern in patterns:
-        if re.search(pattern, s):
-            return 1
+def _transform_file(args):
+    # Read, parse, and transform a file in a worker process
+    filename, parser, format, chunk_size = args
+    return _worker_vectorizer.transform(
+        read_docs(filename, parser), format=format, chunk_size=chunk_size
+    )
 
-    return 0
+
+cdef list merge_samples(
+    list values, long count, list other_values, long other_count,
+    object max_samples
+):
+    # Merge two uniform samples of values, drawn from count and
+    # other_count values respectively, into a sample of at most
+    # max_samples values
+    cdef long n, n_samples
+    if max_samples is None or len(values) + len(other_values) <= max_samples:
+        return values + other_values
+
+    # The number of samples drawn from each list follows a
+    # hypergeometric distribution, limited by the number of available
+    # values (only using the random module, so a single seed applies)
+    n_samples = min(max_samples, count + other_count)
+    n = sum(
+        1 for i in random.sample(range(count + other_count), n_samples)
+        if i < count
+    )
+    n = min(max(n, max_samples - len(other_values)), len(values))
+    return (
+        random.sample(values, n) +
+        random.sample(other_values, max_samples - n)
+    )
+
+
+cdef int n_vectorizer_features(object vectorizer) except -1:
+    # Number of features generated by a fitted vectorizer
+    if hasattr(vectorizer, 'feature_names_'):
+        return len(vectorizer.feature_names_)
+    else:
+        return len(vectorizer.feature_names)
 
 
 cdef class JsonVectorizer(Schema):
@@ -51,15 +119,78 @@ cdef class JsonVectorizer(Schema):
         If True, JSON arrays are regarded as tuples with different
         schemas for each index, otherwise it is assumed that all items
         conform to the same schema.
+    type_cache_size : int, optional (default=0)
+        Maximum number of timestamp-like strings for which each node
+        memoizes the detected type (timestamp or string). Useful when
+        the same timestamps are repeated across many documents. If 0,
+        types are not memoized.
+    max_properties : int, optional (default=0)
+        If positive, JSON objects with more than this many distinct
+        properties are regarded as maps with dynamic keys (e.g., IDs or
+        IP addresses), and all their values are collapsed into a single
+        child node, instead of a child node for each property. If 0,
+        objects are never regarded as maps.
+    map_keys : bool, optional (default=False)
+        If True, keys of maps are also collected in a child node, which
+        can be vectorized like any node containing strings.
+    max_samples : int or None, optional (default=None)
+        Maximum number of sample values collected for each data type in
+        each node. When more values are observed, a uniform random
+        sample (reservoir) of this size is retained, while `counts`
+        remain exact. Vectorizers are then fitted to the sample, so
+        proportional (float) thresholds of vectorizers, e.g., `min_df`
+        or `min_f`, keep their meaning, but integer thresholds apply to
+        the number of sampled values. If None, all values are collected.
+    quantile_sketch : int or None, optional (default=None)
+        If provided, numbers and timestamps are not collected, but are
+        summarized in each node using a mergeable quantile sketch of
+        this size (see :class:`jsonvectorizer.sketches.QuantileSketch`)
+        to bound memory usage. Only vectorizers that support sketches,
+        i.e., :class:`NumberVectorizer` and :class:`TimestampVectorizer`
+        can then be used for these data types.
+    frequency_sketch : dict or None, optional (default=None)
+        If provided, strings are not collected, but are summarized in
+        each node using a mergeable sketch of frequent categories and
+        tokens, initialized with these keyword arguments (see
+        :class:`jsonvectorizer.sketches.FrequencySketch`). Only
+        :class:`StringVectorizer` can then be used for strings.
+    transform_cache_size : int, optional (default=0)
+        Maximum number of distinct strings and timestamps for which
+        each node memoizes the indices of features generated by its
+        vectorizer, evicting the least recently used ones. Within each
+        batch of documents, repeated values are also only passed to
+        vectorizers once. Useful for fields with heavily repeated values
+        (e.g., status codes, countries, or user agents), since
+        tokenizing strings and parsing timestamps is relatively
+        expensive. If 0, values are not memoized.
 
     Attributes
     ----------
     path : tuple of str
         Path from the top-most node (including the root) to this node.
+    path_str : str
+        Node names in `path`, separated by colons, e.g., 'root:foo'.
     tuple_items : bool
         If True, JSON arrays are regarded as tuples with different
         schemas for each index, otherwise it is assumed that all items
         conform to the same schema.
+    type_cache_size : int
+        Maximum number of memoized types for timestamp-like strings.
+    max_properties : int
+        Maximum number of distinct properties for JSON objects before
+        they are regarded as maps.
+    map_keys : bool
+        If True, keys of maps are collected in a child node.
+    max_samples : int or None
+        Maximum number of sample values collected for each data type in
+        each node.
+    quantile_sketch : int or None
+        Size of quantile sketches for summarizing numbers and timestamps.
+    frequency_sketch : dict or None
+        Keyword arguments for sketches summarizing strings.
+    transform_cache_size : int
+        Maximum number of memoized strings and timestamps for
+        transforming documents.
     type : set
         Valid data types for documents conforming to the current schema.
     required : set of str
@@ -71,6 +202,16 @@ cdef class JsonVectorizer(Schema):
     items : list
         :class:`JsonVectorizer` instances corresponding to different
         items in JSON arrays.
+    additional_properties : :class:`JsonVectorizer` or None
+        If JSON objects are regarded as maps, instance corresponding to
+        all their values (with path ending in '<value>'), otherwise
+        None.
+    property_names : :class:`JsonVectorizer` or None
+        If JSON objects are regarded as maps and `map_keys` is True,
+        instance corresponding to all their keys (with path ending in
+        '<key>'), otherwise None.
+    n_features : int
+        Number of features extracted from this node and its children.
     feature_names_ : list of str
         Array mapping from feature integer indices to feature names.
 
@@ -81,26 +222,133 @@ cdef class JsonVectorizer(Schema):
         int pos
         list feature_names
 
+        # Flat list of feature names for a subtree containing this node,
+        # starting from the feature at index shared_offset, and mapping
+        # from feature names to indices for this node's features
+        list shared_feature_names
+        int shared_offset
+        dict feature_indices
+
+        # Feature offsets for transforming single documents, i.e.,
+        # mappings from data types to the offsets of the type feature (-1
+        # if none) and the vectorizer's features, and from optional
+        # properties to their features
+        dict type_offsets
+        dict property_offsets
+
+        # Compiled plan for transforming batches of documents, and
+        # caches of transformed values for each data type
+        TransformPlan plan
+        dict transform_caches
+
+        # When features are appended by partial_fit, mapping from the
+        # layout of features in the tree to columns (shared by all
+        # nodes), and names of all columns (only for the node that was
+        # fitted), otherwise None
+        list columns
+        list column_names
+
+        # Number of values of each data type observed since the last
+        # fit, from which collected values are sampled
+        dict sample_counts
+
+        # True if restored by load, i.e., with frozen vectorizers and
+        # without counts or collected values
+        bint frozen
+
     cdef readonly:
         dict counts, values
         int n_features
+        object max_samples, quantile_sketch, frequency_sketch
+        long transform_cache_size
 
     def __cinit__(self, *args, **kwargs):
         self.counts = {}
+        self.sample_counts = {}
         self.values = {}
         self.vectorizers = {}
         self.feature_names = []
 
+    def __init__(
+        self, dict schema={}, tuple path=('root',), bint tuple_items=False,
+        int type_cache_size=0, int max_properties=0, bint map_keys=False,
+        max_samples=None, quantile_sketch=None, frequency_sketch=None,
+        long transform_cache_size=0
+    ):
+        schema = dict(schema)
+        schema['max_samples'] = schema.get('max_samples', max_samples)
+        schema['quantile_sketch'] = schema.get(
+            'quantile_sketch', quantile_sketch
+        )
+        schema['frequency_sketch'] = schema.get(
+            'frequency_sketch', frequency_sketch
+        )
+        schema['transform_cache_size'] = schema.get(
+            'transform_cache_size', transform_cache_size
+        )
+        Schema.__init__(
+            self, schema=schema, path=path, tuple_items=tuple_items,
+            type_cache_size=type_cache_size, max_properties=max_properties,
+            map_keys=map_keys
+        )
+
     @property
     def feature_names_(self):
         # Names of extracted features
-        feature_names = copy.copy(self.feature_names)
+        cdef int start = self.pos - self.shared_offset
+        if self.column_names is not None:
+            return list(self.column_names)
+
+        feature_names = self.get_feature_names()
+        return feature_names[start:start + self.n_features]
+
+    cdef dict get_options(self):
+        # Keyword arguments for initializing nodes with the same options
+        options = Schema.get_options(self)
+        options['max_samples'] = self.max_samples
+        options['quantile_sketch'] = self.quantile_sketch
+        options['frequency_sketch'] = self.frequency_sketch
+        options['transform_cache_size'] = self.transform_cache_size
+        return options
+
+    cdef list get_feature_names(self):
+        # Return the flat list of feature names, building it if necessary
+        cdef list feature_names
+        if self.shared_feature_names is None:
+            feature_names = []
+            self._collect_feature_names(feature_names)
+            self._share_feature_names(feature_names, self.pos)
+
+        return self.shared_feature_names
+
+    cdef int _collect_feature_names(self, list feature_names) except -1:
+        # Recursively append feature names of this node and its children
+        feature_names.extend(self.feature_names)
         for name in sorted(self.properties):
-            feature_names.extend(self.get_property(name).feature_names_)
+            self.get_property(name)._collect_feature_names(feature_names)
         for i in range(len(self.items)):
-            feature_names.extend(self.get_item(i).feature_names_)
+            self.get_item(i)._collect_feature_names(feature_names)
+        for node in (self.additional_properties, self.property_names):
+            if node is not None:
+                (<JsonVectorizer>node)._collect_feature_names(feature_names)
 
-        return feature_names
+        return 0
+
+    cdef int _share_feature_names(self, list feature_names, int offset) except -1:
+        # Recursively share a flat list of feature names with children
+        self.shared_feature_names = feature_names
+        self.shared_offset = offset
+        for name in self.properties:
+            self.get_property(name)._share_feature_names(feature_names, offset)
+        for i in range(len(self.items)):
+            self.get_item(i)._share_feature_names(feature_names, offset)
+        for node in (self.additional_properties, self.property_names):
+            if node is not None:
+                (<JsonVectorizer>node)._share_feature_names(
+                    feature_names, offset
+                )
+
+        return 0
 
     cdef JsonVectorizer get_property(self, str name):
         # Retrieve a child property and cast it to the correct type
@@ -110,13 +358,72 @@ cdef class JsonVectorizer(Schema):
         # Retrieve a child item and cast it to the correct type
         return <JsonVectorizer>self.items[index]
 
+    cdef long n_docs(self) except -1:
+        # Number of documents seen by this node
+        return sum(self.counts.values())
+
+    cdef dict new_stats(self):
+        # Return zeroed profiling counters
+        stats = Schema.new_stats(self)
+        stats.update(
+            fit_time=0.0, transform_docs=0, transform_time=0.0, nnz=0
+        )
+        return stats
+
+    cdef int check_extendable(self) except -1:
+        # Loaded vectorizers only support transforming documents
+        if self.frozen:
+            raise ValueError(
+                'vectorizers restored with load can not be extended or '
+                'fitted'
+            )
+
+        return 0
+
+    cdef dict get_stats(self):
+        # Return a record of profiling counters for this node, including
+        # the memory used by collected values
+        record = Schema.get_stats(self)
+        record['values_bytes'] = sum(map(_sizeof, self.values.values()))
+        return record
+
     cdef int from_dict(self, dict schema) except -1:
-        # Restore current object from a dictionary
+        # Restore current object from a dictionary (options are set
+        # first, since children are created with the same options)
+        if schema['max_samples'] is not None:
+            _validation.check_positive_int(
+                schema['max_samples'], alias='max_samples'
+            )
+        self.max_samples = schema['max_samples']
+        if schema['quantile_sketch'] is not None:
+            _validation.check_positive_int(
+                schema['quantile_sketch'], alias='quantile_sketch'
+            )
+        self.quantile_sketch = schema['quantile_sketch']
+        if schema['frequency_sketch'] is not None:
+            # Validate arguments (which does not build an analyzer)
+            FrequencySketch(**schema['frequency_sketch'])
+        self.frequency_sketch = schema['frequency_sketch']
+        if schema['transform_cache_size'] < 0:
+            raise ValueError('transform_cache_size must be non-negative')
+        self.transform_cache_size = schema['transform_cache_size']
+        self.frozen = schema.get('frozen', False)
         Schema.from_dict(self, schema)
         if 'counts' in schema:
             self.counts = {str2type(k): v for k, v in schema['counts'].items()}
         if 'values' in schema:
-            self.values = {str2type(k): v for k, v in schema['values'].items()}
+            self.values = {
+                str2type(k): list(v) if isinstance(v, list) else copy.deepcopy(v)
+                for k, v in schema['values'].items()
+            }
+        if 'sample_counts' in schema:
+            self.sample_counts = {
+                str2type(k): v for k, v in schema['sample_counts'].items()
+            }
+        elif 'values' in schema:
+            # Older schemas do not record sample counts, and collected
+            # values then cover all observations
+            self.sample_counts = dict(self.counts)
         if 'pos' in schema:
             self.pos = schema['pos']
         if 'vectorizers' in schema:
@@ -127,16 +434,33 @@ cdef class JsonVectorizer(Schema):
             self.feature_names = schema['feature_names']
         if 'n_features' in schema:
             self.n_features = schema['n_features']
+        if 'columns' in schema:
+            self.column_names = list(schema['column_names'])
+            self._share_columns(list(schema['columns']))
 
         return 0
 
     cdef dict to_dict(self):
         # Convert current object to a dictionary
         schema = Schema.to_dict(self)
+        if self.max_samples is not None:
+            schema['max_samples'] = self.max_samples
+        if self.quantile_sketch is not None:
+            schema['quantile_sketch'] = self.quantile_sketch
+        if self.frequency_sketch is not None:
+            schema['frequency_sketch'] = self.frequency_sketch
+        if self.transform_cache_size:
+            schema['transform_cache_size'] = self.transform_cache_size
+        if self.frozen:
+            schema['frozen'] = True
         if self.counts:
             schema['counts'] = {type2str(k): v for k, v in self.counts.items()}
         if self.values:
             schema['values'] = {type2str(k): v for k, v in self.values.items()}
+        if self.sample_counts:
+            schema['sample_counts'] = {
+                type2str(k): v for k, v in self.sample_counts.items()
+            }
         if self.pos is not None:
             schema['pos'] = self.pos
         if self.vectorizers:
@@ -147,18 +471,85 @@ cdef class JsonVectorizer(Schema):
             schema['feature_names'] = self.feature_names
         if self.n_features is not None:
             schema['n_features'] = self.n_features
+        if self.column_names is not None:
+            schema['columns'] = self.columns
+            schema['column_names'] = self.column_names
 
         return schema
 
     cdef int  _extend_self(self, object doc, JsonType json_type) except -1:
         # Extend this node from the provided document
+        cdef:
+            long count, i
+            list values
+
         Schema._extend_self(self, doc, json_type)
         self.counts[json_type] = self.counts.get(json_type, 0) + 1
-        if json_type != OBJECT and json_type != ARRAY and json_type != JNULL:
-            if json_type in self.values:
-                self.values[json_type].append(doc)
-            else:
+        count = self.sample_counts.get(json_type, 0) + 1
+        self.sample_counts[json_type] = count
+        if self.quantile_sketch is not None and (
+            json_type == NUMBER or json_type == TIMESTAMP
+        ):
+            if json_type not in self.values:
+                self.values[json_type] = QuantileSketch(self.quantile_sketch)
+            if json_type == TIMESTAMP:
+                doc = parse_timestamp(doc)
+
+            self.values[json_type].update(doc)
+        elif self.frequency_sketch is not None and json_type == STRING:
+            if json_type not in self.values:
+                self.values[json_type] = FrequencySketch(
+                    **self.frequency_sketch
+                )
+
+            self.values[json_type].update(doc)
+        elif json_type != OBJECT and json_type != ARRAY and json_type != JNULL:
+            if json_type not in self.values:
                 self.values[json_type] = [doc]
+                return 0
+
+            values = self.values[json_type]
+            if self.max_samples is None or len(values) < self.max_samples:
+                values.append(doc)
+            else:
+                # Reservoir sampling (Vitter's algorithm R)
+                i = random.randrange(count)
+                if i < len(values):
+                    values[i] = doc
+
+        return 0
+
+    cdef int _merge_self(self, Schema other) except -1:
+        # Merge another node into this node
+        cdef:
+            JsonVectorizer other_ = <JsonVectorizer>other
+            long count, other_count
+
+        Schema._merge_self(self, other)
+        for json_type, other_count in other_.counts.items():
+            self.counts[json_type] = self.counts.get(json_type, 0) + other_count
+
+        for json_type, other_count in other_.sample_counts.items():
+            count = self.sample_counts.get(json_type, 0)
+            if json_type in other_.values:
+                if not isinstance(other_.values[json_type], list):
+                    # Merge sketches
+                    if json_type in self.values:
+                        self.values[json_type].merge(other_.values[json_type])
+                    else:
+                        self.values[json_type] = copy.deepcopy(
+                            other_.values[json_type]
+                        )
+                elif json_type in self.values:
+                    self.values[json_type] = merge_samples(
+                        self.values[json_type], count,
+                        other_.values[json_type], other_count,
+                        self.max_samples
+                    )
+                else:
+                    self.values[json_type] = list(other_.values[json_type])
+
+            self.sample_counts[json_type] = count + other_count
 
         return 0
 
@@ -166,7 +557,7 @@ cdef class JsonVectorizer(Schema):
         # Prune this node
         cdef:
             JsonType json_type
-            str path = ':'.join(self.path)
+            str path = self.path_str
             list paths = []
 
         for json_type in sorted(self.type):
@@ -174,11 +565,14 @@ cdef class JsonVectorizer(Schema):
                 paths.append('{} -> {}'.format(path, type2str(json_type)))
                 self.type.remove(json_type)
                 del self.counts[json_type]
+                self.sample_counts.pop(json_type, None)
                 if json_type in self.values:
                     del self.values[json_type]
                 if json_type == OBJECT:
                     self.properties.clear()
                     self.required.clear()
+                    self.additional_properties = None
+                    self.property_names = None
                 elif json_type == ARRAY:
                     del self.items[:]
 
@@ -187,17 +581,17 @@ cdef class JsonVectorizer(Schema):
         else:
             return [path]
 
-    cdef list _prune(self, str[:] patterns, int min_f):
+    cdef list _prune(self, PatternMatcher patterns, int min_f):
         # Recursively prune this node and its children
         paths = self._prune_self(min_f)
         for name in sorted(self.properties):
             property_ = self.get_property(name)
-            path = ':'.join(property_.path)
-            drop = hasmatch(path, patterns)
+            path = property_.path_str
+            drop = patterns.search(path)
             if drop:
                 paths.append(path)
             else:
-                paths.extend(property_.prune(patterns=patterns, min_f=min_f))
+                paths.extend(property_._prune(patterns, min_f))
                 drop = not bool(property_.type)
             if drop:
                 del self.properties[name]
@@ -205,32 +599,108 @@ cdef class JsonVectorizer(Schema):
                     self.required.remove(name)
         for i in reversed(range(len(self.items))):
             item = self.get_item(i)
-            path = ':'.join(item.path)
-            drop = hasmatch(path, patterns)
-            if hasmatch(path, patterns):
+            path = item.path_str
+            drop = patterns.search(path)
+            if drop:
                 paths.append(path)
             else:
-                paths.extend(item.prune(patterns=patterns, min_f=min_f))
+                paths.extend(item._prune(patterns, min_f))
                 drop = not bool(item.type)
             if drop:
                 del self.items[i]
+        if self.additional_properties is not None:
+            self.additional_properties = self._prune_map_node(
+                <JsonVectorizer>self.additional_properties, patterns, min_f,
+                paths
+            )
+        if self.property_names is not None:
+            self.property_names = self._prune_map_node(
+                <JsonVectorizer>self.property_names, patterns, min_f, paths
+            )
 
         return paths
 
-    cdef int _fit_self(
-        self, int pos, double n_total,
-        dict[:] vectorizers, str[:] ignore_patterns
+    cdef JsonVectorizer _prune_map_node(
+        self, JsonVectorizer node, PatternMatcher patterns, int min_f,
+        list paths
+    ):
+        # Recursively prune a child node of a map, replacing it with an
+        # empty node if dropped, so that objects are still regarded as maps
+        path = node.path_str
+        if patterns.search(path):
+            paths.append(path)
+        else:
+            paths.extend(node._prune(patterns, min_f))
+            if node.type:
+                return node
+
+        return <JsonVectorizer>self.new_child({}, node.path)
+
+    cdef int _collect_fits(
+        self, double n_total, VectorizerRules vectorizers,
+        PatternMatcher ignore_patterns, list nodes, list tasks, bint partial
     ) except -1:
-        # Extract features from this node
+        # Recursively reset this node and its children before fitting,
+        # and collect a task for fitting each vectorizer (see
+        # _fit_vectorizer), with the corresponding (node, data type). If
+        # partial is True, existing vectorizers are kept, and only data
+        # types without a vectorizer are fitted
         cdef:
             JsonType json_type
-            str path = ':'.join(map(str, self.path))
-            dict vectorizers_ = {}
+            str path = self.path_str
+            dict sample_counts = self.sample_counts
+
+        if not partial:
+            self.vectorizers = {}
+        self.sample_counts = {}
+        self.columns = None
+        self.column_names = None
+        self.feature_names = []
+        self.shared_feature_names = None
+        self.feature_indices = None
+        self.type_offsets = None
+        self.plan = None
+        self.transform_caches = None
+        for json_type in sorted(self.type):
+            if json_type not in self.values:
+                continue
 
-        for json_type in self.type:
-            vectorizer = get_vectorizer(vectorizers, json_type, path)
-            if vectorizer is not None:
-                vectorizers_[json_type] = vectorizer
+            values = self.values.pop(json_type)
+            if json_type in self.vectorizers:
+                continue
+
+            vectorizer = vectorizers.get_vectorizer(json_type, path)
+            if vectorizer is not None and not ignore_patterns.search(path):
+                # Rescale the number of documents if values are sampled
+                # (integer thresholds of vectorizers apply to the sample)
+                Vectorizer, args_, kwargs_ = vectorizer
+                n_total_ = n_total * len(values) / sample_counts[json_type]
+                nodes.append((self, json_type))
+                tasks.append(
+                    (Vectorizer, args_, kwargs_, values, n_total_, self.path)
+                )
+
+        for name in sorted(self.properties):
+            self.get_property(name)._collect_fits(
+                n_total, vectorizers, ignore_patterns, nodes, tasks, partial
+            )
+        for i in range(len(self.items)):
+            self.get_item(i)._collect_fits(
+                n_total, vectorizers, ignore_patterns, nodes, tasks, partial
+            )
+        for node in (self.additional_properties, self.property_names):
+            if node is not None:
+                (<JsonVectorizer>node)._collect_fits(
+                    n_total, vectorizers, ignore_patterns, nodes, tasks, partial
+                )
+
+        return 0
+
+    cdef int _fit_self(self, int pos) except -1:
+        # Assign features of this node, once its vectorizers are fitted
+        cdef:
+            JsonType json_type
+            str path = self.path_str
 
         self.pos = pos
         for json_type in sorted(self.type):
@@ -244,144 +714,386 @@ cdef class JsonVectorizer(Schema):
                         self.feature_names.append(
                             '{} has property "{}"'.format(path, name)
                         )
-            if not hasmatch(path, ignore_patterns):
-                if json_type in vectorizers_ and json_type in self.values:
-                    Vectorizer, args_, kwargs_ = vectorizers_[json_type]
-                    vectorizer = Vectorizer(*args_, **kwargs_)
-                    vectorizer = vectorizer.fit(
-                        self.values[json_type], n_total=n_total, path=self.path
-                    )
-                    if vectorizer is not None:
-                        self.vectorizers[json_type] = vectorizer
-                        self.feature_names.extend([
-                            path + ' ' + fn for fn in vectorizer.feature_names_
-                        ])
-            if json_type in self.values:
-                del self.values[json_type]
+            if json_type in self.vectorizers:
+                self.feature_names.extend([
+                    path + ' ' + fn
+                    for fn in self.vectorizers[json_type].feature_names_
+                ])
 
         return pos + len(self.feature_names)
 
-    cdef int _fit(
-        self, int pos, double n_total,
-        dict[:] vectorizers, str[:] ignore_patterns
-    ) except -1:
-        # Recursively extract features from this node and its children
-        pos = self._fit_self(pos, n_total, vectorizers, ignore_patterns)
+    cdef int _fit(self, int pos) except -1:
+        # Recursively assign features of this node and its children
+        pos = self._fit_self(pos)
         for name in sorted(self.properties):
-            pos = self.get_property(name)._fit(
-                pos, n_total, vectorizers, ignore_patterns
-            )
+            pos = self.get_property(name)._fit(pos)
         for i in range(len(self.items)):
-            item = self.get_item(i)
-            pos = item._fit(pos, n_total, vectorizers, ignore_patterns)
+            pos = self.get_item(i)._fit(pos)
+        for node in (self.additional_properties, self.property_names):
+            if node is not None:
+                pos = (<JsonVectorizer>node)._fit(pos)
 
-        self.n_features = len(self.feature_names_)
+        self.n_features = pos - self.pos
         return pos
 
-    cdef int _transform_self(
-        self, list docs, list[:] X_rows, list[:] X_data,
-        np.ndarray[np.int32_t] indices,
-        dict indices_by_type, dict indices_by_property
+    cdef int _fit_all(
+        self, double n_total, VectorizerRules vectorizers,
+        PatternMatcher ignore_patterns, int n_jobs, bint partial
     ) except -1:
-        # Transform documents at this node
+        # Fit vectorizers of this node and its children, possibly in
+        # parallel, and assign features
+        cdef:
+            list nodes = [], tasks = [], fitted
+            JsonVectorizer node
+
+        self._collect_fits(
+            n_total, vectorizers, ignore_patterns, nodes, tasks, partial
+        )
+        if n_jobs == 1 or len(tasks) <= 1:
+            fitted = [_fit_vectorizer(task) for task in tasks]
+        else:
+            fitted = [None] * len(tasks)
+            order = sorted(
+                range(len(tasks)), key=lambda i: len(tasks[i][3]),
+                reverse=True
+            )
+            pool = multiprocessing.Pool(n_jobs)
+            try:
+                for i, result in zip(order, _parallel.imap(
+                    pool, _fit_vectorizer, (tasks[i] for i in order),
+                    2 * n_jobs
+                )):
+                    fitted[i] = result
+            finally:
+                pool.terminate()
+
+        for (node, json_type), (vectorizer, elapsed) in zip(nodes, fitted):
+            if vectorizer is not None:
+                node.vectorizers[json_type] = vectorizer
+            if node.stats is not None:
+                node.stats['fit_time'] += elapsed
+
+        self._fit(0)
+        return 0
+
+    cdef int _share_columns(self, list columns) except -1:
+        # Recursively share the mapping from features to columns with
+        # children
+        self.columns = columns
+        for name in self.properties:
+            self.get_property(name)._share_columns(columns)
+        for i in range(len(self.items)):
+            self.get_item(i)._share_columns(columns)
+        for node in (self.additional_properties, self.property_names):
+            if node is not None:
+                (<JsonVectorizer>node)._share_columns(columns)
+
+        return 0
+
+    cdef int compute_offsets(self) except -1:
+        # Compute feature offsets for transforming documents, with the
+        # same layout as _fit_self. Offsets are only published once
+        # complete, since other threads may be transforming documents
         cdef:
             JsonType json_type
             int pos = self.pos
+            int type_pos
+            dict type_offsets = {}, property_offsets = {}
 
         for json_type in sorted(self.type):
+            type_pos = -1
             if len(self.type) > 1:
-                if json_type in indices_by_type:
-                    indices_ = indices_by_type[json_type]
-                    lil_set_col(X_rows, X_data, indices[indices_], pos)
-
+                type_pos = pos
                 pos += 1
             if json_type == OBJECT:
                 for name in sorted(self.properties):
                     if name not in self.required:
-                        if name in indices_by_property:
-                            indices_ = indices_by_property[name]
-                            lil_set_col(X_rows, X_data, indices[indices_], pos)
-
+                        property_offsets[name] = pos
                         pos += 1
+
+            type_offsets[json_type] = (type_pos, pos)
             if json_type in self.vectorizers:
-                vectorizer = self.vectorizers[json_type]
-                if json_type in indices_by_type:
-                    indices_ = indices_by_type[json_type]
-                    docs_ = [docs[i] for i in indices_]
-                    rs, cs = vectorizer.transform(docs_).nonzero()
-                    if cs.dtype != np.int32:
-                        cs = cs.astype(np.int32)
-
-                    lil_set(X_rows, X_data, indices[indices_][rs], pos + cs)
-
-                if hasattr(vectorizer, 'feature_names_'):
-                    pos += len(vectorizer.feature_names_)
-                else:
-                    pos += len(vectorizer.feature_names)
+                pos += n_vectorizer_features(self.vectorizers[json_type])
+
+        if self.columns is not None:
+            # Features of each vectorizer remain contiguous in columns
+            for json_type, (type_pos, pos) in type_offsets.items():
+                type_offsets[json_type] = (
+                    self.columns[type_pos] if type_pos >= 0 else -1,
+                    self.columns[pos] if json_type in self.vectorizers else pos
+                )
+            for name, pos in property_offsets.items():
+                property_offsets[name] = self.columns[pos]
 
+        self.property_offsets = property_offsets
+        self.type_offsets = type_offsets
         return 0
 
-    cdef int _transform(
-        self, list docs, list[:] X_rows, list[:] X_data,
-        np.ndarray[np.int32_t] indices
-    ) except -1:
-        # Recursively transform documents at this node and its children
+    cdef ValueCache get_cache(self, JsonType json_type):
+        # Return the cache of transformed values for a data type, or
+        # None if values of this type are not memoized
+        if not self.transform_cache_size:
+            return None
+        if json_type != STRING and json_type != TIMESTAMP:
+            return None
+        if self.transform_caches is None:
+            self.transform_caches = {}
+        if json_type not in self.transform_caches:
+            self.transform_caches.setdefault(
+                json_type, ValueCache(self.transform_cache_size)
+            )
+
+        return self.transform_caches[json_type]
+
+    cdef int _collect_cache_info(self, list records) except -1:
+        # Recursively append cache counters of this node and its children
+        cdef ValueCache cache
+        if self.transform_caches is not None:
+            for json_type in sorted(self.transform_caches):
+                cache = self.transform_caches[json_type]
+                records.append(dict(
+                    path=self.path_str, type=type2str(json_type),
+                    hits=cache.hits, misses=cache.misses,
+                    size=len(cache.entries)
+                ))
+        for name in sorted(self.properties):
+            self.get_property(name)._collect_cache_info(records)
+        for i in range(len(self.items)):
+            self.get_item(i)._collect_cache_info(records)
+        for node in (self.additional_properties, self.property_names):
+            if node is not None:
+                (<JsonVectorizer>node)._collect_cache_info(records)
+
+        return 0
+
+    cdef PlanNode _compile(
+        self, TransformPlan plan, int flag_col, object remap=None
+    ):
+        # Recursively add this node and its children to a compiled plan.
+        # If remap is provided, it maps columns to those of a selection
+        # of features (-1 for dropped features), and vectorizers and
+        # children that generate no selected features are left out
         cdef:
-            int i, j
-            dict indices_by_type = {}
-            dict indices_by_property = {}
-            list indices_by_item = []
-
-        for i in range(len(docs)):
-            json_type = typeof(docs[i])
-            if json_type in self.type:
-                if json_type in indices_by_type:
-                    indices_by_type[json_type].append(i)
-                else:
-                    indices_by_type[json_type] = [i]
-
-        if OBJECT in indices_by_type:
-            for i in indices_by_type[OBJECT]:
-                for name in docs[i]:
-                    if name in self.properties:
-                        if name in indices_by_property:
-                            indices_by_property[name].append(i)
-                        else:
-                            indices_by_property[name] = [i]
-
-        if ARRAY in indices_by_type:
-            for i in indices_by_type[ARRAY]:
-                for j in range(len(docs[i])):
-                    if j * self.tuple_items < len(self.items):
-                        if j < len(indices_by_item):
-                            indices_by_item[j].append(i)
-                        else:
-                            indices_by_item.append([i])
-
-        self._transform_self(
-            docs, X_rows, X_data,
-            indices, indices_by_type, indices_by_property
-        )
-        if OBJECT in indices_by_type:
-            for name, indices_ in sorted(indices_by_property.items()):
-                docs_ = [docs[i][name] for i in indices_]
-                self.get_property(name)._transform(
-                    docs_, X_rows, X_data, indices[indices_]
+            PlanNode plan_node = plan.add_node(self, flag_col), child
+            int slot, n, n_items = 0
+
+        if self.type_offsets is None:
+            self.compute_offsets()
+
+        for json_type, (type_pos, pos) in self.type_offsets.items():
+            slot = -1
+            if json_type in self.vectorizers and remap is None:
+                slot = plan.add_vectorizer(
+                    self, self.vectorizers[json_type], pos,
+                    self.get_cache(json_type)
                 )
-        if ARRAY in indices_by_type:
-            for j, indices_ in enumerate(indices_by_item):
-                docs_ = [docs[i][j] for i in indices_]
-                if self.tuple_items:
-                    self.get_item(i)._transform(
-                        docs_, X_rows, X_data, indices[indices_]
+            elif json_type in self.vectorizers:
+                n = n_vectorizer_features(self.vectorizers[json_type])
+                index_map = remap[pos:pos + n]
+                if (index_map >= 0).any():
+                    slot = plan.add_vectorizer(
+                        self, self.vectorizers[json_type], pos,
+                        self.get_cache(json_type), index_map
                     )
-                else:
-                    self.get_item(0)._transform(
-                        docs_, X_rows, X_data, indices[indices_]
+            if remap is not None and type_pos >= 0:
+                type_pos = remap[type_pos]
+
+            plan_node.set_type(json_type, type_pos, slot)
+        for name in sorted(self.properties):
+            flag_col = self.property_offsets.get(name, -1)
+            if remap is not None and flag_col >= 0:
+                flag_col = remap[flag_col]
+
+            child = self.get_property(name)._compile(plan, flag_col, remap)
+            if remap is None or not child.is_empty():
+                plan_node.properties[name] = child
+        for i in range(len(self.items)):
+            child = self.get_item(i)._compile(plan, -1, remap)
+            plan_node.items.append(child)
+            if remap is None or not child.is_empty():
+                n_items = i + 1
+
+        # Items are matched by position, so only trailing ones are left out
+        del plan_node.items[n_items:]
+        for node in (self.additional_properties, self.property_names):
+            if node is None:
+                continue
+
+            child = (<JsonVectorizer>node)._compile(plan, -1, remap)
+            if remap is not None and child.is_empty():
+                continue
+            if node is self.additional_properties:
+                plan_node.map_values = child
+            else:
+                plan_node.map_keys = child
+
+        return plan_node
+
+    cdef int _transform_one(self, object doc, list cols) except -1:
+        # Recursively append the features of a single document to cols
+        cdef:
+            JsonType json_type = self.get_type(doc)
+            int type_pos, pos
+            Py_ssize_t j
+            ValueCache cache
+            double start = 0
+
+        if self.type_offsets is None:
+            self.compute_offsets()
+
+        if self.stats is not None:
+            self.stats['transform_docs'] += 1
+
+        offsets = self.type_offsets.get(json_type)
+        if offsets is None:
+            return 0
+
+        type_pos, pos = offsets
+        if type_pos >= 0:
+            cols.append(type_pos)
+        if json_type == OBJECT and self.additional_properties is not None:
+            values_ = <JsonVectorizer>self.additional_properties
+            for name, value in doc.items():
+                values_._transform_one(value, cols)
+                if self.property_names is not None:
+                    (<JsonVectorizer>self.property_names)._transform_one(
+                        name, cols
                     )
+        elif json_type == OBJECT:
+            for name, value in doc.items():
+                if name in self.properties:
+                    if name in self.property_offsets:
+                        cols.append(self.property_offsets[name])
+
+                    self.get_property(name)._transform_one(value, cols)
+        elif json_type == ARRAY:
+            if self.tuple_items:
+                for j in range(min(len(doc), len(self.items))):
+                    self.get_item(j)._transform_one(doc[j], cols)
+            elif self.items:
+                item = self.get_item(0)
+                for value in doc:
+                    item._transform_one(value, cols)
+        elif json_type in self.vectorizers:
+            if self.stats is not None:
+                start = time.perf_counter()
+
+            cache = self.get_cache(json_type)
+            if cache is not None:
+                indices = cache.transform_one(self.vectorizers[json_type], doc)
+            else:
+                indices = transform_value(self.vectorizers[json_type], doc)
+            for i in indices:
+                cols.append(pos + i)
+
+            if self.stats is not None:
+                self.stats['transform_time'] += time.perf_counter() - start
+                self.stats['nnz'] += len(indices)
 
         return 0
 
+    cdef object transform_rows(self, list docs):
+        # Transform documents one by one to a CSR matrix
+        cdef list cols, indices = [], indptr = [0]
+        for doc in docs:
+            cols = []
+            self._transform_one(doc, cols)
+            indices.extend(sorted(set(cols)))
+            indptr.append(len(indices))
+
+        return sp.csr_matrix(
+            (
+                np.ones(len(indices), dtype=bool),
+                np.array(indices, dtype=np.int32),
+                np.array(indptr, dtype=np.int32)
+            ),
+            shape=(len(docs), self.n_features)
+        )
+
+    cdef object transform_docs(self, list docs, str format):
+        # Transform a list of documents to a feature matrix
+        cdef:
+            MatrixBuilder builder
+            TransformPlan plan = self.plan
+
+        if 0 < len(docs) <= SMALL_BATCH_SIZE:
+            X = self.transform_rows(docs)
+            if format == 'packbits':
+                return np.packbits(X.toarray(), axis=1)
+
+            return X.asformat(format)
+
+        if plan is None:
+            # Only share the plan once compiled, since it may be used by
+            # other threads
+            plan = TransformPlan()
+            self._compile(plan, -1)
+            self.plan = plan
+
+        builder = get_builder(len(docs), self.n_features, format)
+        plan.transform(docs, builder)
+
+        return builder.tomatrix()
+
+    def feature_name(self, i):
+        """Return the name of a feature
+
+        Parameters
+        ----------
+        i : int
+            Index of the feature.
+
+        Returns
+        -------
+        feature_name : str
+            Name of the feature.
+
+        Raises
+        ------
+        IndexError
+            If `i` is not a valid feature index.
+
+        """
+        if not 0 <= i < self.n_features:
+            raise IndexError(
+                'feature index must be in [0, {}), not {}'
+                .format(self.n_features, i)
+            )
+
+        if self.column_names is not None:
+            return self.column_names[i]
+
+        return self.get_feature_names()[self.pos - self.shared_offset + i]
+
+    def feature_index(self, feature_name):
+        """Return the index of a feature
+
+        Parameters
+        ----------
+        feature_name : str
+            Name of the feature.
+
+        Returns
+        -------
+        i : int
+            Index of the feature.
+
+        Raises
+        ------
+        KeyError
+            If no feature has the provided name.
+
+        """
+        if self.feature_indices is None:
+            self.feature_indices = {}
+            for i, name in enumerate(self.feature_names_):
+                self.feature_indices.setdefault(name, i)
+
+        if feature_name not in self.feature_indices:
+            raise KeyError('{!r} is not a feature name'.format(feature_name))
+
+        return self.feature_indices[feature_name]
+
     def prune(self, patterns=[], min_f=1):
         """Prune the learned schema using the provided rules
 
@@ -406,13 +1118,12 @@ cdef class JsonVectorizer(Schema):
             type is removed.
 
         """
-        patterns = np.asarray(patterns, dtype=object)
         if isinstance(min_f, float):
             min_f = int(min_f * sum(self.counts.values()))
 
-        return self._prune(patterns, min_f)
+        return self._prune(PatternMatcher(patterns), min_f)
 
-    def fit(self, docs=[], vectorizers=[], ignore_patterns=[]):
+    def fit(self, docs=[], vectorizers=[], ignore_patterns=[], n_jobs=1):
         """Fit vectorizer to the provided data
 
         For each node, the first matching vectorizer is used to extract
@@ -445,41 +1156,630 @@ cdef class JsonVectorizer(Schema):
             List containing regular expressions. Node paths that match
             any of these patterns will be ignored. Node names in a path
             are separated by colons, e.g., 'foo:bar'.
+        n_jobs : int or None, optional (default=1)
+            Number of worker processes. If greater than one, vectorizers
+            of individual nodes are fitted in parallel, starting with
+            those that have the most values. The resulting features are
+            identical to fitting in a single process. If None, uses the
+            number of CPUs.
+
+        Returns
+        -------
+        self
+
+        Raises
+        ------
+        ValueError
+            If `n_jobs` is not a positive integer, or if the vectorizer
+            was restored with :meth:`load`.
+
+        """
+        n_jobs = _parallel.get_n_jobs(n_jobs)
+        self.check_extendable()
+        for doc in docs:
+            self._extend(doc)
+
+        self._fit_all(
+            sum(self.sample_counts.values()), VectorizerRules(vectorizers),
+            PatternMatcher(ignore_patterns), n_jobs, False
+        )
+        return self
+
+    def partial_fit(self, docs, vectorizers=[], ignore_patterns=[], n_jobs=1):
+        """Incrementally fit vectorizer to additional data
+
+        The schema is extended using the provided documents, and
+        vectorizers are fitted for new nodes and data types, using the
+        values observed since the last call to :meth:`fit` or
+        :meth:`partial_fit`. Existing vectorizers are not refitted, and
+        new features (e.g., for new properties, data types, or
+        vectorizers) are appended after existing ones, so that existing
+        feature indices remain valid. Features that can no longer be
+        generated (e.g., properties of objects that are later regarded
+        as maps) are retained, but are never set. If the vectorizer has
+        not been fitted, this is equivalent to :meth:`fit`.
+
+        Parameters
+        ----------
+        docs : iterable object
+            Iterable containing JSON documents.
+        vectorizers : list of dict, optional (default=[])
+            List of vectorizer definitions (see :meth:`fit`), which
+            should be the same as those used for fitting.
+        ignore_patterns : list of str, optional (default=[])
+            List of regular expressions for ignoring nodes (see
+            :meth:`fit`).
+        n_jobs : int or None, optional (default=1)
+            Number of worker processes for fitting vectorizers (see
+            :meth:`fit`).
 
         Returns
         -------
         self
 
+        Raises
+        ------
+        ValueError
+            If `n_jobs` is not a positive integer, or if the vectorizer
+            was restored with :meth:`load`.
+
         """
+        cdef:
+            list old_names = self.feature_names_, columns = []
+            dict cols = {}
+            int col
+
+        n_jobs = _parallel.get_n_jobs(n_jobs)
+        self.check_extendable()
         for doc in docs:
             self._extend(doc)
 
-        vectorizers = np.asarray(vectorizers, dtype=object)
-        ignore_patterns = np.asarray(ignore_patterns, dtype=object)
-        self._fit(0, sum(self.counts.values()), vectorizers, ignore_patterns)
+        self._fit_all(
+            sum(self.sample_counts.values()), VectorizerRules(vectorizers),
+            PatternMatcher(ignore_patterns), n_jobs, True
+        )
+
+        # Map features to their previous columns, and append new ones
+        for col, name in enumerate(old_names):
+            cols.setdefault(name, []).append(col)
+
+        column_names = list(old_names)
+        for name in self.get_feature_names():
+            if cols.get(name):
+                columns.append(cols[name].pop(0))
+            else:
+                columns.append(len(column_names))
+                column_names.append(name)
+
+        if column_names != self.get_feature_names():
+            self._share_columns(columns)
+            self.column_names = column_names
+            self.n_features = len(column_names)
 
         return self
 
-    def transform(self, docs):
+    def transform(self, docs, format='lil', n_jobs=1, chunk_size=None):
         """Transform JSON documents to feature matrix.
 
         Parameters
         ----------
         docs: iterable object
             Iterable containing JSON documents.
+        format : {'lil', 'csr', 'coo', 'packbits'}, optional (default='lil')
+            Format of the returned feature matrix. For 'csr' and 'coo',
+            nonzero entries are collected in flat buffers and the matrix
+            is built once at the end, which is considerably faster than
+            building a LIL matrix and converting it. For 'packbits',
+            returns a dense uint8 array with the features of each
+            document packed into bits, in the same layout as
+            :func:`numpy.packbits`, i.e., ``(n_features + 7) // 8``
+            bytes per document (see
+            :func:`jsonvectorizer.utils.unpackbits`).
+        n_jobs : int or None, optional (default=1)
+            Number of worker processes. If greater than one, chunks of
+            documents are transformed in parallel (see
+            :meth:`transform_iter`). If None, uses the number of CPUs.
+        chunk_size : int or None, optional (default=None)
+            Number of documents in each chunk. If None, all documents
+            are transformed at once when `n_jobs` is one, and chunks of
+            10000 documents are used otherwise.
+
+        Returns
+        -------
+        X: sparse matrix, [n_samples, n_features]
+            Feature matrix. If `format` is 'packbits', an ndarray of
+            uint8, [n_samples, (n_features + 7) // 8].
+
+        Raises
+        ------
+        ValueError
+            If `format` is not a supported matrix format, or if `n_jobs`
+            or `chunk_size` is not a positive integer.
+
+        """
+        check_format(format)
+        if n_jobs == 1 and chunk_size is None:
+            if not isinstance(docs, list):
+                docs = list(docs)
+
+            return self.transform_docs(docs, format)
+
+        if chunk_size is None:
+            chunk_size = DEFAULT_CHUNK_SIZE
+
+        Xs = list(self.transform_iter(
+            docs, chunk_size=chunk_size, n_jobs=n_jobs,
+            format='packbits' if format == 'packbits' else 'csr'
+        ))
+        if not Xs:
+            return self.transform_docs([], format)
+        elif format == 'packbits':
+            return np.vstack(Xs)
+
+        return sp.vstack(Xs, format=format)
+
+    def transform_files(
+        self, files, format='lil', parser=None, n_jobs=1,
+        chunk_size=DEFAULT_CHUNK_SIZE
+    ):
+        """Transform JSON documents stored in files to feature matrix
+
+        Each file must contain one JSON document per line, and may be
+        in any format supported by :func:`jsonvectorizer.utils.fopen`.
+        Documents are parsed and transformed in chunks, and rows of the
+        returned matrix follow the order of files and documents.
+
+        Parameters
+        ----------
+        files : str or list of str
+            Path(s) to input files.
+        format : {'lil', 'csr', 'coo', 'packbits'}, optional (default='lil')
+            Format of the returned feature matrix (see :meth:`transform`).
+        parser : str, callable, or None, optional (default=None)
+            JSON parser, i.e., 'json', 'orjson', 'ujson', or a function
+            for parsing a single line. If None, uses the fastest
+            installed parser (see :func:`jsonvectorizer.utils.get_parser`).
+        n_jobs : int or None, optional (default=1)
+            Number of worker processes. If greater than one, files are
+            sharded across workers, each of which reads, parses, and
+            transforms whole files. If None, uses the number of CPUs.
+        chunk_size : int, optional (default=10000)
+            Number of documents parsed and transformed at a time.
+
+        Returns
+        -------
+        X: sparse matrix, [n_samples, n_features]
+            Feature matrix. If `format` is 'packbits', an ndarray of
+            uint8, [n_samples, (n_features + 7) // 8].
+
+        Raises
+        ------
+        ValueError
+            If `format` or `parser` is not supported, or if `n_jobs` or
+            `chunk_size` is not a positive integer.
+
+        """
+        check_format(format)
+        _validation.check_positive_int(chunk_size, alias='chunk_size')
+        if isinstance(files, str):
+            files = [files]
+
+        n_jobs = _parallel.get_n_jobs(n_jobs)
+        if n_jobs == 1:
+            return self.transform(
+                read_docs(files, parser), format=format, chunk_size=chunk_size
+            )
+
+        pool = multiprocessing.Pool(
+            n_jobs, initializer=_init_worker, initargs=(self,)
+        )
+        try:
+            tasks = (
+                (
+                    filename, parser,
+                    'packbits' if format == 'packbits' else 'csr', chunk_size
+                )
+                for filename in files
+            )
+            Xs = list(_parallel.imap(pool, _transform_file, tasks, 2 * n_jobs))
+        finally:
+            pool.terminate()
+
+        if not Xs:
+            return self.transform_docs([], format)
+        elif format == 'packbits':
+            return np.vstack(Xs)
+
+        return sp.vstack(Xs, format=format)
+
+    def transform_one(self, doc, sparse=False):
+        """Transform a single JSON document
+
+        Low-latency alternative to :meth:`transform` for online use,
+        which walks the schema once for the provided document, without
+        the bookkeeping needed for transforming batches of documents.
+
+        Parameters
+        ----------
+        doc : object
+            JSON document.
+        sparse : bool, optional (default=False)
+            If True, returns a sparse CSR matrix with a single row,
+            otherwise returns the indices of nonzero features.
+
+        Returns
+        -------
+        indices : ndarray of int32
+            Sorted indices of nonzero features. Only returned if
+            `sparse` is False.
+        X : sparse CSR matrix, [1, n_features]
+            Feature matrix. Only returned if `sparse` is True.
+
+        """
+        cdef list cols = []
+        if sparse:
+            return self.transform_rows([doc])
+
+        self._transform_one(doc, cols)
+        return np.array(sorted(set(cols)), dtype=np.int32)
+
+    def cache_info(self):
+        """Return counters of caches for transforming documents
+
+        Only available when `transform_cache_size` is positive, for
+        nodes and data types whose values have been memoized. Counters
+        are reset when fitting the vectorizer, and are not shared with
+        worker processes.
+
+        Returns
+        -------
+        records : list of dict
+            Counters for each node and data type, containing the node's
+            path ('path'), the data type ('type'), the number of values
+            found in the cache ('hits'), the number of values passed to
+            the vectorizer ('misses'), and the number of cached values
+            ('size').
+
+        """
+        cdef list records = []
+        self._collect_cache_info(records)
+        return records
+
+    def profile(self):
+        """Return per-node profiling counters
+
+        Profiling must be enabled using :meth:`set_profiling`. Times
+        spent in vectorizers are summed over the data types of each
+        node.
+
+        Returns
+        -------
+        records : list of dict
+            Counters for each profiled node, in the same order as
+            features, which can be passed directly to
+            :class:`pandas.DataFrame`. Each record contains:
+
+            * **path** : Path of the node, e.g., 'root:foo'.
+            * **extend_docs** : Number of documents used for extending
+              the node.
+            * **extend_time** : Time spent extending the node and its
+              children, in seconds.
+            * **fit_time** : Time spent fitting the node's vectorizers.
+            * **transform_docs** : Number of documents visited by the
+              node when transforming.
+            * **transform_time** : Time spent in the node's vectorizers
+              when transforming.
+            * **nnz** : Number of nonzero features generated by the
+              node's vectorizers.
+            * **values_bytes** : Approximate memory used by values
+              currently collected for fitting.
+
+        """
+        return Schema.profile(self)
+
+    def select_features(self, features, compact=True):
+        """Select a subset of features for transforming documents
+
+        Returns a view of this vectorizer which only generates the
+        selected features, e.g., those used by a model after feature
+        selection. Nodes and vectorizers that generate none of the
+        selected features are skipped entirely when transforming
+        documents.
+
+        Parameters
+        ----------
+        features : iterable of int or str
+            Indices of features, or regular expressions matched against
+            feature names, e.g., '^root:foo[: ]' for all features of the
+            subtree rooted at 'root:foo'.
+        compact : bool, optional (default=True)
+            If True, selected features are renumbered consecutively, in
+            the same order as in this vectorizer. Otherwise, they keep
+            their indices, and other features are never set.
+
+        Returns
+        -------
+        selection : :class:`FeatureSelection`
+            View of this vectorizer for the selected features.
+
+        Raises
+        ------
+        IndexError
+            If a feature index is out of range.
+
+        """
+        cdef:
+            PatternMatcher patterns
+            set indices = set()
+
+        features = list(features)
+        patterns = PatternMatcher([f for f in features if isinstance(f, str)])
+        for i, name in enumerate(self.feature_names_):
+            if patterns.search(name):
+                indices.add(i)
+        for i in features:
+            if not isinstance(i, str):
+                indices.add(int(i))
+
+        return FeatureSelection(self, sorted(indices), compact=compact)
+
+    def transform_iter(
+        self, docs, chunk_size=DEFAULT_CHUNK_SIZE, n_jobs=1, format='csr'
+    ):
+        """Transform chunks of JSON documents to feature matrices
+
+        Documents are consumed lazily, and a feature matrix is yielded
+        for each chunk, in the same order as the documents. When using
+        multiple worker processes, the fitted vectorizer is sent to each
+        worker once, and each matrix is yielded as soon as it (and all
+        previous ones) are ready, while later chunks are still being
+        transformed. Together with :func:`jsonvectorizer.utils.fopen`
+        and :func:`jsonvectorizer.utils.save_shards`, this can be used
+        for transforming arbitrarily large data sets with a constant
+        memory footprint.
+
+        Parameters
+        ----------
+        docs: iterable object
+            Iterable containing JSON documents.
+        chunk_size : int, optional (default=10000)
+            Number of documents in each chunk.
+        n_jobs : int or None, optional (default=1)
+            Number of worker processes. If None, uses the number of
+            CPUs.
+        format : {'lil', 'csr', 'coo', 'packbits'}, optional (default='csr')
+            Format of the generated feature matrices (see
+            :meth:`transform`).
+
+        Yields
+        ------
+        X: sparse matrix, [chunk_size, n_features]
+            Feature matrix for a chunk of documents. The last matrix may
+            contain fewer rows.
+
+        Raises
+        ------
+        ValueError
+            If `format` is not a supported matrix format, or if `n_jobs`
+            or `chunk_size` is not a positive integer.
+
+        """
+        # Arguments are validated when called, rather than when the
+        # first matrix is requested
+        check_format(format)
+        n_jobs = _parallel.get_n_jobs(n_jobs)
+        _validation.check_positive_int(chunk_size, alias='chunk_size')
+        return self._transform_iter(
+            _parallel.iter_chunks(docs, chunk_size), n_jobs, format
+        )
+
+    def _transform_iter(self, chunks, int n_jobs, str format):
+        # Generator for transform_iter, with validated arguments
+        if n_jobs == 1:
+            for chunk in chunks:
+                yield self.transform_docs(chunk, format)
+
+            return
+
+        pool = multiprocessing.Pool(
+            n_jobs, initializer=_init_worker, initargs=(self,)
+        )
+        try:
+            tasks = ((chunk, format) for chunk in chunks)
+            for X in _parallel.imap(pool, _transform_chunk, tasks, 2 * n_jobs):
+                yield X
+        finally:
+            pool.terminate()
+
+    def save(self, path):
+        """Save the fitted vectorizer in a compact format
+
+        The node table, feature names, and the parameters of fitted
+        vectorizers (bin edges, categories, and vocabularies) are stored
+        as flat NumPy arrays in a directory, without pickling. Counts
+        and values collected for fitting are not stored. Only the
+        vectorizers in :mod:`jsonvectorizer.vectorizers` are supported,
+        and tokenization is limited to word analyzers without custom
+        preprocessors or tokenizers.
+
+        Parameters
+        ----------
+        path : str
+            Path to the output directory, which is created if it does
+            not exist.
+
+        Raises
+        ------
+        TypeError
+            If an unsupported vectorizer is used.
+        ValueError
+            If tokenization uses unsupported options.
+
+        """
+        serialization.save(self.to_dict(), self.path, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a vectorizer saved with :meth:`save`
+
+        Fitted vectorizers are restored from flat arrays without
+        importing scikit-learn (except for transforming strings with the
+        hashing trick), and only support transforming documents. The
+        returned object can not be extended or fitted again, and
+        attempting to do so raises ValueError.
+
+        Parameters
+        ----------
+        path : str
+            Path to a directory created by :meth:`save`.
+        mmap : bool, optional (default=True)
+            If True, arrays are memory-mapped read-only. Bin edges and
+            lookup tables of categories and tokens remain memory-mapped,
+            so their pages are shared between processes loading the same
+            vectorizer, while node tables and feature names are unpacked
+            into Python objects.
 
         Returns
         -------
-        X: sparse LIL matrix, [n_samples, n_features]
-            Feature matrix.
+        vectorizer : :class:`JsonVectorizer`
+            Fitted vectorizer.
 
         """
-        cdef np.ndarray[np.int32_t] indices
+        schema, path_, options = serialization.load(path, mmap=mmap)
+        return cls(schema=schema, path=path_, **options)
+
+
+cdef class FeatureSelection:
+    """Subset of the features of a fitted :class:`JsonVectorizer`
+
+    Transforms documents to the selected features only, using a compiled
+    plan in which nodes and vectorizers that generate no selected
+    features are left out. Usually created using
+    :meth:`JsonVectorizer.select_features`. Caches of transformed
+    values (if any) are shared with the vectorizer.
+
+    Parameters
+    ----------
+    vectorizer : :class:`JsonVectorizer`
+        Fitted vectorizer.
+    indices : array-like of int
+        Indices of selected features.
+    compact : bool, optional (default=True)
+        If True, selected features are renumbered consecutively, in the
+        same order as in `vectorizer`. Otherwise, they keep their
+        indices, and other features are never set.
+
+    Attributes
+    ----------
+    vectorizer : :class:`JsonVectorizer`
+        Fitted vectorizer.
+    indices : ndarray of int
+        Sorted indices of selected features in `vectorizer`.
+    compact : bool
+        If True, selected features are renumbered consecutively.
+    n_features : int
+        Number of generated features.
+    feature_names_ : list of str
+        Array mapping from feature integer indices to feature names.
+
+    Raises
+    ------
+    IndexError
+        If a feature index is out of range.
+
+    """
+
+    cdef:
+        TransformPlan plan
+
+    cdef readonly:
+        JsonVectorizer vectorizer
+        object indices
+        bint compact
+        int n_features
+
+    def __init__(self, JsonVectorizer vectorizer, indices, bint compact=True):
+        indices = np.unique(np.asarray(indices, dtype=np.int64))
+        if indices.size and (
+            indices[0] < 0 or indices[-1] >= vectorizer.n_features
+        ):
+            raise IndexError(
+                'feature indices must be in [0, {})'
+                .format(vectorizer.n_features)
+            )
+
+        self.vectorizer = vectorizer
+        self.indices = indices
+        self.compact = compact
+        remap = np.full(vectorizer.n_features, -1, dtype=np.int64)
+        if compact:
+            remap[indices] = np.arange(len(indices))
+            self.n_features = len(indices)
+        else:
+            remap[indices] = indices
+            self.n_features = vectorizer.n_features
+
+        self.plan = TransformPlan()
+        vectorizer._compile(self.plan, -1, remap)
+
+    def __reduce__(self):
+        return (
+            self.__class__, (self.vectorizer, self.indices, self.compact)
+        )
+
+    @property
+    def feature_names_(self):
+        # Names of generated features
+        feature_names = self.vectorizer.feature_names_
+        if self.compact:
+            return [feature_names[i] for i in self.indices]
+
+        return feature_names
+
+    def transform(self, docs, format='lil'):
+        """Transform JSON documents to feature matrix
+
+        Parameters
+        ----------
+        docs: iterable object
+            Iterable containing JSON documents.
+        format : {'lil', 'csr', 'coo', 'packbits'}, optional (default='lil')
+            Format of the returned feature matrix (see
+            :meth:`JsonVectorizer.transform`).
+
+        Returns
+        -------
+        X: sparse matrix, [n_samples, n_features]
+            Feature matrix. If `format` is 'packbits', an ndarray of
+            uint8, [n_samples, (n_features + 7) // 8].
+
+        Raises
+        ------
+        ValueError
+            If `format` is not a supported matrix format.
+
+        """
+        cdef MatrixBuilder builder
+        check_format(format)
         if not isinstance(docs, list):
             docs = list(docs)
 
-        X = sp.lil_matrix((len(docs), self.n_features), dtype=bool)
-        indices = np.arange(len(docs), dtype=np.int32)
-        self._transform(docs, X.rows, X.data, indices)
+        builder = get_builder(len(docs), self.n_features, format)
+        self.plan.transform(docs, builder)
+        return builder.tomatrix()
+
+    def transform_one(self, doc):
+        """Transform a single JSON document
+
+        Parameters
+        ----------
+        doc : object
+            JSON document.
 
-        return X
+        Returns
+        -------
+        indices : ndarray of int32
+            Sorted indices of nonzero features.
+
+        """
+        return np.sort(self.transform([doc], format='csr').indices)
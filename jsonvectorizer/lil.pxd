@@ -1,3 +1,3 @@
-cdef int lil_set_col(list[:] rows, list[:] data, int[:] rs, int col) except -1
+cdef int lil_insert(list[:] rows, list[:] datas, int i, int j) except -1
 
 cdef int lil_set(list[:] rows, list[:] data, int[:] rs, int[:] cols) except -1
@@ -46,15 +46,6 @@ cdef int lil_insert(list[:] rows, list[:] datas, int i, int j) except -1:
     return 0
 
 
-cdef int lil_set_col(list[:] rows, list[:] data, int[:] rs, int col) except -1:
-    # Set rows in a given column of a LIL matrix
-    cdef int i
-    for i in range(rs.shape[0]):
-        lil_insert(rows, data, rs[i], col)
-
-    return 0
-
-
 cdef int lil_set(list[:] rows, list[:] data, int[:] rs, int[:] cols) except -1:
     # Set arbitrary entries in a LIL matrix
     cdef int i
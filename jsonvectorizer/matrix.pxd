@@ -0,0 +1,33 @@
+cdef class MatrixBuilder:
+    cdef readonly:
+        int n_rows, n_cols
+
+    cdef int set(self, int[:] rs, int[:] cols) except -1
+
+    cdef int add(self, int row, int col) except -1
+
+
+cdef class LilBuilder(MatrixBuilder):
+    cdef:
+        object X
+        list[:] rows, data
+
+
+cdef class CooBuilder(MatrixBuilder):
+    cdef:
+        str format
+        Py_ssize_t size
+        int[::1] rows, cols
+
+    cdef int reserve(self, Py_ssize_t n) except -1
+
+
+cdef class PackbitsBuilder(MatrixBuilder):
+    cdef:
+        object X
+        unsigned char[:, ::1] bits
+
+
+cpdef int check_format(str format) except -1
+
+cpdef MatrixBuilder get_builder(int n_rows, int n_cols, str format)
@@ -0,0 +1,165 @@
+cimport cython
+cimport numpy as np
+
+import numpy as np
+import scipy.sparse as sp
+
+from .lil cimport *
+
+
+# Supported output formats for feature matrices
+FORMATS = ('lil', 'csr', 'coo', 'packbits')
+
+
+cdef class MatrixBuilder:
+    # Abstract base class for incrementally building binary matrices,
+    # only declaring the methods implemented by each builder
+
+    def __init__(self, int n_rows, int n_cols):
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+
+    cdef int set(self, int[:] rs, int[:] cols) except -1:
+        # Set entries at (rs[i], cols[i]) (abstract)
+        raise NotImplementedError(type(self).__name__ + '.set')
+
+    cdef int add(self, int row, int col) except -1:
+        # Set a single entry (abstract)
+        raise NotImplementedError(type(self).__name__ + '.add')
+
+    def tomatrix(self):
+        """Return the built matrix (abstract)"""
+        raise NotImplementedError(type(self).__name__ + '.tomatrix')
+
+
+cdef class LilBuilder(MatrixBuilder):
+    # Builds a LIL matrix by inserting entries in place
+
+    def __init__(self, int n_rows, int n_cols):
+        MatrixBuilder.__init__(self, n_rows, n_cols)
+        self.X = sp.lil_matrix((n_rows, n_cols), dtype=bool)
+        self.rows = self.X.rows
+        self.data = self.X.data
+
+    cdef int set(self, int[:] rs, int[:] cols) except -1:
+        return lil_set(self.rows, self.data, rs, cols)
+
+    cdef int add(self, int row, int col) except -1:
+        return lil_insert(self.rows, self.data, row, col)
+
+    def tomatrix(self):
+        return self.X
+
+
+cdef class CooBuilder(MatrixBuilder):
+    # Collects (row, col) pairs in growable buffers, and builds a CSR or
+    # COO matrix (with duplicate entries merged) at the end
+
+    def __init__(self, int n_rows, int n_cols, str format='csr'):
+        MatrixBuilder.__init__(self, n_rows, n_cols)
+        self.format = format
+        self.size = 0
+        self.rows = np.empty(max(n_rows, 16), dtype=np.int32)
+        self.cols = np.empty(max(n_rows, 16), dtype=np.int32)
+
+    cdef int reserve(self, Py_ssize_t n) except -1:
+        # Make sure that n more entries can be added to the buffers
+        cdef Py_ssize_t capacity = self.rows.shape[0]
+        if self.size + n <= capacity:
+            return 0
+
+        capacity = max(2 * capacity, self.size + n)
+        rows = np.empty(capacity, dtype=np.int32)
+        cols = np.empty(capacity, dtype=np.int32)
+        rows[:self.size] = self.rows[:self.size]
+        cols[:self.size] = self.cols[:self.size]
+        self.rows = rows
+        self.cols = cols
+        return 0
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int set(self, int[:] rs, int[:] cols) except -1:
+        cdef Py_ssize_t i
+        self.reserve(rs.shape[0])
+        for i in range(rs.shape[0]):
+            self.rows[self.size + i] = rs[i]
+            self.cols[self.size + i] = cols[i]
+
+        self.size += rs.shape[0]
+        return 0
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int add(self, int row, int col) except -1:
+        if self.size == self.rows.shape[0]:
+            self.reserve(1)
+
+        self.rows[self.size] = row
+        self.cols[self.size] = col
+        self.size += 1
+        return 0
+
+    def tomatrix(self):
+        rows = np.asarray(self.rows[:self.size])
+        cols = np.asarray(self.cols[:self.size])
+        X = sp.coo_matrix(
+            (np.ones(self.size, dtype=bool), (rows, cols)),
+            shape=(self.n_rows, self.n_cols), dtype=bool
+        )
+        if self.format == 'csr':
+            # Duplicate entries are merged during conversion
+            return X.tocsr()
+        else:
+            X.sum_duplicates()
+            return X
+
+
+cdef class PackbitsBuilder(MatrixBuilder):
+    # Sets bits in place in a dense uint8 array, with each row packed in
+    # the same layout as np.packbits, i.e., the feature at column j is
+    # the most significant bit minus (j % 8) of byte j // 8
+
+    def __init__(self, int n_rows, int n_cols):
+        MatrixBuilder.__init__(self, n_rows, n_cols)
+        self.X = np.zeros((n_rows, (n_cols + 7) // 8), dtype=np.uint8)
+        self.bits = self.X
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int set(self, int[:] rs, int[:] cols) except -1:
+        cdef Py_ssize_t i
+        for i in range(rs.shape[0]):
+            self.bits[rs[i], cols[i] >> 3] |= 0x80 >> (cols[i] & 7)
+
+        return 0
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int add(self, int row, int col) except -1:
+        self.bits[row, col >> 3] |= 0x80 >> (col & 7)
+        return 0
+
+    def tomatrix(self):
+        return self.X
+
+
+cpdef int check_format(str format) except -1:
+    # Raise ValueError if format is not a supported matrix format
+    if format not in FORMATS:
+        raise ValueError(
+            'format must be one of {}, not {!r}'.format(FORMATS, format)
+        )
+
+    return 0
+
+
+cpdef MatrixBuilder get_builder(int n_rows, int n_cols, str format):
+    # Return a builder for a matrix in the given format
+    check_format(format)
+    if format == 'lil':
+        return LilBuilder(n_rows, n_cols)
+    elif format == 'packbits':
+        return PackbitsBuilder(n_rows, n_cols)
+    else:
+        return CooBuilder(n_rows, n_cols, format=format)
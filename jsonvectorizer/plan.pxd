@@ -0,0 +1,65 @@
+from .jsontype cimport *
+from .matrix cimport MatrixBuilder
+from .schema cimport Schema
+
+
+cdef list transform_value(object vectorizer, object value)
+
+
+cdef class ValueCache:
+    cdef:
+        object entries
+        long max_size
+
+    cdef readonly:
+        long hits, misses
+
+    cdef tuple transform_one(self, object vectorizer, object value)
+
+    cdef list transform(self, object vectorizer, list values)
+
+
+cdef class PlanNode:
+    cdef:
+        Schema node
+        int flag_col
+        bint tuple_items
+        bint has_type[8]
+        int type_cols[8]
+        int slots[8]
+        dict properties
+        list items
+        PlanNode map_values, map_keys
+
+    cdef int set_type(self, JsonType json_type, int type_col, int slot) except -1
+
+    cdef bint is_empty(self)
+
+
+cdef class PlanContext:
+    cdef:
+        MatrixBuilder X
+        list values, rows
+
+
+cdef class TransformPlan:
+    cdef:
+        list vectorizers
+        list offsets
+        list caches
+        list index_maps
+        list owners
+        PlanNode root
+
+    cdef PlanNode add_node(self, Schema node, int flag_col)
+
+    cdef int add_vectorizer(
+        self, Schema node, object vectorizer, int pos, ValueCache cache,
+        object index_map=*
+    ) except -1
+
+    cdef int run(
+        self, PlanContext context, PlanNode plan_node, object doc, int row
+    ) except -1
+
+    cdef int transform(self, list docs, MatrixBuilder X) except -1
@@ -0,0 +1,292 @@
+cimport numpy as np
+
+import collections
+import itertools
+import numpy as np
+import time
+
+from .jsontype cimport *
+from .matrix cimport MatrixBuilder
+from .schema cimport Schema
+
+
+cdef list transform_value(object vectorizer, object value):
+    # Return sorted feature indices for a single value, using the
+    # vectorizer's transform_one method if it has one (vectorizers that
+    # do not inherit from BaseVectorizer may only implement transform)
+    if hasattr(vectorizer, 'transform_one'):
+        return list(vectorizer.transform_one(value))
+
+    return sorted(vectorizer.transform([value]).nonzero()[1].tolist())
+
+
+cdef class ValueCache:
+    # Bounded LRU cache mapping values of a node to the indices of the
+    # features generated by its vectorizer, with counters for values
+    # found in the cache (hits) and values passed to the vectorizer
+    # (misses)
+
+    def __init__(self, long max_size):
+        self.entries = collections.OrderedDict()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    cdef tuple transform_one(self, object vectorizer, object value):
+        # Return feature indices for a single value
+        cdef tuple cols = self.entries.get(value)
+        if cols is not None:
+            self.hits += 1
+            self.entries.move_to_end(value)
+            return cols
+
+        self.misses += 1
+        cols = tuple(transform_value(vectorizer, value))
+        self.entries[value] = cols
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+        return cols
+
+    cdef list transform(self, object vectorizer, list values):
+        # Return feature indices for each value, calling the vectorizer
+        # once for distinct values missing from the cache
+        cdef:
+            list result = [None] * len(values), missing = [], computed
+            list missing_values = []
+            dict missing_index = {}
+            tuple cols
+            Py_ssize_t i
+
+        for i in range(len(values)):
+            value = values[i]
+            cols = self.entries.get(value)
+            if cols is not None:
+                self.entries.move_to_end(value)
+                result[i] = cols
+                continue
+
+            j = missing_index.get(value)
+            if j is None:
+                j = missing_index[value] = len(missing_values)
+                missing_values.append(value)
+
+            missing.append((i, j))
+
+        self.misses += len(missing_values)
+        self.hits += len(values) - len(missing_values)
+        if not missing_values:
+            return result
+
+        computed = [[] for _ in missing_values]
+        rs, cs = vectorizer.transform(missing_values).nonzero()
+        for r, c in zip(rs.tolist(), cs.tolist()):
+            computed[r].append(c)
+        for j in range(len(missing_values)):
+            cols = computed[j] = tuple(computed[j])
+            self.entries[missing_values[j]] = cols
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        for i, j in missing:
+            result[i] = computed[j]
+
+        return result
+
+
+cdef class PlanNode:
+    # Precomputed transformation rules for a node: columns of the type
+    # features (-1 if none) and vectorizer slots (-1 if none) for each
+    # data type (indexed by JsonType), the column of the feature
+    # indicating whether the node is present in its parent (-1 if none),
+    # and child nodes
+
+    def __init__(self, Schema node, int flag_col):
+        cdef int i
+        self.node = node
+        self.flag_col = flag_col
+        self.tuple_items = node.tuple_items
+        for i in range(8):
+            self.has_type[i] = False
+            self.type_cols[i] = -1
+            self.slots[i] = -1
+
+        self.properties = {}
+        self.items = []
+
+    cdef int set_type(self, JsonType json_type, int type_col, int slot) except -1:
+        # Add a data type to this node
+        self.has_type[<int>json_type] = True
+        self.type_cols[<int>json_type] = type_col
+        self.slots[<int>json_type] = slot
+        return 0
+
+    cdef bint is_empty(self):
+        # Whether this node (and its children) generate no features
+        cdef int i
+        if self.flag_col >= 0:
+            return False
+        for i in range(8):
+            if self.type_cols[i] >= 0 or self.slots[i] >= 0:
+                return False
+
+        return not (
+            self.properties or self.items or
+            self.map_values is not None or self.map_keys is not None
+        )
+
+
+cdef class PlanContext:
+    # Output matrix and value buffers used while transforming a batch of
+    # documents, which are created for each call of
+    # TransformPlan.transform, so that a plan can be used by multiple
+    # threads at once
+
+    def __init__(self, MatrixBuilder X, int n_vectorizers):
+        self.X = X
+        self.values = [[] for _ in range(n_vectorizers)]
+        self.rows = [[] for _ in range(n_vectorizers)]
+
+
+cdef class TransformPlan:
+    # Precompiled representation of a fitted JsonVectorizer, consisting
+    # of a tree of PlanNode records (mirroring the nodes that generate
+    # features) and a table of vectorizer slots. Documents are
+    # transformed by recursively walking them along the tree once:
+    # features that only depend on the structure of documents are
+    # written directly to the output matrix, and values are routed to
+    # per-vectorizer lists, so that each vectorizer is called once per
+    # batch. The plan itself is read-only once compiled, and per-batch
+    # state is kept in a PlanContext
+
+    def __init__(self):
+        self.vectorizers = []
+        self.offsets = []
+        self.caches = []
+        self.index_maps = []
+        self.owners = []
+
+    cdef PlanNode add_node(self, Schema node, int flag_col):
+        # Create a node of the plan, which becomes the root if it is the
+        # first (children are linked by the caller)
+        plan_node = PlanNode(node, flag_col)
+        if self.root is None:
+            self.root = plan_node
+
+        return plan_node
+
+    cdef int add_vectorizer(
+        self, Schema node, object vectorizer, int pos, ValueCache cache,
+        object index_map=None
+    ) except -1:
+        # Add a fitted vectorizer of a node with features starting at
+        # pos, an optional cache of transformed values, and an optional
+        # array mapping the vectorizer's features to columns (-1 for
+        # dropped features) instead of pos, and return its slot
+        self.owners.append(node)
+        self.vectorizers.append(vectorizer)
+        self.offsets.append(pos)
+        self.caches.append(cache)
+        self.index_maps.append(index_map)
+        return len(self.vectorizers) - 1
+
+    cdef int run(
+        self, PlanContext context, PlanNode plan_node, object doc, int row
+    ) except -1:
+        # Recursively transform a document at a node
+        cdef:
+            JsonType json_type = plan_node.node.get_type(doc)
+            PlanNode child
+            Py_ssize_t j
+            int slot
+
+        if plan_node.node.stats is not None:
+            plan_node.node.stats['transform_docs'] += 1
+        if not plan_node.has_type[<int>json_type]:
+            return 0
+
+        if plan_node.type_cols[<int>json_type] >= 0:
+            context.X.add(row, plan_node.type_cols[<int>json_type])
+        if json_type == OBJECT:
+            if plan_node.map_values is not None:
+                for name, value in doc.items():
+                    self.run(context, plan_node.map_values, value, row)
+                    if plan_node.map_keys is not None:
+                        self.run(context, plan_node.map_keys, name, row)
+            elif plan_node.map_keys is not None:
+                for name in doc:
+                    self.run(context, plan_node.map_keys, name, row)
+            else:
+                for name, value in doc.items():
+                    child_ = plan_node.properties.get(name)
+                    if child_ is not None:
+                        child = <PlanNode>child_
+                        if child.flag_col >= 0:
+                            context.X.add(row, child.flag_col)
+
+                        self.run(context, child, value, row)
+        elif json_type == ARRAY:
+            if plan_node.tuple_items:
+                for j in range(min(len(doc), len(plan_node.items))):
+                    self.run(context, <PlanNode>plan_node.items[j], doc[j], row)
+            elif plan_node.items:
+                child = <PlanNode>plan_node.items[0]
+                for value in doc:
+                    self.run(context, child, value, row)
+
+        slot = plan_node.slots[<int>json_type]
+        if slot >= 0:
+            (<list>context.values[slot]).append(doc)
+            (<list>context.rows[slot]).append(row)
+
+        return 0
+
+    cdef int transform(self, list docs, MatrixBuilder X) except -1:
+        # Transform documents, with one row per document
+        cdef:
+            int row, slot
+            np.ndarray[np.int32_t] rows
+            list cols
+            dict stats
+            double start = 0
+            PlanContext context = PlanContext(X, len(self.vectorizers))
+
+        for row in range(len(docs)):
+            self.run(context, self.root, docs[row], row)
+
+        for slot in range(len(self.vectorizers)):
+            if not context.rows[slot]:
+                continue
+
+            stats = (<Schema>self.owners[slot]).stats
+            if stats is not None:
+                start = time.perf_counter()
+
+            rows = np.array(context.rows[slot], dtype=np.int32)
+            vectorizer = self.vectorizers[slot]
+            if self.caches[slot] is not None:
+                cols = (<ValueCache>self.caches[slot]).transform(
+                    vectorizer, context.values[slot]
+                )
+                rs = np.repeat(
+                    np.arange(len(cols)), [len(c) for c in cols]
+                )
+                cs = np.fromiter(
+                    itertools.chain.from_iterable(cols), dtype=np.int64,
+                    count=len(rs)
+                )
+            else:
+                rs, cs = vectorizer.transform(context.values[slot]).nonzero()
+
+            if self.index_maps[slot] is not None:
+                cs = self.index_maps[slot][cs]
+                rs = rs[cs >= 0]
+                cs = cs[cs >= 0].astype(np.int32)
+            else:
+                cs = (cs + self.offsets[slot]).astype(np.int32)
+
+            X.set(rows[rs], cs)
+            if stats is not None:
+                stats['transform_time'] += time.perf_counter() - start
+                stats['nnz'] += len(cs)
+
+        return 0
@@ -0,0 +1,18 @@
+from .jsontype cimport *
+
+cdef class PatternMatcher:
+    cdef:
+        object regex
+        list regexes
+
+    cdef bint search(self, str s) except -1
+
+
+cdef class VectorizerRules:
+    cdef:
+        list rules
+        dict rules_by_type
+
+    cdef list get_rules(self, JsonType json_type)
+
+    cdef tuple get_vectorizer(self, JsonType json_type, str path)
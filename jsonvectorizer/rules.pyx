@@ -0,0 +1,86 @@
+import re
+
+from .jsontype cimport *
+
+
+# Flags of regexes compiled from str patterns without global flags
+DEFAULT_FLAGS = re.compile('').flags
+
+
+cdef class PatternMatcher:
+    # Determines whether strings match any of a list of regex patterns.
+    # Patterns are compiled once, and each wrapped in a non-capturing
+    # group and combined into a single alternation when possible, i.e.,
+    # when none of them contains capturing groups (whose numbering would
+    # change) or inline global flags (which would apply to all patterns),
+    # otherwise patterns are matched one at a time
+
+    def __init__(self, patterns=[]):
+        patterns = list(patterns)
+        self.regex = None
+        self.regexes = [re.compile(pattern) for pattern in patterns]
+        if len(self.regexes) > 1:
+            if all(
+                regex.groups == 0 and regex.flags == DEFAULT_FLAGS
+                for regex in self.regexes
+            ):
+                try:
+                    self.regex = re.compile('|'.join([
+                        '(?:{})'.format(pattern) for pattern in patterns
+                    ]))
+                except re.error:
+                    pass
+        elif self.regexes:
+            self.regex = self.regexes[0]
+
+    cdef bint search(self, str s) except -1:
+        # Determine whether a string matches any of the patterns
+        if self.regex is not None:
+            return self.regex.search(s) is not None
+
+        for regex in self.regexes:
+            if regex.search(s) is not None:
+                return True
+
+        return False
+
+
+cdef class VectorizerRules:
+    # Finds the first matching vectorizer definition for nodes, with
+    # patterns compiled once and definitions grouped by data type
+
+    def __init__(self, vectorizers=[]):
+        self.rules = []
+        self.rules_by_type = {}
+        for d in vectorizers:
+            if 'pattern' in d:
+                regex = re.compile(d['pattern'])
+            else:
+                regex = None
+            if 'type' not in d:
+                types = None
+            elif isinstance(d['type'], str):
+                types = {d['type']}
+            else:
+                types = set(d['type'])
+
+            vectorizer = d['vectorizer'], d.get('args', []), d.get('kwargs', {})
+            self.rules.append((types, regex, vectorizer))
+
+    cdef list get_rules(self, JsonType json_type):
+        # Return definitions that can be used with the given data type
+        if json_type not in self.rules_by_type:
+            self.rules_by_type[json_type] = [
+                (regex, vectorizer) for types, regex, vectorizer in self.rules
+                if types is None or type2str(json_type) in types
+            ]
+
+        return self.rules_by_type[json_type]
+
+    cdef tuple get_vectorizer(self, JsonType json_type, str path):
+        # Return the first matching vectorizer for a node
+        for regex, vectorizer in self.get_rules(json_type):
+            if regex is None or regex.search(path) is not None:
+                return vectorizer
+
+        return None
@@ -1,14 +1,31 @@
 from .jsontype cimport *
+from .rules cimport PatternMatcher
 
 cdef class Schema:
+    cdef:
+        dict type_cache
+
+        # Profiling counters for this node (None if disabled)
+        dict stats
+
     cdef readonly:
         tuple path
+        str path_str
         bint tuple_items
+        int type_cache_size
+        int max_properties
+        bint map_keys
 
         set type
         set required
         dict properties
         list items
+        Schema additional_properties
+        Schema property_names
+
+    cdef dict get_options(self)
+
+    cdef Schema new_child(self, dict schema, tuple path)
 
     cdef int add_property(self, str name, dict schema) except -1
 
@@ -18,10 +35,34 @@ cdef class Schema:
 
     cdef Schema get_item(self, int index)
 
+    cdef long n_docs(self) except -1
+
+    cdef int check_extendable(self) except -1
+
+    cdef int to_map(self) except -1
+
+    cdef int add_map_values(self, str name, Schema node) except -1
+
     cdef int from_dict(self, dict schema) except -1
 
     cdef dict to_dict(self)
 
+    cdef JsonType get_type(self, object doc) except? JNULL
+
     cdef int  _extend_self(self, object doc, JsonType json_type) except -1
 
     cdef int _extend(self, object doc) except -1
+
+    cdef int _merge_self(self, Schema other) except -1
+
+    cdef int _merge(self, Schema other) except -1
+
+    cdef int _find_nodes(self, PatternMatcher patterns, list paths) except -1
+
+    cdef dict new_stats(self)
+
+    cdef dict get_stats(self)
+
+    cdef int _set_profiling(self, bint enabled) except -1
+
+    cdef int _collect_stats(self, list records) except -1
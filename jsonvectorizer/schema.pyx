@@ -1,15 +1,31 @@
 cimport cython
 
-import re
+import multiprocessing
 import sys
+import time
 
 from .jsontype cimport *
+from .rules cimport PatternMatcher
+from .utils import _parallel
+from .utils.io import read_docs
 
 
 # Python version (for handling unicode strings)
 cdef int VERSION = sys.version_info.major
 
 
+def _extend_shard(args):
+    # Learn a partial schema from a shard of documents or a file
+    cls, path, options, docs, filename, parser = args
+    schema = cls(path=path, **options)
+    if filename is None:
+        schema.extend(docs)
+    else:
+        schema.extend(read_docs(filename, parser))
+
+    return schema
+
+
 cdef class Schema:
     """Class for learning a schema from JSON documents
 
@@ -23,15 +39,38 @@ cdef class Schema:
         If True, JSON arrays are regarded as tuples with different
         schemas for each index, otherwise it is assumed that all items
         conform to the same schema.
+    type_cache_size : int, optional (default=0)
+        Maximum number of timestamp-like strings for which each node
+        memoizes the detected type (timestamp or string). Useful when
+        the same timestamps are repeated across many documents. If 0,
+        types are not memoized.
+    max_properties : int, optional (default=0)
+        If positive, JSON objects with more than this many distinct
+        properties are regarded as maps with dynamic keys (e.g., IDs or
+        IP addresses), and all their values are collapsed into a single
+        child node, instead of a child node for each property. If 0,
+        objects are never regarded as maps.
+    map_keys : bool, optional (default=False)
+        If True, keys of maps are also collected in a child node, e.g.,
+        for vectorizing them as strings.
 
     Attributes
     ----------
     path : tuple of str
         Path from the top-most node (including the root) to this node.
+    path_str : str
+        Node names in `path`, separated by colons, e.g., 'root:foo'.
     tuple_items : bool
         If True, JSON arrays are regarded as tuples with different
         schemas for each index, otherwise it is assumed that all items
         conform to the same schema.
+    type_cache_size : int
+        Maximum number of memoized types for timestamp-like strings.
+    max_properties : int
+        Maximum number of distinct properties for JSON objects before
+        they are regarded as maps.
+    map_keys : bool
+        If True, keys of maps are collected in a child node.
     type : set
         Valid data types for documents conforming to the current schema.
     required : set of str
@@ -43,6 +82,14 @@ cdef class Schema:
     items : list
         :class:`Schema` instances corresponding to different items in
         JSON arrays.
+    additional_properties : :class:`Schema` or None
+        If JSON objects are regarded as maps, :class:`Schema` instance
+        corresponding to all their values (with path ending in
+        '<value>'), otherwise None.
+    property_names : :class:`Schema` or None
+        If JSON objects are regarded as maps and `map_keys` is True,
+        :class:`Schema` instance corresponding to all their keys (with
+        path ending in '<key>'), otherwise None.
 
     """
 
@@ -50,33 +97,57 @@ cdef class Schema:
         self.type = set()
         self.properties = {}
         self.items = []
+        self.type_cache = {}
 
     def __init__(
-        self, dict schema={}, tuple path=('root',), bint tuple_items=False
+        self, dict schema={}, tuple path=('root',), bint tuple_items=False,
+        int type_cache_size=0, int max_properties=0, bint map_keys=False
     ):
         self.path = path
+        self.path_str = ':'.join(map(str, path))
+        schema = dict(schema)
         schema['tuple_items'] = schema.get('tuple_items', tuple_items)
+        schema['type_cache_size'] = schema.get(
+            'type_cache_size', type_cache_size
+        )
+        schema['max_properties'] = schema.get('max_properties', max_properties)
+        schema['map_keys'] = schema.get('map_keys', map_keys)
         self.from_dict(schema)
 
     def __reduce__(self):
         return (self.__class__, (self.to_dict(), self.path, self.tuple_items))
 
+    cdef dict get_options(self):
+        # Keyword arguments for initializing nodes with the same options
+        return dict(
+            tuple_items=self.tuple_items,
+            type_cache_size=self.type_cache_size,
+            max_properties=self.max_properties,
+            map_keys=self.map_keys
+        )
+
+    cdef Schema new_child(self, dict schema, tuple path):
+        # Create a child node with the same options as this node, which
+        # is also profiled if this node is
+        cdef Schema child = type(self)(
+            schema=schema, path=path, **self.get_options()
+        )
+        if self.stats is not None:
+            child.stats = child.new_stats()
+
+        return child
+
     cdef int add_property(self, str name, dict schema) except -1:
         # Add a child property
         path = self.path + (name,)
-        self.properties[name] = type(self)(
-            schema=schema, path=path, tuple_items=self.tuple_items
-        )
+        self.properties[name] = self.new_child(schema, path)
         return 0
 
     cdef int add_item(self, dict schema) except -1:
         # Add a child item
         path = self.path
         path += (len(self.items),) if self.tuple_items else ('any',)
-        item = type(self)(
-            schema=schema, path=path, tuple_items=self.tuple_items
-        )
-        self.items.append(item)
+        self.items.append(self.new_child(schema, path))
         return  0
 
     cdef Schema get_property(self, str name):
@@ -87,9 +158,46 @@ cdef class Schema:
         # Retrieve a child item and cast it to the correct type
         return <Schema>self.items[index]
 
+    cdef long n_docs(self) except -1:
+        # Number of documents seen by this node, if known (otherwise one)
+        return 1
+
+    cdef int check_extendable(self) except -1:
+        # Raise ValueError if this object can not be extended
+        return 0
+
+    cdef int to_map(self) except -1:
+        # Regard JSON objects as maps, collapsing all properties into a
+        # single child node for values (and one for keys if enabled)
+        self.additional_properties = self.new_child(
+            {}, self.path + ('<value>',)
+        )
+        if self.map_keys:
+            self.property_names = self.new_child({}, self.path + ('<key>',))
+        for name in sorted(self.properties):
+            self.add_map_values(name, self.get_property(name))
+
+        self.properties = {}
+        return 0
+
+    cdef int add_map_values(self, str name, Schema node) except -1:
+        # Merge a property node into the child nodes of a map
+        cdef long i
+        self.additional_properties._merge(node)
+        if self.property_names is not None:
+            for i in range(node.n_docs()):
+                self.property_names._extend(name)
+
+        return 0
+
     cdef int from_dict(self, dict schema) except -1:
         # Restore this object from a dictionary
         self.tuple_items = schema['tuple_items']
+        self.type_cache_size = schema['type_cache_size']
+        if schema['max_properties'] < 0:
+            raise ValueError('max_properties must be non-negative')
+        self.max_properties = schema['max_properties']
+        self.map_keys = schema['map_keys']
         if 'type' in schema:
             if isinstance(schema['type'], str):
                 self.type.add(str2type(schema['type']))
@@ -107,12 +215,26 @@ cdef class Schema:
             else:
                 for item in schema['items']:
                     self.add_item(item)
+        if 'additionalProperties' in schema:
+            self.additional_properties = self.new_child(
+                schema['additionalProperties'], self.path + ('<value>',)
+            )
+        if 'propertyNames' in schema:
+            self.property_names = self.new_child(
+                schema['propertyNames'], self.path + ('<key>',)
+            )
 
         return 0
 
     cdef dict to_dict(self):
         # Convert this object to a dictionary
         schema = dict(tuple_items=self.tuple_items)
+        if self.type_cache_size:
+            schema['type_cache_size'] = self.type_cache_size
+        if self.max_properties:
+            schema['max_properties'] = self.max_properties
+        if self.map_keys:
+            schema['map_keys'] = self.map_keys
         if self.type:
             schema['type'] = [type2str(t) for t in sorted(self.type)]
         if self.required is not None:
@@ -126,18 +248,44 @@ cdef class Schema:
             schema['items'] = [
                 self.get_item(i).to_dict() for i in range(len(self.items))
             ]
+        if self.additional_properties is not None:
+            schema['additionalProperties'] = (
+                self.additional_properties.to_dict()
+            )
+        if self.property_names is not None:
+            schema['propertyNames'] = self.property_names.to_dict()
 
         return schema
 
+    cdef JsonType get_type(self, object doc) except? JNULL:
+        # Find the type of a document, memoizing the (relatively costly)
+        # type detection for timestamp-like strings if enabled
+        if (
+            self.type_cache_size and type(doc) is str and
+            maybe_timestamp(doc)
+        ):
+            json_type = self.type_cache.get(doc)
+            if json_type is None:
+                json_type = typeof(doc)
+                if len(self.type_cache) < self.type_cache_size:
+                    self.type_cache[doc] = json_type
+
+            return json_type
+
+        return typeof(doc)
+
     cdef int  _extend_self(self, object doc, JsonType json_type) except -1:
         # Extend this node from the provided document
         self.type.add(json_type)
         if json_type == OBJECT:
-            for key in doc:
-                if VERSION == 2 and type(key) is unicode:
-                    key = key.encode('utf-8')
-                if key not in self.properties:
-                    self.add_property(key, {})
+            if self.additional_properties is None:
+                for key in doc:
+                    if VERSION == 2 and type(key) is unicode:
+                        key = key.encode('utf-8')
+                    if key not in self.properties:
+                        self.add_property(key, {})
+                if 0 < self.max_properties < len(self.properties):
+                    self.to_map()
             if self.required is None:
                 self.required = set(doc.keys())
             else:
@@ -153,13 +301,23 @@ cdef class Schema:
 
     cdef int _extend(self, object doc) except -1:
         # Recursively extend this node and its children
-        json_type = typeof(doc)
+        cdef double start = 0
+        if self.stats is not None:
+            start = time.perf_counter()
+
+        json_type = self.get_type(doc)
         self._extend_self(doc, json_type)
         if json_type == OBJECT:
-            for key, value in doc.items():
-                if VERSION == 2 and type(key) is unicode:
-                    key = key.encode('utf-8')
-                self.get_property(key)._extend(value)
+            if self.additional_properties is not None:
+                for key, value in doc.items():
+                    self.additional_properties._extend(value)
+                    if self.property_names is not None:
+                        self.property_names._extend(key)
+            else:
+                for key, value in doc.items():
+                    if VERSION == 2 and type(key) is unicode:
+                        key = key.encode('utf-8')
+                    self.get_property(key)._extend(value)
         elif json_type == ARRAY:
             if self.tuple_items:
                 for i, item in enumerate(doc):
@@ -168,8 +326,145 @@ cdef class Schema:
                 for item in doc:
                     self.get_item(0)._extend(item)
 
+        if self.stats is not None:
+            self.stats['extend_docs'] += 1
+            self.stats['extend_time'] += time.perf_counter() - start
+
+        return 0
+
+    cdef int _merge_self(self, Schema other) except -1:
+        # Merge another node into this node
+        self.type |= other.type
+        if other.required is not None:
+            if self.required is None:
+                self.required = set(other.required)
+            else:
+                self.required &= other.required
+
+        return 0
+
+    cdef int _merge(self, Schema other) except -1:
+        # Recursively merge another node and its children into this node
+        self._merge_self(other)
+        if (
+            other.additional_properties is not None and
+            self.additional_properties is None
+        ):
+            self.to_map()
+        if self.additional_properties is None:
+            for name in other.properties:
+                if name in self.properties:
+                    self.get_property(name)._merge(other.get_property(name))
+                else:
+                    self.add_property(name, other.get_property(name).to_dict())
+            if 0 < self.max_properties < len(self.properties):
+                self.to_map()
+        else:
+            for name in sorted(other.properties):
+                self.add_map_values(name, other.get_property(name))
+            if other.additional_properties is not None:
+                self.additional_properties._merge(other.additional_properties)
+            if other.property_names is not None:
+                self.property_names._merge(other.property_names)
+        for i in range(len(other.items)):
+            if i < len(self.items):
+                self.get_item(i)._merge(other.get_item(i))
+            else:
+                self.add_item(other.get_item(i).to_dict())
+
+        return 0
+
+    cdef int _find_nodes(self, PatternMatcher patterns, list paths) except -1:
+        # Recursively find matching nodes in this node and its children
+        if patterns.search(self.path_str):
+            paths.append(self.path)
+
+        for name in sorted(self.properties):
+            self.get_property(name)._find_nodes(patterns, paths)
+        for i in range(len(self.items)):
+            self.get_item(i)._find_nodes(patterns, paths)
+        if self.additional_properties is not None:
+            self.additional_properties._find_nodes(patterns, paths)
+        if self.property_names is not None:
+            self.property_names._find_nodes(patterns, paths)
+
+        return 0
+
+    cdef dict new_stats(self):
+        # Return zeroed profiling counters
+        return dict(extend_docs=0, extend_time=0.0)
+
+    cdef dict get_stats(self):
+        # Return a record of profiling counters for this node
+        return dict(path=self.path_str, **self.stats)
+
+    cdef int _set_profiling(self, bint enabled) except -1:
+        # Recursively enable (and reset) or disable profiling
+        self.stats = self.new_stats() if enabled else None
+        for name in self.properties:
+            self.get_property(name)._set_profiling(enabled)
+        for i in range(len(self.items)):
+            self.get_item(i)._set_profiling(enabled)
+        if self.additional_properties is not None:
+            self.additional_properties._set_profiling(enabled)
+        if self.property_names is not None:
+            self.property_names._set_profiling(enabled)
+
+        return 0
+
+    cdef int _collect_stats(self, list records) except -1:
+        # Recursively append profiling records of this node and its
+        # children
+        if self.stats is not None:
+            records.append(self.get_stats())
+
+        for name in sorted(self.properties):
+            self.get_property(name)._collect_stats(records)
+        for i in range(len(self.items)):
+            self.get_item(i)._collect_stats(records)
+        if self.additional_properties is not None:
+            self.additional_properties._collect_stats(records)
+        if self.property_names is not None:
+            self.property_names._collect_stats(records)
+
         return 0
 
+    def set_profiling(self, enabled=True):
+        """Enable or disable per-node profiling
+
+        When enabled, each node records the number of documents it
+        visits and the time spent on them, which can be retrieved using
+        :meth:`profile`. Nodes added later are also profiled. When
+        disabled (default), the overhead is a single check per visited
+        node. Counters are not pickled.
+
+        Parameters
+        ----------
+        enabled : bool, optional (default=True)
+            If True, enables profiling and resets all counters,
+            otherwise disables profiling.
+
+        """
+        self._set_profiling(enabled)
+
+    def profile(self):
+        """Return per-node profiling counters
+
+        Returns
+        -------
+        records : list of dict
+            Counters for each profiled node, in the same order as
+            features, which can be passed directly to
+            :class:`pandas.DataFrame`. Each record contains the node's
+            path ('path'), the number of documents used for extending
+            the node ('extend_docs'), and the time spent extending the
+            node and its children, in seconds ('extend_time').
+
+        """
+        records = []
+        self._collect_stats(records)
+        return records
+
     def find_nodes(self, patterns):
         """Find nodes that match any of the provided regular expressions
 
@@ -187,18 +482,7 @@ cdef class Schema:
 
         """
         paths = []
-        for pattern in patterns:
-            if re.search(pattern, ':'.join(self.path)):
-                paths.append(self.path)
-                break
-
-        for name in sorted(self.properties):
-            property_ = self.get_property(name)
-            paths.extend(property_.find_nodes(patterns))
-        for i in range(len(self.items)):
-            item = self.get_item(i)
-            paths.extend(item.find_nodes(patterns))
-
+        self._find_nodes(PatternMatcher(patterns), paths)
         return paths
 
     def extend(self, docs):
@@ -209,6 +493,163 @@ cdef class Schema:
         docs : iterable object
             Iterable containing JSON documents.
 
+        Raises
+        ------
+        ValueError
+            If the object can not be extended, e.g., a vectorizer
+            loaded with :meth:`JsonVectorizer.load`.
+
         """
+        self.check_extendable()
         for doc in docs:
             self._extend(doc)
+
+    def merge(self, other):
+        """Merge another schema into this one
+
+        The result conforms to documents used for learning either of
+        the two schemas, i.e., data types and properties are combined,
+        and only properties that are required by both remain required.
+        This can be used for learning a schema from separate shards of
+        documents. Both schemas should be merged before fitting.
+
+        Parameters
+        ----------
+        other : :class:`Schema`
+            Schema to merge into this object, which must have been
+            initialized with the same options as this object. `other` is
+            not modified.
+
+        Returns
+        -------
+        self
+
+        Raises
+        ------
+        TypeError
+            If `other` is not an instance of this object's class.
+        ValueError
+            If `other` was initialized with different options, or if
+            either of the two can not be extended (see :meth:`extend`).
+
+        """
+        cdef Schema other_
+        if not isinstance(other, type(self)):
+            raise TypeError(
+                'cannot merge {} into {}'.format(
+                    type(other).__name__, type(self).__name__
+                )
+            )
+
+        other_ = other
+        if other_.get_options() != self.get_options():
+            raise ValueError(
+                'cannot merge schemas initialized with different options'
+            )
+
+        self.check_extendable()
+        other_.check_extendable()
+        self._merge(other_)
+        return self
+
+    def extend_files(self, files, parser=None, n_jobs=1):
+        """Extend the schema using documents stored in files
+
+        Each file must contain one JSON document per line, and may be
+        in any format supported by :func:`jsonvectorizer.utils.fopen`.
+
+        Parameters
+        ----------
+        files : str or list of str
+            Path(s) to input files.
+        parser : str, callable, or None, optional (default=None)
+            JSON parser, i.e., 'json', 'orjson', 'ujson', or a function
+            for parsing a single line. If None, uses the fastest
+            installed parser (see :func:`jsonvectorizer.utils.get_parser`).
+        n_jobs : int or None, optional (default=1)
+            Number of worker processes. If greater than one, files are
+            sharded across workers, each of which reads, parses, and
+            learns a partial schema from whole files, and partial
+            schemas are merged into this object (see
+            :meth:`extend_parallel`). If None, uses the number of CPUs.
+
+        Raises
+        ------
+        ValueError
+            If `parser` is not supported, if `n_jobs` is not a positive
+            integer, or if the object can not be extended (see
+            :meth:`extend`).
+
+        """
+        if isinstance(files, str):
+            files = [files]
+
+        if _parallel.get_n_jobs(n_jobs) == 1:
+            self.extend(read_docs(files, parser))
+        else:
+            self.extend_parallel(files=files, n_jobs=n_jobs, parser=parser)
+
+    def extend_parallel(self, docs=None, files=None, n_jobs=None,
+                        chunk_size=10000, parser=None):
+        """Extend the schema using multiple worker processes
+
+        Documents are split into shards, a partial schema is learned
+        from each shard in a worker process, and partial schemas are
+        merged into this object (see :meth:`merge`).
+
+        Parameters
+        ----------
+        docs : iterable object or None, optional (default=None)
+            Iterable containing JSON documents, which is consumed lazily
+            in shards of `chunk_size` documents.
+        files : list of str or None, optional (default=None)
+            Paths to files containing one JSON document per line, in any
+            format supported by :func:`jsonvectorizer.utils.fopen`. Each
+            file is read and processed by a single worker.
+        n_jobs : int or None, optional (default=None)
+            Number of worker processes. If None, uses the number of
+            CPUs.
+        chunk_size : int, optional (default=10000)
+            Number of documents in each shard when using `docs`.
+        parser : str, callable, or None, optional (default=None)
+            JSON parser used when reading `files` (see
+            :meth:`extend_files`).
+
+        Raises
+        ------
+        ValueError
+            If not exactly one of `docs` and `files` is provided, if
+            `parser` is not supported, if `n_jobs` or `chunk_size` is
+            not a positive integer, or if the object can not be extended
+            (see :meth:`extend`).
+
+        """
+        if (docs is None) == (files is None):
+            raise ValueError('exactly one of docs and files must be provided')
+
+        self.check_extendable()
+        n_jobs = _parallel.get_n_jobs(n_jobs)
+        options = self.get_options()
+        if files is None:
+            tasks = (
+                (type(self), self.path, options, chunk, None, None)
+                for chunk in _parallel.iter_chunks(docs, chunk_size)
+            )
+        else:
+            tasks = (
+                (type(self), self.path, options, None, filename, parser)
+                for filename in files
+            )
+
+        if n_jobs == 1:
+            for task in tasks:
+                self.merge(_extend_shard(task))
+        else:
+            pool = multiprocessing.Pool(n_jobs)
+            try:
+                for schema in _parallel.imap(
+                    pool, _extend_shard, tasks, 2 * n_jobs
+                ):
+                    self.merge(schema)
+            finally:
+                pool.terminate()
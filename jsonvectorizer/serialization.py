@@ -0,0 +1,739 @@
+"""Compact serialization of fitted vectorizers
+
+Fitted :class:`JsonVectorizer` instances are saved in a directory
+containing flat NumPy arrays (which can be memory-mapped when loading),
+along with a small JSON file for options. Fitted vectorizers are stored
+as bin edges and as sorted lookup tables of categories and tokens, and
+are restored as frozen vectorizers that only support transforming, so
+neither pickle nor scikit-learn is needed for loading. The keys of each
+table are padded to the longest key in that table only, and frozen
+vectorizers search their (possibly memory-mapped) tables directly.
+
+"""
+
+import bisect
+import json
+import numpy as np
+import os
+import re
+import scipy.sparse as sp
+
+from .utils._timestamps import parse_timestamp, parse_timestamps
+
+
+# Version of the serialization format
+FORMAT_VERSION = 3
+
+# Names of data types, in the same order as JsonType
+TYPES = (
+    'object', 'array', 'null', 'boolean', 'integer', 'number', 'string',
+    'timestamp'
+)
+
+# Ways in which nodes are attached to their parents
+ROOT, PROPERTY, ITEM, MAP_VALUES, MAP_KEYS = range(5)
+
+# Columns of the node table
+NODE_COLUMNS = (
+    'parent', 'link', 'name', 'type', 'required', 'pos', 'n_features',
+    'n_feature_names'
+)
+
+# Columns of the vectorizer table
+VECTORIZER_COLUMNS = (
+    'node', 'type', 'kind', 'floats_start', 'floats_end', 'keys_start',
+    'keys_end', 'key_offset', 'key_width', 'names_start', 'n_features'
+)
+
+# Options of scikit-learn text vectorizers that can be reproduced
+ANALYZER_PARAMS = (
+    'analyzer', 'input', 'lowercase', 'ngram_range', 'preprocessor',
+    'stop_words', 'strip_accents', 'token_pattern', 'tokenizer'
+)
+
+
+def pack_strings(strings):
+    # Encode strings as a flat array of UTF-8 bytes, and an array of
+    # offsets with one more item than strings
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in encoded], out=offsets[1:])
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return data, offsets
+
+
+def unpack_strings(data, offsets, start, end):
+    # Decode strings start to end from arrays returned by pack_strings
+    buf = data[offsets[start]:offsets[end]].tobytes()
+    offsets = (offsets[start:end + 1] - offsets[start]).tolist()
+    return [
+        buf[offsets[i]:offsets[i + 1]].decode('utf-8')
+        for i in range(end - start)
+    ]
+
+
+def make_table(strings, indices):
+    # Build a lookup table mapping strings to feature indices, consisting
+    # of the UTF-8 encoded strings, sorted as a fixed-width bytes array
+    # (which can be memory-mapped and searched without decoding), and
+    # the corresponding indices. Since NumPy strips trailing null bytes,
+    # strings ending with one are left out (and are never found)
+    pairs = [
+        (string.encode('utf-8'), index)
+        for string, index in zip(strings, indices)
+        if not string.endswith('\0')
+    ]
+    keys = np.array([key for key, _ in pairs], dtype=np.bytes_)
+    if not pairs:
+        keys = np.zeros(0, dtype='S1')
+
+    order = np.argsort(keys, kind='mergesort')
+    indices = np.array([index for _, index in pairs], dtype=np.int64)
+    return keys[order], indices[order]
+
+
+def lookup(keys, indices, strings):
+    # Return the feature index of each string in a table built by
+    # make_table, or -1 if it is not found. Distinct strings are only
+    # encoded and searched once
+    if not len(keys) or not strings:
+        return np.full(len(strings), -1, dtype=np.int64)
+
+    unique = {}
+    codes = np.fromiter(
+        (unique.setdefault(string, len(unique)) for string in strings),
+        dtype=np.int64, count=len(strings)
+    )
+    result = np.full(len(unique), -1, dtype=np.int64)
+    encoded = [string.encode('utf-8') for string in unique]
+    lengths = np.fromiter(
+        map(len, encoded), dtype=np.int64, count=len(encoded)
+    )
+    encoded = np.array(encoded, dtype=keys.dtype)
+    # Strings that are longer than all keys (which are truncated) or end
+    # with a null byte (which is stripped) are not in the table
+    valid = np.char.str_len(encoded) == lengths
+    positions = np.minimum(np.searchsorted(keys, encoded), len(keys) - 1)
+    found = valid & (keys[positions] == encoded)
+    result[found] = indices[positions[found]]
+    return result[codes]
+
+
+def lookup_one(keys, indices, string):
+    # Same as lookup, for a single string
+    key = string.encode('utf-8')
+    i = bisect.bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        return int(indices[i])
+
+    return -1
+
+
+class FrozenVectorizer(object):
+    # Base class for fitted vectorizers restored from flat arrays, with
+    # the same transform and transform_one methods as the original ones
+
+    def __init__(
+        self, feature_names, floats=(), keys=(), indices=(), params={}
+    ):
+        self.feature_names_ = feature_names
+
+    def to_arrays(self):
+        # Return floats, a lookup table (keys and indices), and
+        # (JSON-serializable) parameters for restoring this vectorizer
+        return [], [], [], {}
+
+
+class FrozenBoolVectorizer(FrozenVectorizer):
+
+    def transform(self, values):
+        return np.expand_dims(np.asarray(values, dtype=bool), 1)
+
+    def transform_one(self, value):
+        return [0] if value else []
+
+
+class FrozenNumberVectorizer(FrozenVectorizer):
+
+    def __init__(
+        self, feature_names, floats=(), keys=(), indices=(), params={}
+    ):
+        FrozenVectorizer.__init__(self, feature_names)
+        self.bin_edges = np.asarray(floats, dtype=np.float64)
+
+    def to_arrays(self):
+        return self.bin_edges, [], [], {}
+
+    def transform(self, values):
+        indices = np.digitize(np.asarray(values), self.bin_edges)
+        return sp.coo_matrix(
+            (
+                np.ones(indices.shape[0], dtype=bool),
+                (np.arange(indices.shape[0]), indices)
+            ),
+            shape=(indices.shape[0], len(self.feature_names_)), dtype=bool
+        )
+
+    def transform_one(self, value):
+        return [bisect.bisect_right(self.bin_edges, value)]
+
+
+class FrozenTimestampVectorizer(FrozenVectorizer):
+
+    def __init__(
+        self, feature_names, floats=(), keys=(), indices=(), params={}
+    ):
+        FrozenVectorizer.__init__(self, feature_names)
+        self.bin_edges = np.asarray(floats, dtype=np.float64)
+        self.has_invalid_feature = params['has_invalid_feature']
+        self.has_bins = params['has_bins']
+
+    def to_arrays(self):
+        params = dict(
+            has_invalid_feature=self.has_invalid_feature,
+            has_bins=self.has_bins
+        )
+        return self.bin_edges, [], [], params
+
+    def transform(self, values):
+        timestamps, valid = parse_timestamps(values)
+        rows = [np.zeros(0, dtype=np.intp)]
+        cols = [np.zeros(0, dtype=np.intp)]
+        if self.has_invalid_feature:
+            invalids = np.flatnonzero(~valid)
+            rows.append(invalids)
+            cols.append(np.zeros(invalids.shape[0], dtype=np.intp))
+        if self.has_bins:
+            offset = 1 if self.has_invalid_feature else 0
+            rows.append(np.flatnonzero(valid))
+            cols.append(
+                offset + np.digitize(timestamps[valid], self.bin_edges)
+            )
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        return sp.coo_matrix(
+            (np.ones(rows.shape[0], dtype=bool), (rows, cols)),
+            shape=(valid.shape[0], len(self.feature_names_)), dtype=bool
+        )
+
+    def transform_one(self, value):
+        try:
+            timestamp = parse_timestamp(value)
+        except (ValueError, OverflowError):
+            return [0] if self.has_invalid_feature else []
+
+        if not self.has_bins:
+            return []
+
+        offset = 1 if self.has_invalid_feature else 0
+        return [offset + bisect.bisect_right(self.bin_edges, timestamp)]
+
+
+class FrozenCategoryVectorizer(FrozenVectorizer):
+
+    def __init__(
+        self, feature_names, floats=(), keys=(), indices=(), params={}
+    ):
+        FrozenVectorizer.__init__(self, feature_names)
+        self.keys = keys
+        self.indices = indices
+
+    def to_arrays(self):
+        return [], self.keys, self.indices, {}
+
+    def transform(self, values):
+        cols = lookup(
+            self.keys, self.indices, [value.lower() for value in values]
+        )
+        rows = np.flatnonzero(cols >= 0)
+        return sp.coo_matrix(
+            (np.ones(len(rows), dtype=bool), (rows, cols[rows])),
+            shape=(len(values), len(self.feature_names_)), dtype=bool
+        )
+
+    def transform_one(self, value):
+        i = lookup_one(self.keys, self.indices, value.lower())
+        return [] if i < 0 else [i]
+
+
+class FrozenTokenVectorizer(FrozenVectorizer):
+
+    def __init__(
+        self, feature_names, floats=(), keys=(), indices=(), params={}
+    ):
+        FrozenVectorizer.__init__(self, feature_names)
+        self.keys = keys
+        self.indices = indices
+        self.params = dict(params)
+        self.lowercase = params['lowercase']
+        self.token_pattern = re.compile(params['token_pattern'])
+        self.stop_words = frozenset(params['stop_words'] or ())
+        self.ngram_range = tuple(params['ngram_range'])
+
+    def to_arrays(self):
+        return [], self.keys, self.indices, self.params
+
+    def analyze(self, doc):
+        # Same as the analyzer of scikit-learn's CountVectorizer
+        if self.lowercase:
+            doc = doc.lower()
+
+        tokens = self.token_pattern.findall(doc)
+        if self.stop_words:
+            tokens = [token for token in tokens if token not in self.stop_words]
+
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+
+        original_tokens = tokens
+        if min_n == 1:
+            tokens = list(original_tokens)
+            min_n += 1
+        else:
+            tokens = []
+
+        n_original = len(original_tokens)
+        for n in range(min_n, min(max_n + 1, n_original + 1)):
+            for i in range(n_original - n + 1):
+                tokens.append(' '.join(original_tokens[i:i + n]))
+
+        return tokens
+
+    def transform(self, values):
+        # Look up the tokens of all values at once (duplicate entries
+        # are merged when converting to CSR)
+        rows = []
+        tokens = []
+        for i, value in enumerate(values):
+            tokens_ = self.analyze(value)
+            rows.extend([i] * len(tokens_))
+            tokens.extend(tokens_)
+
+        cols = lookup(self.keys, self.indices, tokens)
+        found = cols >= 0
+        return sp.coo_matrix(
+            (
+                np.ones(np.count_nonzero(found), dtype=bool),
+                (np.array(rows, dtype=np.int64)[found], cols[found])
+            ),
+            shape=(len(values), len(self.feature_names_)), dtype=bool
+        ).tocsr()
+
+    def transform_one(self, value):
+        indices = {
+            lookup_one(self.keys, self.indices, token)
+            for token in set(self.analyze(value))
+        }
+        indices.discard(-1)
+        return sorted(indices)
+
+
+class FrozenHashingVectorizer(FrozenVectorizer):
+
+    def __init__(
+        self, feature_names, floats=(), keys=(), indices=(), params={}
+    ):
+        FrozenVectorizer.__init__(self, feature_names)
+        self.params = dict(params)
+        self.vectorizer = None
+
+    def to_arrays(self):
+        return [], [], [], self.params
+
+    def transform(self, values):
+        if self.vectorizer is None:
+            # Hashing is stateless, but relies on scikit-learn's hash
+            # function, which is only imported when needed
+            from sklearn.feature_extraction.text import HashingVectorizer
+
+            params = dict(self.params)
+            params['ngram_range'] = tuple(params['ngram_range'])
+            self.vectorizer = HashingVectorizer(dtype=bool, **params)
+
+        return self.vectorizer.transform(values)
+
+    def transform_one(self, value):
+        return sorted(self.transform([value]).indices.tolist())
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['vectorizer'] = None
+        return state
+
+
+# Frozen vectorizer classes, indexed by their codes in the vectorizer
+# table
+FROZEN_VECTORIZERS = (
+    FrozenBoolVectorizer,
+    FrozenNumberVectorizer,
+    FrozenTimestampVectorizer,
+    FrozenCategoryVectorizer,
+    FrozenTokenVectorizer,
+    FrozenHashingVectorizer
+)
+
+
+def analyzer_params(vectorizer):
+    # Return the options of a scikit-learn text vectorizer that affect
+    # tokenization, raising ValueError if they cannot be reproduced
+    params = vectorizer.get_params()
+    if (
+        params['analyzer'] != 'word' or params['input'] != 'content' or
+        params['preprocessor'] is not None or
+        params['tokenizer'] is not None or
+        params['strip_accents'] is not None
+    ):
+        raise ValueError(
+            'only word analyzers without custom preprocessors, '
+            'tokenizers, or accent stripping can be saved'
+        )
+
+    stop_words = vectorizer.get_stop_words()
+    return dict(
+        lowercase=params['lowercase'],
+        token_pattern=params['token_pattern'],
+        stop_words=sorted(stop_words) if stop_words else None,
+        ngram_range=list(params['ngram_range'])
+    )
+
+
+def freeze(vectorizer):
+    # Convert a fitted vectorizer to a frozen vectorizer
+    from .vectorizers import (
+        BoolVectorizer, NumberVectorizer, StringVectorizer,
+        TimestampVectorizer
+    )
+
+    feature_names = vectorizer.feature_names_
+    if isinstance(vectorizer, FrozenVectorizer):
+        return vectorizer
+    elif isinstance(vectorizer, BoolVectorizer):
+        return FrozenBoolVectorizer(feature_names)
+    elif isinstance(vectorizer, NumberVectorizer):
+        return FrozenNumberVectorizer(
+            feature_names, floats=vectorizer._bin_edges
+        )
+    elif isinstance(vectorizer, TimestampVectorizer):
+        has_bins = vectorizer._vectorizer is not None
+        params = dict(
+            has_invalid_feature=bool(vectorizer._has_invalid_feature),
+            has_bins=has_bins
+        )
+        floats = vectorizer._vectorizer._bin_edges if has_bins else []
+        return FrozenTimestampVectorizer(
+            feature_names, floats=floats, params=params
+        )
+    elif isinstance(vectorizer, StringVectorizer):
+        if vectorizer._categorical:
+            categories = vectorizer._vectorizer.classes_.tolist()
+            if len(categories) == 2:
+                # Only one feature for the second category
+                keys, indices = make_table(categories[1:], [0])
+            else:
+                keys, indices = make_table(
+                    categories, range(len(categories))
+                )
+            return FrozenCategoryVectorizer(
+                feature_names, keys=keys, indices=indices
+            )
+        elif getattr(vectorizer, 'hashing', False):
+            params = analyzer_params(vectorizer._vectorizer)
+            params.update({
+                key: value
+                for key, value in vectorizer._vectorizer.get_params().items()
+                if key not in ANALYZER_PARAMS and key != 'dtype'
+            })
+            return FrozenHashingVectorizer(feature_names, params=params)
+        else:
+            vocabulary = vectorizer._vectorizer.vocabulary_
+            keys, indices = make_table(
+                list(vocabulary), list(vocabulary.values())
+            )
+            return FrozenTokenVectorizer(
+                feature_names, keys=keys, indices=indices,
+                params=analyzer_params(vectorizer._vectorizer)
+            )
+
+    raise TypeError(
+        'cannot save vectorizers of type {}'.format(type(vectorizer).__name__)
+    )
+
+
+def save(schema, path, directory):
+    """Save a fitted vectorizer in a directory
+
+    Parameters
+    ----------
+    schema : dict
+        Fitted vectorizer, converted to a dictionary.
+    path : tuple
+        Path of the top-most node.
+    directory : str
+        Path to the output directory, which is created if it does not
+        exist.
+
+    """
+    nodes = []
+    vectorizers = []
+    floats = []
+    strings = []
+    keys = [np.zeros(0, dtype=np.uint8)]
+    key_indices = [np.zeros(0, dtype=np.int64)]
+    n_keys = 0
+    n_key_bytes = 0
+    feature_names = []
+    params = []
+
+    def add_node(node, parent, link, name, required):
+        nonlocal n_keys, n_key_bytes
+        index = len(nodes)
+        name_index = -1
+        if name is not None:
+            name_index = len(strings)
+            strings.append(name)
+
+        type_mask = 0
+        for json_type in node.get('type', []):
+            type_mask |= 1 << TYPES.index(json_type)
+
+        nodes.append([
+            parent, link, name_index, type_mask, int(required),
+            node.get('pos', 0), node.get('n_features', 0),
+            len(node.get('feature_names', []))
+        ])
+        feature_names.extend(node.get('feature_names', []))
+
+        # Features of each vectorizer follow the type feature (if any)
+        # and optional property features, as in JsonVectorizer
+        required_ = set(node.get('required', []))
+        names_start = 0
+        types = sorted(node.get('type', []), key=TYPES.index)
+        for json_type in types:
+            if len(types) > 1:
+                names_start += 1
+            if json_type == 'object':
+                names_start += len(set(node.get('properties', {})) - required_)
+            if json_type not in node.get('vectorizers', {}):
+                continue
+
+            frozen = freeze(node['vectorizers'][json_type])
+            floats_, keys_, indices_, params_ = frozen.to_arrays()
+            # Keys of each table are stored as raw bytes, at the width of
+            # the table's own longest key
+            keys_ = np.ascontiguousarray(keys_, dtype=np.bytes_)
+            key_width = keys_.dtype.itemsize if len(keys_) else 1
+            vectorizers.append([
+                index, TYPES.index(json_type),
+                FROZEN_VECTORIZERS.index(type(frozen)),
+                len(floats), len(floats) + len(floats_),
+                n_keys, n_keys + len(keys_), n_key_bytes, key_width,
+                names_start, len(frozen.feature_names_)
+            ])
+            floats.extend(floats_)
+            if len(keys_):
+                keys.append(keys_.view(np.uint8))
+                key_indices.append(np.asarray(indices_, dtype=np.int64))
+                n_keys += len(keys_)
+                n_key_bytes += keys_.nbytes
+            params.append(params_)
+            names_start += len(frozen.feature_names_)
+
+        for name_ in sorted(node.get('properties', {})):
+            add_node(
+                node['properties'][name_], index, PROPERTY, name_,
+                name_ in required_
+            )
+        for item in node.get('items', []):
+            add_node(item, index, ITEM, None, False)
+        if 'additionalProperties' in node:
+            add_node(
+                node['additionalProperties'], index, MAP_VALUES, None, False
+            )
+        if 'propertyNames' in node:
+            add_node(node['propertyNames'], index, MAP_KEYS, None, False)
+
+    add_node(schema, -1, ROOT, None, False)
+    options = {
+        key: value for key, value in schema.items()
+        if key in [
+            'tuple_items', 'type_cache_size', 'max_properties', 'map_keys',
+            'max_samples', 'quantile_sketch', 'frequency_sketch',
+            'transform_cache_size'
+        ]
+    }
+    meta = dict(
+        format_version=FORMAT_VERSION, path=list(path), options=options,
+        params=params
+    )
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    strings_data, strings_offsets = pack_strings(strings)
+    names_data, names_offsets = pack_strings(feature_names)
+    arrays = dict(
+        nodes=np.array(nodes, dtype=np.int64).reshape(-1, len(NODE_COLUMNS)),
+        vectorizers=np.array(vectorizers, dtype=np.int64).reshape(
+            -1, len(VECTORIZER_COLUMNS)
+        ),
+        floats=np.array(floats, dtype=np.float64),
+        strings=strings_data,
+        string_offsets=strings_offsets,
+        keys=np.concatenate(keys),
+        key_indices=np.concatenate(key_indices),
+        feature_names=names_data,
+        feature_name_offsets=names_offsets
+    )
+    if 'columns' in schema:
+        # Features appended by partial_fit
+        arrays['columns'] = np.array(schema['columns'], dtype=np.int64)
+        (
+            arrays['column_names'], arrays['column_name_offsets']
+        ) = pack_strings(schema['column_names'])
+
+    for name, array in arrays.items():
+        np.save(
+            os.path.join(directory, name + '.npy'), array, allow_pickle=False
+        )
+    with open(os.path.join(directory, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+
+def load(directory, mmap=True):
+    """Load a fitted vectorizer from a directory
+
+    Parameters
+    ----------
+    directory : str
+        Path to a directory created by :func:`save`.
+    mmap : bool, optional (default=True)
+        If True, arrays are memory-mapped (read-only). Bin edges and
+        lookup tables of categories and tokens remain memory-mapped,
+        and are shared between processes loading the same vectorizer,
+        while node tables and feature names are unpacked into Python
+        objects.
+
+    Returns
+    -------
+    schema : dict
+        Fitted vectorizer, converted to a dictionary, with frozen
+        vectorizers, and with each node marked as frozen, so that it
+        can not be extended or fitted.
+    path : tuple
+        Path of the top-most node.
+    options : dict
+        Options for initializing the vectorizer.
+
+    Raises
+    ------
+    ValueError
+        If the directory was saved with an unsupported format version.
+
+    """
+    with open(os.path.join(directory, 'meta.json')) as f:
+        meta = json.load(f)
+    if meta['format_version'] != FORMAT_VERSION:
+        raise ValueError(
+            'unsupported format version {}'.format(meta['format_version'])
+        )
+
+    names = [
+        'nodes', 'vectorizers', 'floats', 'strings', 'string_offsets',
+        'keys', 'key_indices', 'feature_names', 'feature_name_offsets'
+    ]
+    if os.path.exists(os.path.join(directory, 'columns.npy')):
+        names.extend(['columns', 'column_names', 'column_name_offsets'])
+
+    arrays = {
+        name: np.load(
+            os.path.join(directory, name + '.npy'),
+            mmap_mode='r' if mmap else None, allow_pickle=False
+        )
+        for name in names
+    }
+    nodes = arrays['nodes'].tolist()
+    feature_names = unpack_strings(
+        arrays['feature_names'], arrays['feature_name_offsets'],
+        0, arrays['feature_name_offsets'].shape[0] - 1
+    )
+    strings = arrays['strings']
+    string_offsets = arrays['string_offsets']
+    floats = arrays['floats']
+    keys = arrays['keys']
+    key_indices = arrays['key_indices']
+
+    schemas = []
+    paths = []
+    start = 0
+    for parent, link, name, type_mask, required, pos, n_features, n_names in (
+        nodes
+    ):
+        schema = dict(meta['options'], frozen=True)
+        schema['type'] = [
+            json_type for i, json_type in enumerate(TYPES)
+            if type_mask & (1 << i)
+        ]
+        schema['pos'] = pos
+        schema['n_features'] = n_features
+        schema['feature_names'] = feature_names[start:start + n_names]
+        start += n_names
+        if 'object' in schema['type']:
+            schema['required'] = []
+        schemas.append(schema)
+        if link == ROOT:
+            paths.append(tuple(meta['path']))
+            continue
+
+        path = paths[parent]
+        parent = schemas[parent]
+        if link == PROPERTY:
+            name = unpack_strings(strings, string_offsets, name, name + 1)[0]
+            parent.setdefault('properties', {})[name] = schema
+            if required:
+                parent['required'].append(name)
+            path += (name,)
+        elif link == ITEM:
+            items = parent.setdefault('items', [])
+            if meta['options']['tuple_items']:
+                path += (len(items),)
+            else:
+                path += ('any',)
+            items.append(schema)
+        elif link == MAP_VALUES:
+            parent['additionalProperties'] = schema
+            path += ('<value>',)
+        else:
+            parent['propertyNames'] = schema
+            path += ('<key>',)
+        paths.append(path)
+
+    for i, row in enumerate(arrays['vectorizers'].tolist()):
+        index, json_type, kind, f_start, f_end, k_start, k_end = row[:7]
+        key_offset, key_width, names_start, n = row[7:]
+        key_end = key_offset + (k_end - k_start) * key_width
+        # Remove node paths from feature names
+        n_prefix = len(':'.join(map(str, paths[index]))) + 1
+        names = [
+            name[n_prefix:] for name in
+            schemas[index]['feature_names'][names_start:names_start + n]
+        ]
+        Vectorizer = FROZEN_VECTORIZERS[kind]
+        schemas[index].setdefault('vectorizers', {})[TYPES[json_type]] = (
+            Vectorizer(
+                names, floats=floats[f_start:f_end],
+                keys=keys[key_offset:key_end].view('S{}'.format(key_width)),
+                indices=key_indices[k_start:k_end],
+                params=meta['params'][i]
+            )
+        )
+
+    if 'columns' in arrays:
+        schemas[0]['columns'] = arrays['columns'].tolist()
+        schemas[0]['column_names'] = unpack_strings(
+            arrays['column_names'], arrays['column_name_offsets'],
+            0, arrays['column_name_offsets'].shape[0] - 1
+        )
+
+    return schemas[0], tuple(meta['path']), meta['options']
@@ -0,0 +1,6 @@
+"""Mergeable sketches for summarizing values in JSON documents"""
+
+__all__ = ['FrequencySketch', 'QuantileSketch']
+
+from .frequencysketch import FrequencySketch
+from .quantilesketch import QuantileSketch
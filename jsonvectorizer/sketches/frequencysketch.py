@@ -0,0 +1,175 @@
+import heapq
+
+from ..utils import _validation
+
+
+def _prune_counts(counts, capacity):
+    # Reduce Misra-Gries counters to at most capacity items, by
+    # subtracting the (capacity + 1)-th largest count from all counters
+    if len(counts) <= capacity:
+        return counts
+
+    threshold = heapq.nlargest(capacity + 1, counts.values())[-1]
+    return {
+        key: count - threshold for key, count in counts.items()
+        if count > threshold
+    }
+
+
+class FrequencySketch(object):
+    """Mergeable sketch for frequent categories and tokens of strings
+
+    Keeps exact counts of (lowercase) strings, as long as the number of
+    unique strings does not exceed `max_categories`, along with document
+    frequencies of frequent tokens. Tokens are counted using the
+    Misra-Gries heavy hitters algorithm with `max_tokens` counters, i.e.,
+    counts are exact if there are at most `max_tokens` unique tokens,
+    and otherwise underestimate true counts by at most
+    ``m / (max_tokens + 1)``, where `m` is the total number of unique
+    tokens summed over all strings. Memory usage is bounded by
+    `max_categories` and `max_tokens`, and sketches built from separate
+    streams can be merged.
+
+    Parameters
+    ----------
+    max_categories : int, optional (default=100)
+        Maximum number of unique strings to count. Must not be less than
+        the `max_categories` parameter of a :class:`StringVectorizer`
+        fitted on this sketch.
+    max_tokens : int, optional (default=10000)
+        Number of counters for tokens.
+    **kwargs
+        Passed to scikit-learn's :class:`CountVectorizer` class for
+        building the analyzer that extracts tokens from strings. Must
+        match the parameters of a :class:`StringVectorizer` fitted on
+        this sketch. The analyzer (and scikit-learn) is only loaded once
+        the first string is added, so invalid parameters are reported
+        by :meth:`update`.
+
+    Raises
+    ------
+    ValueError
+        If `max_categories` or `max_tokens` is not a positive integer.
+
+    Attributes
+    ----------
+    n : int
+        Number of summarized strings.
+
+    """
+
+    def __init__(self, max_categories=100, max_tokens=10000, **kwargs):
+        _validation.check_positive_int(max_categories, alias='max_categories')
+        _validation.check_positive_int(max_tokens, alias='max_tokens')
+        self.max_categories = max_categories
+        self.max_tokens = max_tokens
+        self.params = kwargs
+        self.n = 0
+        self._categories = {}
+        self._tokens = {}
+        self._analyzer = None
+
+    def __len__(self):
+        return self.n
+
+    def __getstate__(self):
+        # The analyzer is rebuilt when needed after unpickling
+        state = self.__dict__.copy()
+        del state['_analyzer']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._analyzer = None
+
+    def _build_analyzer(self):
+        # Build a function for extracting tokens from strings
+        from sklearn import feature_extraction
+
+        vectorizer = feature_extraction.text.CountVectorizer(**self.params)
+        return vectorizer.build_analyzer()
+
+    def update(self, value):
+        """Add a string to the sketch
+
+        Parameters
+        ----------
+        value : str
+            String to add.
+
+        """
+        if self._analyzer is None:
+            self._analyzer = self._build_analyzer()
+
+        self.n += 1
+        if self._categories is not None:
+            key = value.lower()
+            self._categories[key] = self._categories.get(key, 0) + 1
+            if len(self._categories) > self.max_categories:
+                self._categories = None
+
+        tokens = self._tokens
+        for token in set(self._analyzer(value)):
+            if token in tokens:
+                tokens[token] += 1
+            else:
+                tokens[token] = 1
+                if len(tokens) > self.max_tokens:
+                    self._tokens = tokens = _prune_counts(
+                        tokens, self.max_tokens
+                    )
+
+    def merge(self, other):
+        """Merge another sketch into this one
+
+        Parameters
+        ----------
+        other : :class:`FrequencySketch`
+            Sketch to merge, which is not modified.
+
+        Returns
+        -------
+        self
+
+        """
+        self.n += other.n
+        if self._categories is not None and other._categories is not None:
+            for key, count in other._categories.items():
+                self._categories[key] = self._categories.get(key, 0) + count
+            if len(self._categories) > self.max_categories:
+                self._categories = None
+        else:
+            self._categories = None
+
+        for token, count in other._tokens.items():
+            self._tokens[token] = self._tokens.get(token, 0) + count
+        self._tokens = _prune_counts(self._tokens, self.max_tokens)
+
+        return self
+
+    def categories(self):
+        """Return counts of unique (lowercase) strings
+
+        Returns
+        -------
+        dict or None
+            Mapping between unique strings and their counts, or None if
+            there are more than `max_categories` unique strings.
+
+        """
+        if self._categories is None:
+            return None
+        else:
+            return dict(self._categories)
+
+    def token_counts(self):
+        """Return (estimated) document frequencies of frequent tokens
+
+        Returns
+        -------
+        dict
+            Mapping between tokens and the number of strings containing
+            them.
+
+        """
+        return dict(self._tokens)
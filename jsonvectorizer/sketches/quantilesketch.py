@@ -0,0 +1,198 @@
+import math
+import numpy as np
+import random
+
+from ..utils import _validation
+
+
+class QuantileSketch(object):
+    """Mergeable sketch for approximate quantiles of numbers
+
+    Implements the KLL sketch (Karnin, Lang, and Liberty, 2016), which
+    summarizes a stream of numbers using a hierarchy of compactors.
+    Memory usage only depends on `k`, and sketches built from separate
+    streams can be merged. Results are exact until about `k` numbers
+    have been added.
+
+    Parameters
+    ----------
+    k : int, optional (default=200)
+        Size of the sketch. Larger values increase both accuracy and
+        memory usage.
+    seed : int or None, optional (default=0)
+        Seed for the sketch's own random number generator, which is
+        independent of the :mod:`random` module. If None, the generator
+        is seeded from the operating system.
+
+    Raises
+    ------
+    ValueError
+        If `k` is not a positive integer.
+
+    Attributes
+    ----------
+    k : int
+        Size of the sketch.
+    n : int
+        Number of summarized values.
+
+    """
+
+    def __init__(self, k=200, seed=0):
+        _validation.check_positive_int(k, alias='k')
+        self.k = k
+        self._random = random.Random(seed)
+        self.n = 0
+        self._compactors = []
+        self._size = 0
+        self._max_size = 0
+        self._grow()
+
+    def __len__(self):
+        return self.n
+
+    def _capacity(self, height):
+        # Capacity of the compactor at a given height
+        depth = len(self._compactors) - height - 1
+        return int(math.ceil(self.k * (2.0 / 3.0) ** depth)) + 1
+
+    def _grow(self):
+        # Add a compactor on top of the hierarchy
+        self._compactors.append([])
+        self._max_size = sum(
+            self._capacity(height) for height in range(len(self._compactors))
+        )
+
+    def _compress(self):
+        # Compact full compactors until the sketch is within capacity
+        for height in range(len(self._compactors)):
+            items = self._compactors[height]
+            if len(items) >= self._capacity(height):
+                if height + 1 == len(self._compactors):
+                    self._grow()
+
+                # Promote every other item (with a random offset) to the
+                # next level, keeping the largest item if counts are odd
+                items.sort()
+                last = [items.pop()] if len(items) % 2 else []
+                self._compactors[height + 1].extend(
+                    items[self._random.randint(0, 1)::2]
+                )
+                self._compactors[height] = last
+                self._size = sum(len(c) for c in self._compactors)
+                if self._size < self._max_size:
+                    break
+
+    def update(self, value):
+        """Add a number to the sketch
+
+        Parameters
+        ----------
+        value : int or float
+            Number to add.
+
+        """
+        self._compactors[0].append(value)
+        self.n += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def merge(self, other):
+        """Merge another sketch into this one
+
+        Parameters
+        ----------
+        other : :class:`QuantileSketch`
+            Sketch to merge, which is not modified.
+
+        Returns
+        -------
+        self
+
+        """
+        while len(self._compactors) < len(other._compactors):
+            self._grow()
+        for height, items in enumerate(other._compactors):
+            self._compactors[height].extend(items)
+
+        self.n += other.n
+        self._size = sum(len(c) for c in self._compactors)
+        while self._size >= self._max_size:
+            self._compress()
+
+        return self
+
+    def is_exact(self):
+        """Determine whether the sketch holds all added numbers
+
+        Returns
+        -------
+        bool
+            True if no numbers have been discarded by compaction.
+
+        """
+        return len(self._compactors[0]) == self.n
+
+    def values(self):
+        """Return numbers held in the sketch
+
+        Returns
+        -------
+        values : ndarray
+            Sorted numbers held in the sketch.
+        weights : ndarray
+            Number of summarized values represented by each number.
+
+        """
+        values = []
+        weights = []
+        for height, items in enumerate(self._compactors):
+            values.extend(items)
+            weights.extend([2 ** height] * len(items))
+
+        values = np.asarray(values, dtype=float)
+        weights = np.asarray(weights, dtype=np.int64)
+        order = np.argsort(values, kind='mergesort')
+        return values[order], weights[order]
+
+    def quantiles(self, qs):
+        """Estimate quantiles of summarized values
+
+        Returns actual summarized values, i.e., similar to NumPy's
+        percentile function with the 'higher' interpolation method.
+
+        Parameters
+        ----------
+        qs : array-like
+            Quantiles to estimate, between 0 and 1.
+
+        Returns
+        -------
+        ndarray
+            Estimated quantiles.
+
+        """
+        values, weights = self.values()
+        ranks = np.ceil(np.asarray(qs, dtype=float) * (self.n - 1))
+        indices = np.searchsorted(np.cumsum(weights), ranks, side='right')
+        return values[np.minimum(indices, len(values) - 1)]
+
+    def rank(self, values):
+        """Estimate the number of summarized values less than given ones
+
+        Parameters
+        ----------
+        values : array-like
+            Numbers to estimate ranks for.
+
+        Returns
+        -------
+        ndarray of int
+            Estimated number of summarized values that are strictly
+            less than each number.
+
+        """
+        values_, weights = self.values()
+        cumsum = np.concatenate(([0], np.cumsum(weights)))
+        return cumsum[np.searchsorted(values_, values, side='left')]
@@ -1,5 +1,9 @@
 """Miscellaneous utilities"""
 
-__all__ = ['fopen']
+__all__ = [
+    'fopen', 'get_parser', 'load_shards', 'packbits_to_csr', 'read_docs',
+    'save_shards', 'unpackbits'
+]
 
-from .io import fopen
+from .io import fopen, get_parser, load_shards, read_docs, save_shards
+from .packbits import packbits_to_csr, unpackbits
@@ -0,0 +1,40 @@
+import collections
+import itertools
+import multiprocessing
+
+from . import _validation
+
+
+def get_n_jobs(n_jobs):
+    # Returns the number of worker processes to use
+    if n_jobs is None:
+        return multiprocessing.cpu_count()
+
+    _validation.check_positive_int(n_jobs, alias='n_jobs')
+    return n_jobs
+
+
+def iter_chunks(iterable, chunk_size):
+    # Lazily splits an iterable into lists of (at most) chunk_size items
+    _validation.check_positive_int(chunk_size, alias='chunk_size')
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def imap(pool, func, iterable, max_pending):
+    # Similar to Pool.imap, but only consumes the iterable as results
+    # are retrieved, keeping at most max_pending tasks in flight
+    pending = collections.deque()
+    for args in iterable:
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+
+        pending.append(pool.apply_async(func, (args,)))
+
+    while pending:
+        yield pending.popleft().get()
@@ -0,0 +1,81 @@
+import datetime
+import numpy as np
+import pytz
+import re
+
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=pytz.utc)
+
+# Common ISO 8601 timestamps, in UTC or without a time zone (which are
+# also regarded as UTC), that can be parsed without dateutil
+ISO_TIMESTAMP = re.compile(
+    r'(?!0000)([0-9]{4})-([0-9]{2})-([0-9]{2})'
+    r'(?:[T ]([0-9]{2}):([0-9]{2})(?::([0-9]{2})(?:\.([0-9]{1,6}))?)?Z?)?\Z'
+)
+
+
+def parse_iso_timestamp(match):
+    # Convert a match for ISO_TIMESTAMP to a unix timestamp
+    year, month, day, hour, minute, second, fraction = match.groups()
+    timestamp = datetime.datetime(
+        int(year), int(month), int(day),
+        int(hour or 0), int(minute or 0), int(second or 0),
+        int((fraction or '0').ljust(6, '0')), tzinfo=pytz.utc
+    )
+    return (timestamp - EPOCH).total_seconds()
+
+
+def parse_timestamp(timestamp):
+    # Parse a timestamp and return a unix timestamp
+    match = ISO_TIMESTAMP.match(timestamp)
+    if match:
+        try:
+            return parse_iso_timestamp(match)
+        except ValueError:
+            pass
+
+    # dateutil is only imported when needed, as it is slow to import
+    import dateutil.parser
+
+    timestamp = dateutil.parser.parse(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = pytz.utc.localize(timestamp)
+
+    return (timestamp - EPOCH).total_seconds()
+
+
+def parse_timestamps(values):
+    # Parse an array of timestamps, and return unix timestamps along with
+    # a mask of valid timestamps. ISO 8601 timestamps are converted at
+    # once using NumPy, and dateutil is used for the rest.
+    timestamps = np.zeros(len(values))
+    valid = np.zeros(len(values), dtype=bool)
+    iso_indices = []
+    iso_values = []
+    for i, value in enumerate(values):
+        if isinstance(value, str) and ISO_TIMESTAMP.match(value):
+            iso_indices.append(i)
+            iso_values.append(value.rstrip('Z').replace(' ', 'T'))
+        else:
+            try:
+                timestamps[i] = parse_timestamp(value)
+                valid[i] = True
+            except (ValueError, OverflowError):
+                pass
+
+    if iso_values:
+        try:
+            datetimes = np.array(iso_values, dtype='datetime64[us]')
+        except ValueError:
+            # Some timestamps are invalid (e.g., out of range days)
+            for i in iso_indices:
+                try:
+                    timestamps[i] = parse_timestamp(values[i])
+                    valid[i] = True
+                except (ValueError, OverflowError):
+                    pass
+        else:
+            timestamps[iso_indices] = datetimes.astype(np.int64) / 1e6
+            valid[iso_indices] = True
+
+    return timestamps, valid
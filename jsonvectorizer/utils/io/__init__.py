@@ -2,9 +2,12 @@ import gzip
 import os
 
 from .lz4file import Lz4File
+from .parsers import get_parser
+from .shards import load_shards, save_shards
+from .threaded import ThreadedReader
 
 
-def fopen(filename, mode='r'):
+def fopen(filename, mode='r', threads=0):
     """Open a regular or compressed file
 
     Detects the type of the file, and uses the relevent module to open
@@ -17,6 +20,12 @@ def fopen(filename, mode='r'):
     mode : str, optional (default='r')
         Mode for opening the file, similar to Python's open method. lz4
         files can only be opened for reading.
+    threads : int, optional (default=0)
+        If positive, lines are read and decompressed in a background
+        thread, ahead of iterating over the returned object. Since gz
+        and lz4 streams can only be decompressed sequentially, a single
+        thread is used for each file. The returned object can then only
+        be iterated over or closed (e.g., using a `with` statement).
 
     Returns
     -------
@@ -25,9 +34,18 @@ def fopen(filename, mode='r'):
     Raises
     ------
     ValueError
-        If a lz4 file is opened for writing or appending.
+        If a lz4 file is opened for writing or appending, if `threads`
+        is negative, or if `threads` is positive and the file is not
+        opened for reading.
 
     """
+    if threads < 0:
+        raise ValueError('threads must be non-negative')
+    elif threads > 0:
+        if mode not in ['r', 'rb', 'rt']:
+            raise ValueError("mode must be 'r', 'rb', or 'rt' for threads")
+        return ThreadedReader(fopen(filename, mode))
+
     if len(mode) == 1:
         mode += 't'
 
@@ -43,3 +61,34 @@ def fopen(filename, mode='r'):
             raise ValueError("mode must be 'r', 'rb', or 'rt' for lz4 files")
     else:
         return open(filename, mode)
+
+
+def read_docs(filenames, parser=None):
+    """Read JSON documents from files, with one document per line
+
+    Blank lines, including those containing only whitespace, are
+    skipped.
+
+    Parameters
+    ----------
+    filenames : str or list of str
+        Path(s) to regular or compressed files (see
+        :func:`jsonvectorizer.utils.fopen`), which are read in order.
+    parser : str, callable, or None, optional (default=None)
+        JSON parser (see :func:`jsonvectorizer.utils.get_parser`).
+
+    Yields
+    ------
+    doc : object
+        JSON document.
+
+    """
+    if isinstance(filenames, str):
+        filenames = [filenames]
+
+    loads, binary = get_parser(parser)
+    for filename in filenames:
+        with fopen(filename, 'rb' if binary else 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
@@ -30,20 +30,30 @@ class Lz4File(object):
         if self._f is None:
             raise RuntimeError('lz4 file has not been opened')
 
-        decoded = b''
+        # Decompressed chunks are appended to a buffer, which is scanned
+        # for line breaks only once, and consumed lines are removed from
+        # the buffer after each chunk, so that reading is linear in the
+        # size of the file regardless of the length of lines
+        buf = bytearray()
         for chunk in lz4framed.Decompressor(self._f):
-            decoded += chunk
-            decoded = decoded.split(b'\n')
-            for data in decoded[:-1]:
-                if self.decode:
-                    yield data.decode() + '\n'
-                else:
-                    yield data + b'\n'
-
-            decoded = decoded[-1]
-
-        if decoded:
-            yield decoded.decode()
+            pos = len(buf)
+            buf += chunk
+            start = 0
+            with memoryview(buf) as view:
+                end = buf.find(b'\n', pos)
+                while end >= 0:
+                    if self.decode:
+                        yield str(view[start:end + 1], 'utf-8')
+                    else:
+                        yield view[start:end + 1].tobytes()
+
+                    start = end + 1
+                    end = buf.find(b'\n', start)
+
+            del buf[:start]
+
+        if buf:
+            yield buf.decode('utf-8') if self.decode else bytes(buf)
 
     def open(self):
         """Open the lz4 file"""
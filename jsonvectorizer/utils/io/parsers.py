@@ -0,0 +1,51 @@
+import importlib
+
+
+# JSON parsers in order of preference, when none is specified
+PARSERS = ('orjson', 'ujson', 'json')
+
+
+def get_parser(parser=None):
+    """Get a function for parsing JSON documents
+
+    Parameters
+    ----------
+    parser : str, callable, or None, optional (default=None)
+        Name of a module providing a `loads` function, i.e., 'json',
+        'orjson', or 'ujson', or a function for parsing a single line
+        (str) containing a JSON document. If None, uses the fastest
+        installed module among 'orjson', 'ujson', and 'json'.
+
+    Returns
+    -------
+    loads : callable
+        Function for parsing JSON documents.
+    binary : bool
+        True if `loads` accepts lines as bytes, in which case files can
+        be read without decoding lines beforehand.
+
+    Raises
+    ------
+    ImportError
+        If the requested module is not installed.
+    ValueError
+        If `parser` is not a supported module name.
+
+    """
+    if callable(parser):
+        return parser, False
+    elif parser is None:
+        for name in PARSERS[:-1]:
+            try:
+                return get_parser(name)
+            except ImportError:
+                pass
+
+        return get_parser(PARSERS[-1])
+    elif parser not in PARSERS:
+        raise ValueError(
+            'parser must be one of {}, a callable, or None'.format(PARSERS)
+        )
+
+    return importlib.import_module(parser).loads, True
+
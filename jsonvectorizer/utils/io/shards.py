@@ -0,0 +1,78 @@
+import glob
+import os
+import re
+import scipy.sparse as sp
+
+
+# Format of shard file names
+SHARD_FORMAT = 'part-{:05d}.npz'
+SHARD_PATTERN = re.compile(r'^part-(\d+)\.npz$')
+
+
+def _list_shards(directory):
+    # Returns sorted (index, path) pairs for shards in a directory
+    shards = []
+    for path in glob.glob(os.path.join(directory, 'part-*.npz')):
+        match = SHARD_PATTERN.match(os.path.basename(path))
+        if match:
+            shards.append((int(match.group(1)), path))
+
+    return sorted(shards)
+
+
+def save_shards(Xs, directory, compressed=False):
+    """Save a sequence of sparse matrices as shards in a directory
+
+    Matrices are consumed lazily and written one at a time, e.g., from
+    :meth:`jsonvectorizer.JsonVectorizer.transform_iter`, so only one
+    matrix is held in memory. Each matrix is stored in CSR format in a
+    separate ``.npz`` file. If the directory already contains shards,
+    new shards are appended after existing ones.
+
+    Parameters
+    ----------
+    Xs : iterable object
+        Iterable containing sparse matrices.
+    directory : str
+        Path to the output directory, which is created if it does not
+        exist.
+    compressed : bool, optional (default=False)
+        If True, shards are compressed.
+
+    Returns
+    -------
+    paths : list of str
+        Paths to the written shards.
+
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    shards = _list_shards(directory)
+    index = shards[-1][0] + 1 if shards else 0
+    paths = []
+    for X in Xs:
+        path = os.path.join(directory, SHARD_FORMAT.format(index))
+        sp.save_npz(path, sp.csr_matrix(X), compressed=compressed)
+        paths.append(path)
+        index += 1
+
+    return paths
+
+
+def load_shards(directory):
+    """Load sparse matrices saved using :func:`save_shards`
+
+    Parameters
+    ----------
+    directory : str
+        Path to a directory containing shards.
+
+    Yields
+    ------
+    X : sparse CSR matrix
+        Matrix stored in each shard, in the order of writing.
+
+    """
+    for _, path in _list_shards(directory):
+        yield sp.load_npz(path)
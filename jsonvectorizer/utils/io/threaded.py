@@ -0,0 +1,95 @@
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+# Number of lines passed from the background thread at a time
+BATCH_SIZE = 1024
+
+
+class ThreadedReader(object):
+    """Class for reading lines from a file in a background thread
+
+    Lines are read (and decompressed) from the wrapped file object in a
+    background thread, and passed to the consumer in batches, so that
+    I/O and decompression overlap with processing lines.
+
+    Parameters
+    ----------
+    f : file-like object
+        File object to read lines from, which is entered as a context
+        manager (i.e., opened if necessary), and exited along with this
+        object.
+    max_pending : int, optional (default=8)
+        Maximum number of batches of lines read ahead of the consumer.
+
+    """
+
+    def __init__(self, f, max_pending=8):
+        self._f = f.__enter__()
+        self._queue = queue.Queue(max_pending)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._read)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def _put(self, item):
+        # Add an item to the queue, unless the reader is closed
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+
+        return False
+
+    def _read(self):
+        # Read batches of lines in the background thread, followed by
+        # None at the end of the file, or by an exception upon failure
+        try:
+            batch = []
+            for line in self._f:
+                batch.append(line)
+                if len(batch) == BATCH_SIZE:
+                    if not self._put(batch):
+                        return
+
+                    batch = []
+
+            if batch and not self._put(batch):
+                return
+
+            self._put(None)
+        except Exception as e:
+            self._put(e)
+
+    def __iter__(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            elif isinstance(batch, Exception):
+                raise batch
+
+            for line in batch:
+                yield line
+
+    def close(self):
+        """Stop the background thread and close the file"""
+        if self._f is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._f.__exit__(None, None, None)
+        self._f = None
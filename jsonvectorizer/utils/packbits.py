@@ -0,0 +1,99 @@
+import numpy as np
+import scipy.sparse as sp
+
+
+# Maximum number of packed bytes converted at once by packbits_to_csr
+CHUNK_BYTES = 1 << 20
+
+
+def _check_shape(X, n_features):
+    # Raises ValueError if X is not a bit-packed matrix with n_features
+    if X.ndim != 2 or X.shape[1] != (n_features + 7) // 8:
+        raise ValueError(
+            'X must have {} columns for {} features'
+            .format((n_features + 7) // 8, n_features)
+        )
+
+
+def unpackbits(X, n_features):
+    """Unpack a bit-packed feature matrix to a dense boolean array
+
+    Parameters
+    ----------
+    X : ndarray of uint8, [n_samples, (n_features + 7) // 8]
+        Feature matrix, as returned by
+        :meth:`jsonvectorizer.JsonVectorizer.transform` with
+        ``format='packbits'``.
+    n_features : int
+        Number of features, e.g., the `n_features` attribute of the
+        vectorizer that generated `X`.
+
+    Returns
+    -------
+    X : ndarray of bool, [n_samples, n_features]
+        Feature matrix.
+
+    Raises
+    ------
+    ValueError
+        If `X` does not have ``(n_features + 7) // 8`` columns.
+
+    """
+    X = np.asarray(X, dtype=np.uint8)
+    _check_shape(X, n_features)
+    return np.unpackbits(X, axis=1, count=n_features).astype(bool)
+
+
+def packbits_to_csr(X, n_features):
+    """Convert a bit-packed feature matrix to a sparse CSR matrix
+
+    The matrix is never unpacked as a whole: rows are converted in
+    chunks, and only nonzero bytes of each chunk are unpacked.
+
+    Parameters
+    ----------
+    X : ndarray of uint8, [n_samples, (n_features + 7) // 8]
+        Feature matrix, as returned by
+        :meth:`jsonvectorizer.JsonVectorizer.transform` with
+        ``format='packbits'``.
+    n_features : int
+        Number of features, e.g., the `n_features` attribute of the
+        vectorizer that generated `X`.
+
+    Returns
+    -------
+    X : sparse CSR matrix, [n_samples, n_features]
+        Feature matrix.
+
+    Raises
+    ------
+    ValueError
+        If `X` does not have ``(n_features + 7) // 8`` columns.
+
+    """
+    X = np.asarray(X, dtype=np.uint8)
+    _check_shape(X, n_features)
+    n_rows = X.shape[0]
+    chunk_size = max(CHUNK_BYTES // max(X.shape[1], 1), 1)
+    indices = []
+    counts = []
+    for start in range(0, n_rows, chunk_size):
+        chunk = X[start:start + chunk_size]
+        # Unpack nonzero bytes, which are ordered by row and column, so
+        # that column indices are sorted within each row
+        rows, byte_cols = chunk.nonzero()
+        bits = np.unpackbits(chunk[rows, byte_cols][:, np.newaxis], axis=1)
+        i, bit_cols = bits.nonzero()
+        indices.append((byte_cols[i] * 8 + bit_cols).astype(np.int32))
+        counts.append(np.bincount(rows[i], minlength=chunk.shape[0]))
+
+    indptr = np.zeros(n_rows + 1, dtype=np.int32)
+    if n_rows:
+        np.cumsum(np.concatenate(counts), out=indptr[1:])
+    indices = (
+        np.concatenate(indices) if indices else np.empty(0, dtype=np.int32)
+    )
+    return sp.csr_matrix(
+        (np.ones(len(indices), dtype=bool), indices, indptr),
+        shape=(n_rows, n_features)
+    )
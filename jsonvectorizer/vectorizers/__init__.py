@@ -1,5 +1,8 @@
 """Vectorizers for individual fields in JSON documents"""
 
+import importlib
+import sys
+
 __all__ = [
     'BaseVectorizer',
     'BoolVectorizer',
@@ -8,8 +11,37 @@ __all__ = [
     'TimestampVectorizer'
 ]
 
-from .basevectorizer import BaseVectorizer
-from .boolvectorizer import BoolVectorizer
-from .numbervectorizer import NumberVectorizer
-from .stringvectorizer import StringVectorizer
-from .timestampvectorizer import TimestampVectorizer
+# Modules containing vectorizer classes, which are imported on first
+# access, since they depend on scikit-learn (slow to import)
+_MODULES = {
+    'BaseVectorizer': '.basevectorizer',
+    'BoolVectorizer': '.boolvectorizer',
+    'NumberVectorizer': '.numbervectorizer',
+    'StringVectorizer': '.stringvectorizer',
+    'TimestampVectorizer': '.timestampvectorizer'
+}
+
+
+def __getattr__(name):
+    # Lazily import vectorizer classes (PEP 562)
+    if name not in _MODULES:
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name)
+        )
+
+    value = getattr(importlib.import_module(_MODULES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if sys.version_info < (3, 7):
+    # Module-level __getattr__ is not supported
+    from .basevectorizer import BaseVectorizer
+    from .boolvectorizer import BoolVectorizer
+    from .numbervectorizer import NumberVectorizer
+    from .stringvectorizer import StringVectorizer
+    from .timestampvectorizer import TimestampVectorizer
@@ -1,3 +1,5 @@
+import numpy as np
+import scipy.sparse as sp
 from sklearn import base
 
 
@@ -9,7 +11,9 @@ class BaseVectorizer(base.BaseEstimator, base.TransformerMixin):
     scikit-learn-like interface, i.e., :meth:`fit` and :meth:`transform`
     methods. The :meth:`fit` method must accept arbitrary keyword
     arguments, i.e., `**kwargs` at the end of the method's signature,
-    and must return None upon failure.
+    and must return None upon failure. Subclasses can also override
+    :meth:`transform_one` with a faster implementation for single
+    values.
 
     """
 
@@ -30,3 +34,23 @@ class BaseVectorizer(base.BaseEstimator, base.TransformerMixin):
 
         """
         return base.TransformerMixin.fit_transform(self, values, **fit_params)
+
+    def transform_one(self, value):
+        """Transform a single value to indices of nonzero features
+
+        Parameters
+        ----------
+        value : object
+            Value for transforming.
+
+        Returns
+        -------
+        indices : list of int
+            Sorted indices of nonzero features.
+
+        """
+        X = self.transform([value])
+        if sp.issparse(X):
+            X = X.toarray()
+
+        return np.flatnonzero(X[0]).tolist()
@@ -84,3 +84,27 @@ class BoolVectorizer(BaseVectorizer):
             )
 
         return np.expand_dims(values, 1)
+
+    def transform_one(self, value):
+        """Transform a single boolean to indices of nonzero features
+
+        Parameters
+        ----------
+        value : bool
+            Boolean for transforming.
+
+        Returns
+        -------
+        indices : list of int
+            Sorted indices of nonzero features.
+
+        Raises
+        ------
+        NotFittedError
+            If the vectorizer has not yet been fitted.
+
+        """
+        if not hasattr(self, 'feature_names_'):
+            raise utils.NotFittedError('Vectorizer has be yet been fitted')
+
+        return [0] if value else []
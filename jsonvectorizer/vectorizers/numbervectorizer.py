@@ -1,8 +1,10 @@
+import bisect
 import numpy as np
 import scipy.sparse as sp
 from sklearn import utils
 
 from .basevectorizer import BaseVectorizer
+from ..sketches import QuantileSketch
 from ..utils import _validation
 
 
@@ -49,8 +51,9 @@ class NumberVectorizer(BaseVectorizer):
 
         Parameters
         ----------
-        values : array-like, [n_samples]
-            Numbers for fitting the vectorizer.
+        values : array-like, [n_samples] or QuantileSketch
+            Numbers for fitting the vectorizer, or a sketch summarizing
+            them (see :class:`jsonvectorizer.sketches.QuantileSketch`).
         n_total : int or None, optional (default=None)
             Total Number of documents that values are extracted from. If
             None, defaults to ``len(values)``.
@@ -69,28 +72,45 @@ class NumberVectorizer(BaseVectorizer):
             If `values` is not a one-dimensional array.
 
         """
-        values = np.asarray(values)
-        if values.ndim != 1:
-            raise ValueError(
-                'values must be a one dimensional array, not with shape {}'
-                .format(values.shape)
-            )
+        sketch = None
+        if isinstance(values, QuantileSketch):
+            if values.is_exact():
+                values = values.values()[0]
+            else:
+                sketch = values
+
+        if sketch is None:
+            values = np.asarray(values)
+            if values.ndim != 1:
+                raise ValueError(
+                    'values must be a one dimensional array, not with shape {}'
+                    .format(values.shape)
+                )
 
         if n_total is None:
-            n_total = values.shape[0]
+            n_total = len(values)
 
         if isinstance(self.min_f, float):
             min_f = max(int(self.min_f * n_total), 1)
         else:
             min_f = self.min_f
 
-        bin_edges = np.percentile(
-            values, np.arange(100.0 / self.n_bins, 100.0, 100.0 / self.n_bins),
-            interpolation='higher'
-        ).tolist()
-        hist, _ = np.histogram(
-            values, bins=np.concatenate(([-np.inf], bin_edges, [np.inf]))
-        )
+        if sketch is None:
+            bin_edges = np.percentile(
+                values,
+                np.arange(100.0 / self.n_bins, 100.0, 100.0 / self.n_bins),
+                interpolation='higher'
+            ).tolist()
+            hist, _ = np.histogram(
+                values, bins=np.concatenate(([-np.inf], bin_edges, [np.inf]))
+            )
+        else:
+            bin_edges = sketch.quantiles(
+                np.arange(1.0 / self.n_bins, 1.0, 1.0 / self.n_bins)
+            ).tolist()
+            ranks = sketch.rank(bin_edges)
+            hist = np.diff(np.concatenate(([0], ranks, [len(sketch)])))
+
         hist = hist.tolist()
 
         # Prune bins that hold less than min_f values
@@ -158,3 +178,28 @@ class NumberVectorizer(BaseVectorizer):
             (ones, (np.arange(indices.shape[0]), indices)),
             shape=(indices.shape[0], len(self.feature_names_)), dtype=bool
         )
+
+    def transform_one(self, value):
+        """Transform a single number to indices of nonzero features
+
+        Parameters
+        ----------
+        value : int or float
+            Number for transforming.
+
+        Returns
+        -------
+        indices : list of int
+            Sorted indices of nonzero features.
+
+        Raises
+        ------
+        NotFittedError
+            If the vectorizer has not yet been fitted.
+
+        """
+        if not hasattr(self, 'feature_names_'):
+            raise utils.NotFittedError('Vectorizer has be yet been fitted')
+
+        # Equivalent to np.digitize for increasing bin edges
+        return [bisect.bisect_right(self._bin_edges, value)]
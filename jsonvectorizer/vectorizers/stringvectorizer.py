@@ -3,9 +3,30 @@ import numpy as np
 from sklearn import feature_extraction, preprocessing, utils
 
 from .basevectorizer import BaseVectorizer
+from ..sketches import FrequencySketch
 from ..utils import _validation
 
 
+def select_tokens(
+    token_counts, n_values, min_df=1, max_df=1.0, max_features=None,
+    **kwargs
+):
+    # Select tokens using their document frequencies, similar to
+    # CountVectorizer, and return them in sorted order
+    if isinstance(max_df, float):
+        max_df = max_df * n_values
+
+    tokens = [
+        token for token, count in token_counts.items()
+        if min_df <= count <= max_df
+    ]
+    if max_features is not None and len(tokens) > max_features:
+        tokens.sort(key=lambda token: -token_counts[token])
+        tokens = tokens[:max_features]
+
+    return sorted(tokens)
+
+
 class StringVectorizer(BaseVectorizer):
     """Vectorizer for strings
 
@@ -14,7 +35,15 @@ class StringVectorizer(BaseVectorizer):
     and ``len(values) / n_average``), uses categorical features with
     one-hot encoding, otherwise uses tokenization (using scikit-learn's
     :class:`CountVectorizer`). If exactly two unique values (categories)
-    are seen, only generates one feature.
+    are seen, only generates one feature. Can also be fitted on a
+    :class:`jsonvectorizer.sketches.FrequencySketch`, in which case
+    categories and tokens are selected from the sketch's counts.
+
+    If `hashing` is True, tokenization uses scikit-learn's
+    :class:`HashingVectorizer` instead, i.e., tokens are mapped to a
+    fixed number of features using a hash function, without storing or
+    looking up a vocabulary. Document frequency thresholds are then
+    ignored, and features are given synthetic names.
 
     Parameters
     ----------
@@ -30,15 +59,20 @@ class StringVectorizer(BaseVectorizer):
         frequency strictly lower than this threshold. An integer is
         taken as an absolute count, and a float indicates the proportion
         of `n_total` passed to the :meth:`fit` method.
+    hashing : bool, optional (default=False)
+        If True, uses the hashing trick for tokenization.
+    n_features : int, optional (default=1024)
+        Number of features when using the hashing trick.
     **kwargs
-        Passed to scikit-learn's :class:`CountVectorizer` class for
+        Passed to scikit-learn's :class:`CountVectorizer` (or
+        :class:`HashingVectorizer` if `hashing` is True) class for
         initialization.
 
     Raises
     ------
     ValueError
-        If `max_categories` is not a positive integer, or if `n_average`
-        is not a positive number.
+        If `max_categories` or `n_features` is not a positive integer,
+        or if `n_average` is not a positive number.
 
     Attributes
     ----------
@@ -48,13 +82,17 @@ class StringVectorizer(BaseVectorizer):
     """
 
     def __init__(
-        self, max_categories=1, n_average=1, min_df=1, **kwargs
+        self, max_categories=1, n_average=1, min_df=1, hashing=False,
+        n_features=1024, **kwargs
     ):
         _validation.check_positive_int(max_categories, alias='max_categories')
         _validation.check_positive(n_average, alias='n_average')
+        _validation.check_positive_int(n_features, alias='n_features')
 
         self.max_categories = max_categories
         self.n_average = n_average
+        self.hashing = hashing
+        self.n_features = n_features
         self.params = dict(min_df=min_df, **kwargs)
 
     def fit(self, values, n_total=None, **kwargs):
@@ -62,8 +100,9 @@ class StringVectorizer(BaseVectorizer):
 
         Parameters
         ----------
-        values : array-like, [n_samples]
-            Strings for fitting the vectorizer.
+        values : array-like, [n_samples] or FrequencySketch
+            Strings for fitting the vectorizer, or a sketch summarizing
+            them.
         n_total : int or None, optional (default=None)
             Total Number of documents that values are extracted from. If
             None, defaults to ``len(values)``.
@@ -77,7 +116,14 @@ class StringVectorizer(BaseVectorizer):
             otherwise returns `self`.
 
         """
-        values = [value.lower() for value in values]
+        if isinstance(values, FrequencySketch):
+            sketch = values
+            unique_values = sketch.categories()
+        else:
+            sketch = None
+            values = [value.lower() for value in values]
+            unique_values = set(values)
+
         if n_total is None:
             n_total = len(values)
 
@@ -92,15 +138,23 @@ class StringVectorizer(BaseVectorizer):
         else:
             params['min_df'] = params['min_df']
 
-        unique_values = set(values)
         max_categories = min(self.max_categories, len(values) / n_average)
-        if len(unique_values) <= 1:
+        if unique_values is None:
+            # More unique values than the sketch can count
+            n_unique = float('inf')
+        else:
+            n_unique = len(unique_values)
+
+        if n_unique <= 1:
             return None
-        elif len(unique_values) <= max_categories:
+        elif n_unique <= max_categories:
             # Categorization
             self._categorical = True
             self._vectorizer = preprocessing.LabelBinarizer(sparse_output=True)
-            self._vectorizer.fit(values)
+            if sketch is None:
+                self._vectorizer.fit(values)
+            else:
+                self._vectorizer.fit(sorted(unique_values))
             if self._vectorizer.y_type_ == 'binary':
                 self.feature_names_ = [
                     u'= {1} (!= {0})'.format(*self._vectorizer.classes_)
@@ -110,9 +164,31 @@ class StringVectorizer(BaseVectorizer):
                     u'= {}'.format(category)
                     for category in self._vectorizer.classes_
                 ]
+        elif self.hashing:
+            # Tokenization using the hashing trick
+            self._categorical = False
+            for key in ['min_df', 'max_df', 'max_features', 'vocabulary']:
+                params.pop(key, None)
+
+            self._vectorizer = feature_extraction.text.HashingVectorizer(
+                n_features=self.n_features, binary=True, norm=None,
+                alternate_sign=False, dtype=bool, **params
+            )
+            self.feature_names_ = [
+                u'has token with hash {}'.format(i)
+                for i in range(self.n_features)
+            ]
         else:
             # Tokenization
             self._categorical = False
+            if sketch is not None:
+                params['vocabulary'] = select_tokens(
+                    sketch.token_counts(), len(sketch), **params
+                )
+                if not params['vocabulary']:
+                    return None
+                values = []
+
             self._vectorizer = feature_extraction.text.CountVectorizer(
                 binary=True, dtype=bool, **params
             )
@@ -156,6 +232,63 @@ class StringVectorizer(BaseVectorizer):
 
         if self._categorical:
             values = [value.lower() for value in values]
-            return self._vectorizer.transform(values).astype(bool)
+            X = self._vectorizer.transform(values)
+            if self._vectorizer.y_type_ == 'binary':
+                # scikit-learn returns a column for each category if
+                # values include more than two distinct items
+                X = X[:, -1:]
+
+            return X.astype(bool)
         else:
             return self._vectorizer.transform(values)
+
+    def transform_one(self, value):
+        """Transform a single string to indices of nonzero features
+
+        Parameters
+        ----------
+        value : str
+            String for transforming.
+
+        Returns
+        -------
+        indices : list of int
+            Sorted indices of nonzero features.
+
+        Raises
+        ------
+        NotFittedError
+            If the vectorizer has not yet been fitted.
+
+        """
+        if not hasattr(self, 'feature_names_'):
+            raise utils.NotFittedError('Vectorizer has be yet been fitted')
+
+        if self._categorical:
+            if not hasattr(self, '_indices'):
+                classes = self._vectorizer.classes_
+                if len(classes) == 2:
+                    self._indices = {classes[1]: 0}
+                else:
+                    self._indices = {c: i for i, c in enumerate(classes)}
+
+            i = self._indices.get(value.lower())
+            return [] if i is None else [i]
+        elif self.hashing:
+            return sorted(self._vectorizer.transform([value]).indices.tolist())
+        else:
+            if not hasattr(self, '_analyzer'):
+                self._analyzer = self._vectorizer.build_analyzer()
+
+            vocabulary = self._vectorizer.vocabulary_
+            return sorted({
+                vocabulary[token] for token in self._analyzer(value)
+                if token in vocabulary
+            })
+
+    def __getstate__(self):
+        # Cached lookup objects are rebuilt after unpickling
+        state = dict(super(StringVectorizer, self).__getstate__())
+        state.pop('_indices', None)
+        state.pop('_analyzer', None)
+        return state
@@ -1,23 +1,13 @@
 import datetime
-import dateutil.parser
-import pytz
+import numpy as np
 import scipy.sparse as sp
+from sklearn import utils
 
 from .basevectorizer import BaseVectorizer
 from .numbervectorizer import NumberVectorizer
+from ..sketches import QuantileSketch
 from ..utils import _validation
-
-
-EPOCH = datetime.datetime(1970, 1, 1, tzinfo=pytz.utc)
-
-
-def parse_timestamp(timestamp):
-    # Parse a timestamp and return a unix timestamp
-    timestamp = dateutil.parser.parse(timestamp)
-    if timestamp.tzinfo is None:
-        timestamp = pytz.utc.localize(timestamp)
-
-    return (timestamp - EPOCH).total_seconds()
+from ..utils._timestamps import parse_timestamp, parse_timestamps
 
 
 class TimestampVectorizer(BaseVectorizer):
@@ -65,8 +55,10 @@ class TimestampVectorizer(BaseVectorizer):
 
         Parameters
         ----------
-        values : array-like, [n_samples]
-            Timestamps for fitting the vectorizer.
+        values : array-like, [n_samples] or QuantileSketch
+            Timestamps for fitting the vectorizer, or a sketch
+            summarizing valid timestamps as unix timestamps (see
+            :class:`jsonvectorizer.sketches.QuantileSketch`).
         n_total : int or None, optional (default=None)
             Total Number of documents that values are extracted from. If
             None, defaults to ``len(values)``.
@@ -88,13 +80,13 @@ class TimestampVectorizer(BaseVectorizer):
         else:
             min_f = self.min_f
 
-        timestamps = []
-        n_invalid = 0
-        for value in values:
-            try:
-                timestamps.append(parse_timestamp(value))
-            except (ValueError, OverflowError):
-                n_invalid += 1
+        if isinstance(values, QuantileSketch):
+            timestamps = values
+            n_invalid = 0
+        else:
+            timestamps, valid = parse_timestamps(values)
+            timestamps = timestamps[valid]
+            n_invalid = len(valid) - timestamps.shape[0]
 
         has_invalid_feature = (n_invalid >= min_f)
         vectorizer = NumberVectorizer(self.n_bins, min_f=min_f)
@@ -144,28 +136,59 @@ class TimestampVectorizer(BaseVectorizer):
 
         """
         if not hasattr(self, 'feature_names_'):
-            raise NotFittedError('Vectorizer has not yet been fitted')
-
-        invalids = []
-        valids = []
-        timestamps = []
-        for i, value in enumerate(values):
-            try:
-                timestamps.append(parse_timestamp(value))
-                valids.append(i)
-            except (ValueError, OverflowError):
-                invalids.append(i)
-
-        n_values = len(invalids) + len(valids)
-        X = sp.lil_matrix(
-            (n_values, len(self.feature_names_)), dtype=bool
-        )
+            raise utils.NotFittedError('Vectorizer has not yet been fitted')
+
+        timestamps, valid = parse_timestamps(values)
+        rows = []
+        cols = []
         if self._has_invalid_feature:
-            if invalids:
-                X[invalids,0] = 1
-            if valids and self._vectorizer is not None:
-                X[valids,1:] = self._vectorizer.transform(timestamps)
-        elif valids:
-            X[valids,:] = self._vectorizer.transform(timestamps)
-
-        return X
+            invalids = np.flatnonzero(~valid)
+            rows.append(invalids)
+            cols.append(np.zeros(invalids.shape[0], dtype=np.intp))
+        if self._vectorizer is not None:
+            offset = 1 if self._has_invalid_feature else 0
+            rows.append(np.flatnonzero(valid))
+            cols.append(
+                offset +
+                np.digitize(timestamps[valid], self._vectorizer._bin_edges)
+            )
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        return sp.coo_matrix(
+            (np.ones(rows.shape[0], dtype=bool), (rows, cols)),
+            shape=(valid.shape[0], len(self.feature_names_)), dtype=bool
+        )
+
+    def transform_one(self, value):
+        """Transform a single timestamp to indices of nonzero features
+
+        Parameters
+        ----------
+        value : str
+            Timestamp for transforming.
+
+        Returns
+        -------
+        indices : list of int
+            Sorted indices of nonzero features.
+
+        Raises
+        ------
+        NotFittedError
+            If the vectorizer has not yet been fitted.
+
+        """
+        if not hasattr(self, 'feature_names_'):
+            raise utils.NotFittedError('Vectorizer has not yet been fitted')
+
+        try:
+            timestamp = parse_timestamp(value)
+        except (ValueError, OverflowError):
+            return [0] if self._has_invalid_feature else []
+
+        if self._vectorizer is None:
+            return []
+
+        offset = 1 if self._has_invalid_feature else 0
+        return [offset + i for i in self._vectorizer.transform_one(timestamp)]
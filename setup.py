@@ -8,6 +8,9 @@ from setuptools.extension import Extension
 extensions = [
 	Extension('jsonvectorizer.jsontype', ['jsonvectorizer/jsontype.pyx']),
 	Extension('jsonvectorizer.lil', ['jsonvectorizer/lil.pyx']),
+	Extension('jsonvectorizer.matrix', ['jsonvectorizer/matrix.pyx']),
+	Extension('jsonvectorizer.plan', ['jsonvectorizer/plan.pyx']),
+	Extension('jsonvectorizer.rules', ['jsonvectorizer/rules.pyx']),
 	Extension('jsonvectorizer.schema', ['jsonvectorizer/schema.pyx']),
 	Extension(
 		'jsonvectorizer.jsonvectorizer', ['jsonvectorizer/jsonvectorizer.pyx']
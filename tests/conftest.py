@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from jsonvectorizer import vectorizers
+
+
+def _make_docs(n, seed=0):
+    # Generate documents with numbers, strings, booleans, arrays, nested
+    # objects, nulls, and an optional property
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        doc = {
+            'a': rng.random(),
+            'b': rng.choice(['x', 'y', 'z', 'hello world', 'foo bar']),
+            'flag': rng.random() < 0.5,
+            'arr': [rng.randint(0, 10) for _ in range(rng.randint(0, 3))],
+            'n': {'c': rng.choice([None, 1, 'q']), 'd': 'v%d' % (i % 4)}
+        }
+        if rng.random() < 0.3:
+            doc['opt'] = 'yes'
+        docs.append(doc)
+
+    return docs
+
+
+@pytest.fixture
+def make_docs():
+    """Factory for generating `n` random documents from a seed"""
+    return _make_docs
+
+
+@pytest.fixture
+def default_vectorizers():
+    """Vectorizer definitions for booleans, numbers, and strings"""
+    return [
+        {'type': 'boolean', 'vectorizer': vectorizers.BoolVectorizer},
+        {
+            'type': 'number',
+            'vectorizer': vectorizers.NumberVectorizer,
+            'kwargs': {'n_bins': 4}
+        },
+        {
+            'type': 'string',
+            'vectorizer': vectorizers.StringVectorizer,
+            'kwargs': {'max_categories': 10}
+        }
+    ]
@@ -0,0 +1,95 @@
+import pytest
+
+from jsonvectorizer import JsonVectorizer, vectorizers
+
+
+def test_feature_names(make_docs, default_vectorizers):
+    docs = make_docs(200)
+    vectorizer = JsonVectorizer()
+    vectorizer.fit(docs, vectorizers=default_vectorizers)
+    names = vectorizer.feature_names_
+    assert len(names) == vectorizer.n_features > 0
+    assert vectorizer.transform(docs).shape == (200, len(names))
+
+    # Features of each node are contiguous, with children in order
+    prefixes = [name.split(' ')[0] for name in names]
+    assert prefixes == sorted(prefixes)
+    assert len(set(names)) == len(names)
+
+    for i, name in enumerate(names):
+        assert vectorizer.feature_name(i) == name
+        assert vectorizer.feature_index(name) == i
+
+    for i in [-1, len(names)]:
+        with pytest.raises(IndexError):
+            vectorizer.feature_name(i)
+    with pytest.raises(KeyError):
+        vectorizer.feature_index('root:missing')
+
+    # Refitting replaces features (rather than appending to them), and
+    # lookups reflect the new features
+    vectorizer.fit(docs, vectorizers=default_vectorizers)
+    assert vectorizer.feature_names_ == names
+    vectorizer.fit(docs, vectorizers=default_vectorizers[:1])
+    new_names = vectorizer.feature_names_
+    assert 'root:flag = True' in new_names and set(new_names) < set(names)
+    assert not any(name.startswith('root:a ') for name in new_names)
+    assert vectorizer.n_features == len(new_names)
+    for i, name in enumerate(new_names):
+        assert vectorizer.feature_index(name) == i
+    removed = [name for name in names if name not in new_names]
+    with pytest.raises(KeyError):
+        vectorizer.feature_index(removed[0])
+
+
+@pytest.mark.parametrize('n_jobs', [2, 3])
+def test_fit_n_jobs(make_docs, n_jobs, default_vectorizers):
+    # Fitting vectorizers in parallel gives the same features as fitting
+    # them in a single process, including vectorizers that are dropped
+    docs = make_docs(300)
+    for i, doc in enumerate(docs):
+        doc['text'] = 'word{} word{} {}'.format(i % 7, i % 11, doc['b'])
+        doc['same'] = 'constant'
+        doc['arr'].append(str(i % 3) if i % 2 else None)
+
+    vectorizers_ = default_vectorizers[:2] + [
+        {
+            'type': 'string',
+            'pattern': '^root:text$',
+            'vectorizer': vectorizers.StringVectorizer,
+            'kwargs': {'min_df': 5}
+        }
+    ] + default_vectorizers[2:]
+    ignore_patterns = ['^root:n:d$']
+    expected = JsonVectorizer()
+    expected.fit(
+        docs, vectorizers=vectorizers_, ignore_patterns=ignore_patterns
+    )
+    vectorizer = JsonVectorizer()
+    vectorizer.fit(
+        docs, vectorizers=vectorizers_, ignore_patterns=ignore_patterns,
+        n_jobs=n_jobs
+    )
+    names = vectorizer.feature_names_
+    assert names == expected.feature_names_
+    assert any(name.startswith('root:text has token') for name in names)
+    assert not any(
+        name.startswith(('root:same', 'root:n:d')) for name in names
+    )
+    assert (
+        vectorizer.transform(docs, format='csr') !=
+        expected.transform(docs, format='csr')
+    ).nnz == 0
+
+    # Incremental fitting in parallel
+    expected = JsonVectorizer()
+    vectorizer = JsonVectorizer()
+    for start in [0, 150]:
+        expected.partial_fit(docs[start:start + 150], vectorizers=vectorizers_)
+        vectorizer.partial_fit(
+            docs[start:start + 150], vectorizers=vectorizers_, n_jobs=n_jobs
+        )
+        assert vectorizer.feature_names_ == expected.feature_names_
+
+    with pytest.raises(ValueError):
+        JsonVectorizer().fit(docs, vectorizers=vectorizers_, n_jobs=0)
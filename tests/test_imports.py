@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+
+IMPORT_SCRIPT = """
+import sys
+
+import jsonvectorizer
+print(' '.join(m for m in ['dateutil', 'sklearn'] if m in sys.modules))
+"""
+
+
+def test_lazy_imports():
+    # scikit-learn and dateutil are only imported when needed, which is
+    # checked in a fresh interpreter
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [root] + [p for p in [env.get('PYTHONPATH')] if p]
+    )
+    output = subprocess.check_output(
+        [sys.executable, '-c', IMPORT_SCRIPT], env=env,
+        universal_newlines=True
+    )
+    assert output.split() == []
@@ -0,0 +1,192 @@
+import gzip
+import json
+import threading
+
+import pytest
+import scipy.sparse as sp
+
+try:
+    import lz4framed
+except ImportError:
+    lz4framed = None
+
+from jsonvectorizer import JsonVectorizer, vectorizers
+from jsonvectorizer.utils import (
+    fopen, get_parser, load_shards, read_docs, save_shards
+)
+from jsonvectorizer.utils.io import threaded
+
+
+PARSERS = ['json', 'orjson', 'ujson', None, json.loads]
+
+VECTORIZERS = [
+    {'type': 'boolean', 'vectorizer': vectorizers.BoolVectorizer},
+    {'type': 'string', 'vectorizer': vectorizers.StringVectorizer}
+]
+
+
+def write_lines(filename, lines):
+    # Write lines to a regular or gz file
+    data = ''.join(lines).encode('utf-8')
+    if filename.endswith('.gz'):
+        with gzip.open(filename, 'wb') as f:
+            f.write(data)
+    else:
+        with open(filename, 'wb') as f:
+            f.write(data)
+
+
+def write_docs(tmp_path, docs, ext=''):
+    # Write documents to two files, with blank and whitespace-only
+    # lines between them, and no newline at the end of the last file
+    lines = []
+    for i, doc in enumerate(docs):
+        lines.append(json.dumps(doc) + '\n')
+        lines.append(['', '\n', '  \n', '\t\r\n'][i % 4])
+
+    half = len(lines) // 2
+    filenames = [str(tmp_path / (name + ext)) for name in ['a', 'b']]
+    write_lines(filenames[0], ['\n'] + lines[:half])
+    write_lines(filenames[1], lines[half:] + [' \n', '{"last": true}'])
+    return filenames, docs + [{'last': True}]
+
+
+@pytest.mark.parametrize('ext', ['', '.gz'])
+@pytest.mark.parametrize('parser', PARSERS)
+def test_read_docs(tmp_path, make_docs, parser, ext):
+    if isinstance(parser, str):
+        try:
+            get_parser(parser)
+        except ImportError:
+            pytest.skip('{} is not installed'.format(parser))
+
+    filenames, docs = write_docs(tmp_path, make_docs(50), ext)
+    assert list(read_docs(filenames, parser)) == docs
+    assert list(read_docs(filenames[1], parser)) == docs[25:]
+
+
+def test_files(tmp_path, make_docs):
+    # Blank lines are skipped when extending and transforming
+    filenames, docs = write_docs(tmp_path, make_docs(50))
+    vectorizer = JsonVectorizer()
+    vectorizer.extend_files(filenames)
+    expected = JsonVectorizer()
+    expected.extend(docs)
+    assert vectorizer.__reduce__() == expected.__reduce__()
+
+    vectorizer.fit(vectorizers=VECTORIZERS)
+    X = vectorizer.transform_files(filenames, format='csr')
+    assert X.shape == (len(docs), vectorizer.n_features) and X.nnz
+    assert (X != vectorizer.transform(docs, format='csr')).nnz == 0
+
+
+@pytest.mark.parametrize('compressed', [False, True])
+def test_shards(tmp_path, make_docs, compressed):
+    docs = make_docs(250)
+    vectorizer = JsonVectorizer()
+    vectorizer.fit(docs, vectorizers=VECTORIZERS)
+    expected = vectorizer.transform(docs, format='csr')
+
+    # Matrices are written one at a time, in order
+    directory = str(tmp_path / 'shards')
+    Xs = vectorizer.transform_iter(iter(docs), chunk_size=100)
+    paths = save_shards(Xs, directory, compressed=compressed)
+    assert [path[-14:] for path in paths] == [
+        'part-00000.npz', 'part-00001.npz', 'part-00002.npz'
+    ]
+    Xs = list(load_shards(directory))
+    assert [X.shape[0] for X in Xs] == [100, 100, 50]
+    assert all(X.format == 'csr' for X in Xs)
+    assert (sp.vstack(Xs) != expected).nnz == 0
+
+    # New shards are appended after existing ones (in numerical order),
+    # and other files are ignored
+    Xs = vectorizer.transform_iter(docs, chunk_size=10, format='lil')
+    paths = save_shards(Xs, directory)
+    assert len(paths) == 25 and paths[-1].endswith('part-00027.npz')
+    open(str(tmp_path / 'shards' / 'part-x.npz'), 'w').close()
+    X = sp.vstack(list(load_shards(directory)))
+    assert (X != sp.vstack([expected, expected])).nnz == 0
+
+    assert list(load_shards(str(tmp_path / 'empty'))) == []
+
+
+def write_lz4(filename, data, piece_size):
+    # Write a lz4 file, compressing data in small pieces so that lines
+    # are split across decompressed chunks
+    with open(filename, 'wb') as f:
+        compressor = lz4framed.Compressor(f, autoflush=True)
+        for i in range(0, len(data), piece_size):
+            compressor.update(data[i:i + piece_size])
+        compressor.end()
+
+
+LINES = [
+    u'{"a": 1}\n', u'\n', u'{"b": "\u00e9\u4e2d"}\n',
+    u'{"c": "' + u'x' * 100000 + u'"}\n', u'{"d": null}'
+]
+
+
+@pytest.mark.skipif(lz4framed is None, reason='lz4framed is not installed')
+@pytest.mark.parametrize('piece_size', [1, 7, 1 << 20])
+def test_lz4(tmp_path, piece_size):
+    filename = str(tmp_path / 'docs.json.lz4')
+    data = u''.join(LINES).encode('utf-8')
+    write_lz4(filename, data, piece_size)
+    with fopen(filename) as f:
+        assert list(f) == LINES
+    with fopen(filename, 'rb') as f:
+        assert list(f) == [line.encode('utf-8') for line in LINES]
+
+    docs = list(read_docs(filename, 'json'))
+    assert docs == [json.loads(line) for line in LINES if line.strip()]
+
+    for mode in ['w', 'a', 'wb']:
+        with pytest.raises(ValueError):
+            fopen(filename, mode)
+
+
+@pytest.mark.parametrize('ext', ['', '.gz', '.lz4'])
+def test_threaded_fopen(tmp_path, monkeypatch, ext):
+    if ext == '.lz4' and lz4framed is None:
+        pytest.skip('lz4framed is not installed')
+
+    # Lines are read in batches, with fewer pending batches than the
+    # number of batches in the file
+    monkeypatch.setattr(threaded, 'BATCH_SIZE', 10)
+    lines = [u'line {}\n'.format(i) for i in range(1000)]
+    filename = str(tmp_path / ('lines' + ext))
+    data = u''.join(lines).encode('utf-8')
+    if ext == '.lz4':
+        write_lz4(filename, data, 1000)
+    else:
+        write_lines(filename, lines)
+
+    for mode, expected in [
+        ('r', lines), ('rb', [line.encode('utf-8') for line in lines])
+    ]:
+        with fopen(filename, mode, threads=1) as f:
+            assert list(f) == expected
+
+    # Closing early stops the background thread
+    n_threads = threading.active_count()
+    with fopen(filename, threads=1) as f:
+        assert next(iter(f)) == lines[0]
+    assert threading.active_count() == n_threads
+
+    for mode in ['w', 'a']:
+        with pytest.raises(ValueError):
+            fopen(filename, mode, threads=1)
+    with pytest.raises(ValueError):
+        fopen(filename, threads=-1)
+
+
+def test_threaded_errors(tmp_path):
+    # Errors in the background thread are raised by the consumer
+    filename = str(tmp_path / 'lines.gz')
+    with open(filename, 'wb') as f:
+        f.write(b'not a gz file')
+
+    with fopen(filename, threads=1) as f:
+        with pytest.raises(OSError):
+            list(f)
@@ -0,0 +1,112 @@
+from jsonvectorizer import JsonVectorizer, vectorizers
+from jsonvectorizer.sketches import FrequencySketch, QuantileSketch
+
+
+VECTORIZERS = [
+    {
+        'type': 'number',
+        'vectorizer': vectorizers.NumberVectorizer,
+        'kwargs': {'n_bins': 4}
+    },
+    {
+        'type': 'string',
+        'vectorizer': vectorizers.StringVectorizer,
+        'kwargs': {'max_categories': 10}
+    }
+]
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {'a': {}, 'b': {}, 'n': {'type': 'object'}}
+}
+
+
+def get_values(vectorizer, name, json_type):
+    # Values collected by a property of a vectorizer (from the
+    # dictionary that is used for pickling)
+    schema = vectorizer.__reduce__()[1][0]
+    return schema['properties'][name]['values'][json_type]
+
+
+def test_schema_max_samples(make_docs):
+    # Children created from a schema are initialized with the same
+    # options as their parent
+    docs = make_docs(200)
+    vectorizer = JsonVectorizer(schema=SCHEMA, max_samples=10)
+    vectorizer.extend(docs[:100])
+    assert len(get_values(vectorizer, 'a', 'number')) == 10
+
+    other = JsonVectorizer(max_samples=10)
+    other.extend(docs[100:])
+    vectorizer.merge(other)
+    assert len(get_values(vectorizer, 'a', 'number')) == 10
+
+    vectorizer.fit(vectorizers=VECTORIZERS)
+    X = vectorizer.transform(docs)
+    assert X.shape == (200, vectorizer.n_features)
+    assert any(
+        name.startswith('root:a ') for name in vectorizer.feature_names_
+    )
+
+
+def test_schema_quantile_sketch(make_docs):
+    docs = make_docs(200)
+    vectorizer = JsonVectorizer(schema=SCHEMA, quantile_sketch=500)
+    vectorizer.extend(docs[:100])
+    sketch = get_values(vectorizer, 'a', 'number')
+    assert isinstance(sketch, QuantileSketch) and len(sketch) == 100
+
+    other = JsonVectorizer(quantile_sketch=500)
+    other.extend(docs[100:])
+    vectorizer.merge(other)
+    assert len(get_values(vectorizer, 'a', 'number')) == 200
+
+    vectorizer.fit(vectorizers=VECTORIZERS)
+    expected = JsonVectorizer(quantile_sketch=500)
+    expected.fit(docs, vectorizers=VECTORIZERS)
+    assert vectorizer.transform(docs).shape == (200, vectorizer.n_features)
+    assert vectorizer.feature_names_ == expected.feature_names_
+
+
+def test_schema_frequency_sketch(make_docs):
+    docs = make_docs(200)
+    options = {'frequency_sketch': {'max_categories': 10}}
+    vectorizer = JsonVectorizer(schema=SCHEMA, **options)
+    vectorizer.extend(docs[:100])
+    sketch = get_values(vectorizer, 'b', 'string')
+    assert isinstance(sketch, FrequencySketch) and len(sketch) == 100
+
+    other = JsonVectorizer(**options)
+    other.extend(docs[100:])
+    vectorizer.merge(other)
+    assert len(get_values(vectorizer, 'b', 'string')) == 200
+
+    vectorizer.fit(vectorizers=VECTORIZERS)
+    expected = JsonVectorizer(**options).fit(docs, vectorizers=VECTORIZERS)
+    assert vectorizer.feature_names_ == expected.feature_names_
+    assert (vectorizer.transform(docs) != expected.transform(docs)).nnz == 0
+
+
+def test_schema_cache_info(make_docs):
+    docs = make_docs(100)
+    vectorizer = JsonVectorizer(schema=SCHEMA, transform_cache_size=8)
+    vectorizer.fit(docs, vectorizers=VECTORIZERS)
+    expected = vectorizer.transform(docs)
+    records = {
+        record['path']: record for record in vectorizer.cache_info()
+        if record['type'] == 'string'
+    }
+    assert records['root:b'] == {
+        'path': 'root:b', 'type': 'string', 'hits': 95, 'misses': 5,
+        'size': 5
+    }
+    assert records['root:n:d']['misses'] == 4
+
+    # Cached values are transformed identically
+    assert (vectorizer.transform(docs) != expected).nnz == 0
+    records = {
+        record['path']: record for record in vectorizer.cache_info()
+        if record['type'] == 'string'
+    }
+    assert records['root:b']['hits'] == 195
+    assert records['root:b']['misses'] == 5
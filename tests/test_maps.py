@@ -0,0 +1,167 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from jsonvectorizer import JsonVectorizer, vectorizers
+
+
+VECTORIZERS = [
+    {'type': 'boolean', 'vectorizer': vectorizers.BoolVectorizer},
+    {
+        'type': 'number',
+        'vectorizer': vectorizers.NumberVectorizer,
+        'kwargs': {'n_bins': 3}
+    },
+    {'type': 'string', 'vectorizer': vectorizers.StringVectorizer}
+]
+
+
+def make_map_docs(n, n_keys, start=0):
+    # Documents with a map-like object, keyed by n_keys distinct keys
+    docs = []
+    for i in range(start, start + n):
+        docs.append({
+            'm': {
+                'k{}'.format(i % n_keys): i,
+                'k{}'.format((i + 1) % n_keys): 'v{}'.format(i % 3)
+            },
+            'x': i % 2 == 0
+        })
+
+    return docs
+
+
+def get_map(vectorizer):
+    # Schema dictionary of the map-like property
+    return vectorizer.__reduce__()[1][0]['properties']['m']
+
+
+def get_keys(vectorizer):
+    # Multiset of keys collected by the map-like property
+    return Counter(get_map(vectorizer)['propertyNames']['values']['string'])
+
+
+@pytest.mark.parametrize('n_keys', [4, 5, 6, 20])
+def test_collapse_threshold(n_keys):
+    # Objects are collapsed once they have more than max_properties
+    # distinct keys, keeping values collected before the collapse
+    docs = make_map_docs(40, n_keys)
+    vectorizer = JsonVectorizer(max_properties=5, map_keys=True)
+    vectorizer.extend(docs)
+    schema = get_map(vectorizer)
+    if n_keys <= 5:
+        assert sorted(schema['properties']) == [
+            'k{}'.format(i) for i in range(n_keys)
+        ]
+        assert 'additionalProperties' not in schema
+        assert 'propertyNames' not in schema
+    else:
+        assert 'properties' not in schema
+        assert schema['additionalProperties']['counts'] == {
+            'number': 40, 'string': 40
+        }
+        assert get_keys(vectorizer) == Counter(
+            key for doc in docs for key in doc['m']
+        )
+
+    # Maps are never collapsed by default
+    vectorizer = JsonVectorizer()
+    vectorizer.extend(docs)
+    assert len(get_map(vectorizer)['properties']) == n_keys
+
+
+@pytest.mark.parametrize('n_keys', [(6, 6), (4, 6), (6, 4), (4, 4)])
+def test_merge(n_keys):
+    # Merging collapsed and uncollapsed nodes is equivalent to extending
+    # a single node with all documents
+    docs = (
+        make_map_docs(30, n_keys[0]) +
+        make_map_docs(30, n_keys[1], start=30)
+    )
+    expected = JsonVectorizer(max_properties=5, map_keys=True)
+    expected.extend(docs)
+
+    vectorizer = JsonVectorizer(max_properties=5, map_keys=True)
+    vectorizer.extend(docs[:30])
+    other = JsonVectorizer(max_properties=5, map_keys=True)
+    other.extend(docs[30:])
+    vectorizer.merge(other)
+
+    schema = get_map(vectorizer)
+    expected_schema = get_map(expected)
+    assert schema['counts'] == expected_schema['counts'] == {'object': 60}
+    assert schema.keys() == expected_schema.keys()
+    if 'properties' in schema:
+        assert 'k4' not in schema['properties']
+    else:
+        assert schema['additionalProperties']['counts'] == {
+            'number': 60, 'string': 60
+        }
+        assert get_keys(vectorizer) == get_keys(expected)
+
+    vectorizer.fit(vectorizers=VECTORIZERS)
+    expected.fit(vectorizers=VECTORIZERS)
+    assert vectorizer.feature_names_ == expected.feature_names_
+
+
+def test_feature_names():
+    docs = make_map_docs(60, 8)
+    vectorizer = JsonVectorizer(max_properties=5, map_keys=True)
+    vectorizer.fit(docs, vectorizers=VECTORIZERS)
+    names = vectorizer.feature_names_
+    assert 'root:m:<value> is number' in names
+    assert 'root:m:<value> has token "v0"' in names
+    assert [name for name in names if name.startswith('root:m:<key>')] == [
+        'root:m:<key> has token "k{}"'.format(i) for i in range(8)
+    ]
+    assert not any(name.startswith('root:m:k') for name in names)
+
+    # Values and keys of all properties are vectorized
+    X = vectorizer.transform(docs, format='csr')
+    for i, doc in enumerate(docs):
+        row = set(names[j] for j in X[i].indices)
+        for key in doc['m']:
+            assert 'root:m:<key> has token "{}"'.format(key) in row
+        assert np.array_equal(
+            vectorizer.transform_one(doc), np.sort(X[i].indices)
+        )
+
+    # Without map_keys, only values are vectorized
+    vectorizer = JsonVectorizer(max_properties=5)
+    vectorizer.fit(docs, vectorizers=VECTORIZERS)
+    assert not any('<key>' in name for name in vectorizer.feature_names_)
+    assert 'root:m:<value> is number' in vectorizer.feature_names_
+
+
+def test_prune():
+    docs = make_map_docs(60, 8)
+    vectorizer = JsonVectorizer(max_properties=5, map_keys=True)
+    vectorizer.extend(docs)
+    assert vectorizer.prune(patterns=['<key>$']) == ['root:m:<key>']
+
+    # Objects are still regarded as maps, but keys are not vectorized
+    schema = get_map(vectorizer)
+    assert 'properties' not in schema
+    vectorizer.fit(vectorizers=VECTORIZERS)
+    names = vectorizer.feature_names_
+    assert not any('<key>' in name for name in names)
+    assert 'root:m:<value> is number' in names
+
+    # Data types of values can be pruned by frequency
+    docs = make_map_docs(60, 8) + [{'m': {'k0': True}}]
+    vectorizer = JsonVectorizer(max_properties=5, map_keys=True)
+    vectorizer.extend(docs)
+    assert vectorizer.prune(min_f=2) == ['root:m:<value> -> boolean']
+    assert get_map(vectorizer)['additionalProperties']['counts'] == {
+        'number': 60, 'string': 60
+    }
+
+    # Dropping values entirely keeps the map (and its keys)
+    assert vectorizer.prune(patterns=['<value>$']) == ['root:m:<value>']
+    vectorizer.fit(vectorizers=VECTORIZERS)
+    names = vectorizer.feature_names_
+    assert not any('<value>' in name for name in names)
+    assert 'root:m:<key> has token "k0"' in names
+    X = vectorizer.transform(docs + [{'m': {'new': 1, 'k1': 'v0'}}])
+    assert X.shape == (len(docs) + 1, len(names))
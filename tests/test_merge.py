@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from jsonvectorizer import JsonVectorizer, Schema
+
+
+def to_dict(schema):
+    # Dictionary representation of a schema (used for pickling)
+    return schema.__reduce__()[1][0]
+
+
+def extend(cls, docs, **kwargs):
+    # Schema learned from a list of documents
+    schema = cls(**kwargs)
+    schema.extend(docs)
+    return schema
+
+
+@pytest.mark.parametrize('cls', [Schema, JsonVectorizer])
+@pytest.mark.parametrize('tuple_items', [False, True])
+def test_merge(make_docs, cls, tuple_items, default_vectorizers):
+    # Merging schemas learned from shards is equivalent to learning a
+    # schema from all documents, when documents are merged in order
+    docs = make_docs(300)
+    for i, doc in enumerate(docs[150:]):
+        doc['extra'] = [i, 'x'][:i % 3]
+        del doc['flag']
+
+    expected = extend(cls, docs, tuple_items=tuple_items)
+    schema = extend(cls, docs[:100], tuple_items=tuple_items)
+    for start in [100, 200]:
+        other = extend(cls, docs[start:start + 100], tuple_items=tuple_items)
+        other_dict = to_dict(other)
+        assert schema.merge(other) is schema
+        assert to_dict(other) == other_dict
+
+    assert to_dict(schema) == to_dict(expected)
+    assert 'flag' not in to_dict(schema)['required']
+    if cls is JsonVectorizer:
+        schema.fit(vectorizers=default_vectorizers)
+        expected.fit(vectorizers=default_vectorizers)
+        assert schema.feature_names_ == expected.feature_names_
+        assert (
+            schema.transform(docs, format='csr') !=
+            expected.transform(docs, format='csr')
+        ).nnz == 0
+
+
+def test_merge_errors():
+    with pytest.raises(TypeError):
+        JsonVectorizer().merge(Schema())
+    with pytest.raises(ValueError):
+        Schema().merge(Schema(tuple_items=True))
+    with pytest.raises(ValueError):
+        JsonVectorizer(max_samples=10).merge(JsonVectorizer())
+
+
+def test_merge_samples(make_docs):
+    # Merged samples are bounded, and drawn from both schemas
+    docs = make_docs(400)
+    for i, doc in enumerate(docs):
+        doc['a'] = i
+
+    schema = extend(JsonVectorizer, docs[:100], max_samples=50)
+    schema.merge(extend(JsonVectorizer, docs[100:], max_samples=50))
+    a = to_dict(schema)['properties']['a']
+    assert a['counts'] == {'number': 400}
+    values = a['values']['number']
+    assert len(values) == 50 and len(set(values)) == 50
+    assert any(value < 100 for value in values)
+    assert any(value >= 100 for value in values)
+
+
+@pytest.mark.parametrize('cls', [Schema, JsonVectorizer])
+def test_extend_parallel(tmp_path, make_docs, cls):
+    docs = make_docs(500)
+    expected = to_dict(extend(cls, docs))
+
+    schema = cls()
+    schema.extend_parallel(docs=iter(docs), n_jobs=2, chunk_size=60)
+    assert to_dict(schema) == expected
+
+    filenames = []
+    for i in range(3):
+        filenames.append(str(tmp_path / '{}.json'.format(i)))
+        with open(filenames[-1], 'w') as f:
+            for doc in docs[i * 200:(i + 1) * 200]:
+                f.write(json.dumps(doc) + '\n')
+
+    schema = cls()
+    schema.extend_parallel(files=filenames, n_jobs=2)
+    assert to_dict(schema) == expected
+
+    with pytest.raises(ValueError):
+        cls().extend_parallel(n_jobs=2)
+    with pytest.raises(ValueError):
+        cls().extend_parallel(docs=docs, files=filenames, n_jobs=2)
+    with pytest.raises(ValueError):
+        cls().extend_parallel(docs=docs, n_jobs=0)
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from jsonvectorizer import utils
+from jsonvectorizer.utils import packbits
+
+
+@pytest.mark.parametrize('chunk_bytes', [1, 7, 1 << 20])
+@pytest.mark.parametrize('shape, density', [
+    ((0, 5), 0.1), ((10, 1), 0.5), ((1000, 37), 0.05), ((300, 5000), 0.001),
+    ((5, 16), 1.0)
+])
+def test_packbits_to_csr(monkeypatch, chunk_bytes, shape, density):
+    monkeypatch.setattr(packbits, 'CHUNK_BYTES', chunk_bytes)
+    dense = np.random.RandomState(0).random_sample(shape) < density
+    X = np.packbits(dense, axis=1)
+    assert np.array_equal(utils.unpackbits(X, shape[1]), dense)
+
+    X = utils.packbits_to_csr(X, shape[1])
+    assert X.format == 'csr'
+    assert X.shape == shape
+    assert X.has_canonical_format
+    assert np.array_equal(X.toarray(), dense)
+
+
+def test_packbits_shape():
+    X = np.zeros((3, 2), dtype=np.uint8)
+    for function in [utils.unpackbits, utils.packbits_to_csr]:
+        with pytest.raises(ValueError):
+            function(X, 17)
+        assert function(X, 16).shape == (3, 16)
@@ -0,0 +1,122 @@
+from jsonvectorizer import JsonVectorizer, vectorizers
+
+
+VECTORIZERS = [
+    {
+        'type': 'string',
+        'vectorizer': vectorizers.StringVectorizer,
+        'kwargs': {'min_df': 0.2}
+    }
+]
+
+
+def test_partial_fit_proportional_thresholds():
+    # The string vectorizer can not be fitted to the first batch (only
+    # one unique value), and is fitted to the second batch, where "rare"
+    # appears in 15% of documents, below the threshold of 20%
+    vectorizer = JsonVectorizer()
+    vectorizer.partial_fit([{'s': 'same'}] * 100, vectorizers=VECTORIZERS)
+    assert vectorizer.feature_names_ == []
+
+    docs = []
+    for i in range(100):
+        if i < 15:
+            docs.append({'s': 'common rare u{}'.format(i)})
+        else:
+            docs.append({'s': 'common u{}'.format(i)})
+
+    vectorizer.partial_fit(docs, vectorizers=VECTORIZERS)
+    assert vectorizer.feature_names_ == ['root:s has token "common"']
+
+    # Values collected by extend are also counted
+    vectorizer = JsonVectorizer()
+    vectorizer.partial_fit([{'s': 'same'}] * 100, vectorizers=VECTORIZERS)
+    vectorizer.extend(docs[:50])
+    vectorizer.partial_fit(docs[50:], vectorizers=VECTORIZERS)
+    assert vectorizer.feature_names_ == ['root:s has token "common"']
+
+
+
+APPEND_VECTORIZERS = [
+    {'type': 'boolean', 'vectorizer': vectorizers.BoolVectorizer},
+    {
+        'type': 'number',
+        'vectorizer': vectorizers.NumberVectorizer,
+        'kwargs': {'n_bins': 2}
+    },
+    {
+        'type': 'string',
+        'vectorizer': vectorizers.StringVectorizer,
+        'kwargs': {'max_categories': 4}
+    }
+]
+
+
+def _without_sample_counts(schema):
+    # Recursively drop sample counts, as in schemas saved before they
+    # were recorded
+    schema = dict(schema)
+    schema.pop('sample_counts', None)
+    for key in ['additional_properties', 'property_names']:
+        if key in schema:
+            schema[key] = _without_sample_counts(schema[key])
+    if 'properties' in schema:
+        schema['properties'] = {
+            k: _without_sample_counts(v)
+            for k, v in schema['properties'].items()
+        }
+    if 'items' in schema:
+        schema['items'] = [_without_sample_counts(v) for v in schema['items']]
+
+    return schema
+
+
+def test_partial_fit_appends_features(tmp_path):
+    batch_a = [{'n': float(i), 's': 'x' if i % 2 else 'y'} for i in range(20)]
+    batch_b = [
+        {'n': 'unknown', 's': 'x', 'new': 'pqr'[i % 3]} for i in range(20)
+    ]
+    vectorizer = JsonVectorizer()
+    vectorizer.partial_fit(batch_a, vectorizers=APPEND_VECTORIZERS)
+    old_names = vectorizer.feature_names_
+    n_old = len(old_names)
+    X_old = vectorizer.transform(batch_a, format='csr')
+
+    # A new property, a new data type for an existing property, and new
+    # categories, are all appended after existing features
+    vectorizer.partial_fit(batch_b, vectorizers=APPEND_VECTORIZERS)
+    new_names = vectorizer.feature_names_
+    assert new_names[:n_old] == old_names
+    assert vectorizer.n_features == len(new_names) > n_old
+    assert 'root:n is string' in new_names[n_old:]
+    for category in 'pqr':
+        assert 'root:new = ' + category in new_names[n_old:]
+
+    X = vectorizer.transform(batch_a, format='csr')
+    assert (X[:, :n_old] != X_old).nnz == 0
+    X = vectorizer.transform(batch_b, format='csr')
+    for name in ['root:new = p', 'root:new = q', 'root:n is string']:
+        assert X[:, new_names.index(name)].nnz > 0
+
+    # Columns of partially fitted vectorizers survive serialization
+    vectorizer.save(str(tmp_path / 'vectorizer'))
+    loaded = JsonVectorizer.load(str(tmp_path / 'vectorizer'))
+    assert loaded.feature_names_ == new_names
+    for docs in [batch_a, batch_b]:
+        X = vectorizer.transform(docs, format='csr')
+        assert (loaded.transform(docs, format='csr') != X).nnz == 0
+
+
+def test_fit_old_schema():
+    # Schemas without sample counts (e.g., pickled before they were
+    # recorded) are fitted using all collected values
+    docs = [{'n': float(i), 'b': i % 2 == 0} for i in range(20)]
+    expected = JsonVectorizer()
+    expected.extend(docs)
+    schema = _without_sample_counts(expected.__reduce__()[1][0])
+    assert 'sample_counts' not in schema['properties']['n']
+
+    vectorizer = JsonVectorizer(schema)
+    vectorizer.fit(vectorizers=APPEND_VECTORIZERS)
+    expected.fit(vectorizers=APPEND_VECTORIZERS)
+    assert vectorizer.feature_names_ == expected.feature_names_
@@ -0,0 +1,99 @@
+import pickle
+
+import pytest
+
+from jsonvectorizer import JsonVectorizer, Schema
+
+
+def get_records(schema):
+    # Profiling records by node path
+    return {record['path']: record for record in schema.profile()}
+
+
+def count_docs(docs, key):
+    # Number of documents containing a property
+    return sum(key in doc for doc in docs)
+
+
+@pytest.mark.parametrize('cls', [Schema, JsonVectorizer])
+def test_profile_extend(make_docs, cls):
+    docs = make_docs(100)
+    schema = cls()
+    assert schema.profile() == []
+
+    # Counters are kept for nodes that are added later
+    schema.set_profiling()
+    schema.extend(docs)
+    records = get_records(schema)
+    assert [record['path'] for record in schema.profile()] == sorted(records)
+    assert records['root']['extend_docs'] == 100
+    assert records['root:opt']['extend_docs'] == count_docs(docs, 'opt')
+    assert records['root:arr:any']['extend_docs'] == sum(
+        len(doc['arr']) for doc in docs
+    )
+    assert records['root']['extend_time'] >= records['root:n']['extend_time']
+    assert records['root:n']['extend_time'] >= (
+        records['root:n:c']['extend_time']
+    )
+    assert all(record['extend_time'] > 0 for record in records.values())
+
+    # Enabling profiling again resets counters, and counters are not
+    # pickled
+    schema.set_profiling()
+    assert all(
+        record['extend_docs'] == 0 and record['extend_time'] == 0
+        for record in schema.profile()
+    )
+    assert pickle.loads(pickle.dumps(schema)).profile() == []
+
+    schema.set_profiling(False)
+    schema.extend(docs)
+    assert schema.profile() == []
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_profile_fit_transform(make_docs, n_jobs, default_vectorizers):
+    docs = make_docs(200)
+    vectorizer = JsonVectorizer()
+    vectorizer.set_profiling()
+    vectorizer.extend(docs)
+    records = get_records(vectorizer)
+    assert records['root:a']['values_bytes'] > 0
+    assert records['root:n']['values_bytes'] == 0
+
+    vectorizer.fit(vectorizers=default_vectorizers, n_jobs=n_jobs)
+    records = get_records(vectorizer)
+    for path in ['root:a', 'root:b', 'root:flag', 'root:n:d']:
+        assert records[path]['fit_time'] > 0
+    assert records['root:n']['fit_time'] == 0
+
+    # Nonzero features generated by the vectorizers of each node (not
+    # including those indicating properties and data types, and counting
+    # features of array items repeatedly)
+    X = vectorizer.transform(docs, format='csr')
+    names = vectorizer.feature_names_
+
+    def get_nnz(X, path):
+        columns = [
+            i for i, name in enumerate(names) if name.split(' ')[0] == path
+        ]
+        return X[:, columns].nnz
+
+    records = get_records(vectorizer)
+    assert records['root']['transform_docs'] == 200
+    assert records['root:opt']['transform_docs'] == count_docs(docs, 'opt')
+    assert records['root:a']['transform_time'] > 0
+    for path in ['root:a', 'root:b', 'root:flag', 'root:n:d']:
+        assert records[path]['nnz'] == get_nnz(X, path) > 0
+    assert records['root:arr:any']['nnz'] >= get_nnz(X, 'root:arr:any')
+    assert records['root']['nnz'] == records['root:n:c']['nnz'] == 0
+
+    # Single documents are also counted
+    vectorizer.transform_one(docs[0])
+    X = vectorizer.transform(docs[:1], format='csr')
+    new_records = get_records(vectorizer)
+    assert new_records['root']['transform_docs'] == 202
+    for path in ['root:a', 'root:b', 'root:flag', 'root:n:d']:
+        assert new_records[path]['nnz'] == (
+            records[path]['nnz'] + 2 * get_nnz(X, path)
+        )
@@ -0,0 +1,59 @@
+import re
+
+import pytest
+
+from jsonvectorizer import JsonVectorizer, vectorizers
+
+
+DOC = {'a': 1, 'B': 2, 'b': 3, 'ab': 4, 'n': {'a': 5}}
+
+PATTERNS = [
+    # Alternations and anchors within single patterns
+    ['^root:a$|^root:n', 'b$'],
+    ['^root:(?:a|b)$', ':n:'],
+    # Global flags, applying to one pattern only
+    ['(?i)^ROOT:A$', '^root:b$'],
+    ['^root:b$', '(?i)^ROOT:N'],
+    ['(?x) ^root:b  # verbose, with a comment', 'a$'],
+    ['(?s)^root:a$', '(?m)^root:n$', ':b$'],
+    # Scoped flags and capturing groups
+    ['(?i:^ROOT:A)', '^root:b$'],
+    ['^root:(a)', '(?P<key>b)$'],
+    # Single patterns
+    ['(?i)^root:b$'],
+    [],
+]
+
+
+def paths(doc):
+    # Paths of all nodes in a document
+    schema = JsonVectorizer()
+    schema.extend([doc])
+    return [':'.join(path) for path in schema.find_nodes(['.*'])]
+
+
+@pytest.mark.parametrize('patterns', PATTERNS)
+def test_find_nodes(patterns):
+    schema = JsonVectorizer()
+    schema.extend([DOC])
+    expected = [
+        path for path in paths(DOC)
+        if any(re.search(pattern, path) for pattern in patterns)
+    ]
+    found = [':'.join(path) for path in schema.find_nodes(patterns)]
+    assert found == expected
+
+
+def test_ignore_patterns():
+    # Case-insensitive matching does not leak into other patterns
+    docs = [
+        {'a': i % 2 == 0, 'A': i % 3 == 0, 'b': i % 5 == 0, 'B': i % 7 == 0}
+        for i in range(20)
+    ]
+    vectorizer = JsonVectorizer()
+    vectorizer.fit(
+        docs,
+        vectorizers=[{'vectorizer': vectorizers.BoolVectorizer}],
+        ignore_patterns=['^root:B$', '(?i)^ROOT:A$']
+    )
+    assert vectorizer.feature_names_ == ['root:b = True']
@@ -0,0 +1,39 @@
+import random
+
+from jsonvectorizer import JsonVectorizer, vectorizers
+
+
+VECTORIZERS = [
+    {
+        'type': 'number',
+        'vectorizer': vectorizers.NumberVectorizer,
+        'kwargs': {'n_bins': 4}
+    }
+]
+
+
+def merge_after_fit():
+    # Merge a sample into a node that was fitted and then
+    # extended again, and return the merged sample
+    vectorizer = JsonVectorizer(max_samples=50)
+    vectorizer.fit([float(i) for i in range(1000)], vectorizers=VECTORIZERS)
+    vectorizer.extend([float(i) for i in range(500)])
+    other = JsonVectorizer(max_samples=50)
+    other.extend([float(i) for i in range(1000, 1500)])
+    vectorizer.merge(other)
+    values, = vectorizer.values.values()
+    return values
+
+
+def test_merge_samples_after_fit():
+    for _ in range(20):
+        values = merge_after_fit()
+        assert len(values) == 50
+        assert len(set(values)) == 50
+
+
+def test_merge_samples_seed():
+    random.seed(0)
+    values = merge_after_fit()
+    random.seed(0)
+    assert merge_after_fit() == values
@@ -0,0 +1,190 @@
+import os
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from jsonvectorizer import JsonVectorizer, vectorizers
+
+
+VECTORIZERS = [
+    {'type': 'boolean', 'vectorizer': vectorizers.BoolVectorizer},
+    {
+        'type': 'number',
+        'vectorizer': vectorizers.NumberVectorizer,
+        'kwargs': {'n_bins': 4}
+    }
+]
+
+LOAD_SCRIPT = """
+import sys
+
+import numpy as np
+import pytest
+from jsonvectorizer import JsonVectorizer
+vectorizer = JsonVectorizer.load(sys.argv[1])
+print(vectorizer.feature_names_ is not None)
+print('sklearn' in sys.modules)
+"""
+
+
+def test_load_without_sklearn(tmp_path, make_docs):
+    docs = make_docs(200)
+    vectorizer = JsonVectorizer(frequency_sketch={'max_categories': 10})
+    vectorizer.extend(docs)
+    vectorizer.fit(vectorizers=VECTORIZERS)
+    vectorizer.save(str(tmp_path / 'vectorizer'))
+
+    # Load in a fresh interpreter, since fitting may have imported sklearn
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [root] + [p for p in [env.get('PYTHONPATH')] if p]
+    )
+    output = subprocess.check_output(
+        [sys.executable, '-c', LOAD_SCRIPT, str(tmp_path / 'vectorizer')],
+        env=env, universal_newlines=True
+    )
+    assert output.split() == ['True', 'False']
+
+    loaded = JsonVectorizer.load(str(tmp_path / 'vectorizer'))
+    assert loaded.feature_names_ == vectorizer.feature_names_
+    assert (
+        loaded.transform(docs).toarray()
+        == vectorizer.transform(docs).toarray()
+    ).all()
+
+
+def make_string_docs(make_docs, n):
+    # Documents with categorical strings, free text, timestamps (some
+    # invalid), and hashed text
+    docs = make_docs(n)
+    for i, doc in enumerate(docs):
+        doc['text'] = 'word{} and Word{} {}'.format(i % 13, i % 7, doc['b'])
+        doc['time'] = '2020-01-{:02d}T10:00:00'.format(i % 28 + 1)
+        if i % 10 == 0:
+            doc['time'] = 'not a time'
+        doc['hashed'] = 'token{} token{}'.format(i % 5, i % 11)
+
+    return docs
+
+
+STRING_VECTORIZERS = [
+    {
+        'type': 'string',
+        'pattern': '^root:hashed$',
+        'vectorizer': vectorizers.StringVectorizer,
+        'kwargs': {'hashing': True, 'n_features': 64}
+    },
+    {
+        'type': 'string',
+        'pattern': '^root:text$',
+        'vectorizer': vectorizers.StringVectorizer,
+        'kwargs': {'ngram_range': (1, 2), 'min_df': 2}
+    },
+    {
+        'type': 'timestamp',
+        'vectorizer': vectorizers.TimestampVectorizer,
+        'kwargs': {'n_bins': 4}
+    },
+    {
+        'type': 'string',
+        'vectorizer': vectorizers.StringVectorizer,
+        'kwargs': {'max_categories': 10}
+    }
+] + VECTORIZERS
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_save_load(tmp_path, make_docs, mmap):
+    docs = make_string_docs(make_docs, 300)
+    vectorizer = JsonVectorizer()
+    vectorizer.fit(docs, vectorizers=STRING_VECTORIZERS)
+    vectorizer.save(str(tmp_path / 'vectorizer'))
+    loaded = JsonVectorizer.load(str(tmp_path / 'vectorizer'), mmap=mmap)
+    assert loaded.feature_names_ == vectorizer.feature_names_
+
+    # Unseen values, including strings that are longer than all tokens
+    # and categories
+    new_docs = make_string_docs(make_docs, 50) + [
+        {'b': 'X', 'text': 'WORD1 unseen ' + 'x' * 100, 'time': 'never'},
+        {'b': 'x' * 100, 'hashed': '', 'time': '2019-12-31'}
+    ]
+    for docs_ in [docs, new_docs]:
+        X = vectorizer.transform(docs_, format='csr')
+        assert (loaded.transform(docs_, format='csr') != X).nnz == 0
+        for i, doc in enumerate(docs_):
+            assert np.array_equal(
+                loaded.transform_one(doc), np.sort(X[i].indices)
+            )
+
+
+def test_load_mmap(tmp_path, make_docs):
+    # Lookup tables of categories and tokens remain memory-mapped
+    docs = make_string_docs(make_docs, 300)
+    vectorizer = JsonVectorizer()
+    vectorizer.fit(docs, vectorizers=STRING_VECTORIZERS)
+    vectorizer.save(str(tmp_path / 'vectorizer'))
+    loaded = JsonVectorizer.load(str(tmp_path / 'vectorizer'))
+    schema = loaded.__reduce__()[1][0]
+    kinds = set()
+    for name in ['b', 'text']:
+        frozen = schema['properties'][name]['vectorizers']['string']
+        kinds.add(type(frozen).__name__)
+        for array in [frozen.keys, frozen.indices]:
+            assert isinstance(array.base, np.memmap)
+            assert not array.flags.writeable
+
+    assert kinds == {'FrozenCategoryVectorizer', 'FrozenTokenVectorizer'}
+    frozen = schema['properties']['hashed']['vectorizers']['string']
+    assert type(frozen).__name__ == 'FrozenHashingVectorizer'
+
+
+def test_key_widths(tmp_path, make_docs):
+    # A long token only widens the table of its own vectorizer
+    docs = make_string_docs(make_docs, 300)
+    for doc in docs[:5]:
+        doc['text'] += ' ' + 'w' * 500
+    vectorizer = JsonVectorizer()
+    vectorizer.fit(docs, vectorizers=STRING_VECTORIZERS)
+    vectorizer.save(str(tmp_path / 'vectorizer'))
+    loaded = JsonVectorizer.load(str(tmp_path / 'vectorizer'))
+    schema = loaded.__reduce__()[1][0]
+    categories = schema['properties']['b']['vectorizers']['string']
+    tokens = schema['properties']['text']['vectorizers']['string']
+    assert categories.keys.dtype.itemsize == len('hello world')
+    assert tokens.keys.dtype.itemsize >= 500
+    assert os.path.getsize(str(tmp_path / 'vectorizer' / 'keys.npy')) < (
+        tokens.keys.nbytes + 1000
+    )
+
+    X = vectorizer.transform(docs, format='csr')
+    assert (loaded.transform(docs, format='csr') != X).nnz == 0
+
+
+def test_load_frozen(tmp_path, make_docs):
+    docs = make_docs(100)
+    vectorizer = JsonVectorizer()
+    vectorizer.fit(docs, vectorizers=VECTORIZERS)
+    vectorizer.save(str(tmp_path / 'vectorizer'))
+    loaded = JsonVectorizer.load(str(tmp_path / 'vectorizer'))
+    with pytest.raises(ValueError):
+        loaded.extend(docs)
+    with pytest.raises(ValueError):
+        loaded.fit(docs, vectorizers=VECTORIZERS)
+    with pytest.raises(ValueError):
+        loaded.partial_fit(docs, vectorizers=VECTORIZERS)
+    with pytest.raises(ValueError):
+        JsonVectorizer().merge(loaded)
+
+    # Still frozen after pickling, and saving again
+    loaded = pickle.loads(pickle.dumps(loaded))
+    with pytest.raises(ValueError):
+        loaded.fit(vectorizers=VECTORIZERS)
+    loaded.save(str(tmp_path / 'copy'))
+    copy = JsonVectorizer.load(str(tmp_path / 'copy'))
+    assert copy.feature_names_ == vectorizer.feature_names_
+    with pytest.raises(ValueError):
+        copy.extend(docs)
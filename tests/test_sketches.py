@@ -0,0 +1,204 @@
+import pickle
+import random
+
+import numpy as np
+
+from jsonvectorizer.sketches import FrequencySketch, QuantileSketch
+from jsonvectorizer.vectorizers import StringVectorizer
+
+
+def make_numbers(n, seed=0):
+    rng = random.Random(seed)
+    return [rng.gauss(0, 1) for _ in range(n)]
+
+
+def make_strings(n, n_words=50, seed=0):
+    # Strings of words with skewed frequencies
+    rng = random.Random(seed)
+    words = ['w{}'.format(i) for i in range(n_words)]
+    weights = [1.0 / (i + 1) for i in range(n_words)]
+    return [
+        ' '.join(rng.choices(words, weights, k=rng.randint(1, 4)))
+        for _ in range(n)
+    ]
+
+
+def make_frequency_sketch(values, **kwargs):
+    sketch = FrequencySketch(**kwargs)
+    for value in values:
+        sketch.update(value)
+
+    return sketch
+
+
+def document_frequencies(values):
+    counts = {}
+    for value in values:
+        for token in set(value.split()):
+            counts[token] = counts.get(token, 0) + 1
+
+    return counts
+
+
+def max_rank_error(sketch, values):
+    # Maximum error of estimated ranks, relative to the number of values
+    values = np.sort(values)
+    ranks = np.searchsorted(values, values, side='left')
+    return np.abs(sketch.rank(values) - ranks).max() / float(len(values))
+
+
+def test_quantile_sketch_exact():
+    values = make_numbers(100)
+    sketch = QuantileSketch(k=200)
+    for value in values:
+        sketch.update(value)
+
+    assert sketch.is_exact()
+    assert len(sketch) == 100
+    qs = np.linspace(0, 1, 11)
+    assert np.array_equal(
+        sketch.quantiles(qs), np.percentile(values, qs * 100, method='higher')
+    )
+
+
+def test_quantile_sketch_rank_error():
+    values = make_numbers(100000)
+    sketch = QuantileSketch(k=200)
+    for value in values:
+        sketch.update(value)
+
+    assert not sketch.is_exact()
+    assert len(sketch) == 100000
+    assert sketch._size < 1000
+    assert max_rank_error(sketch, values) < 0.02
+
+
+def test_quantile_sketch_merge():
+    values = make_numbers(20000, seed=1)
+    sketches = [QuantileSketch(k=200) for _ in range(4)]
+    for i, value in enumerate(values):
+        sketches[i % 4].update(value)
+
+    sketch = sketches[0]
+    for other in sketches[1:]:
+        n_other = len(other)
+        sketch.merge(other)
+        assert len(other) == n_other
+
+    assert len(sketch) == 20000
+    assert max_rank_error(sketch, values) < 0.02
+
+
+def test_quantile_sketch_pickle():
+    values = make_numbers(5000)
+    sketch = QuantileSketch(k=50)
+    for value in values[:2500]:
+        sketch.update(value)
+
+    # Pickled sketches (including their random number generators)
+    # continue identically to the original
+    loaded = pickle.loads(pickle.dumps(sketch))
+    for value in values[2500:]:
+        sketch.update(value)
+        loaded.update(value)
+
+    assert len(loaded) == 5000
+    for a, b in zip(sketch.values(), loaded.values()):
+        assert np.array_equal(a, b)
+
+
+def test_quantile_sketch_random_state():
+    # Sketches are reproducible, and do not use the random module
+    values = make_numbers(5000)
+    random.seed(0)
+    expected = random.random()
+    sketches = [QuantileSketch(k=50) for _ in range(2)]
+    random.seed(0)
+    for sketch in sketches:
+        for value in values:
+            sketch.update(value)
+
+    assert random.random() == expected
+    for a, b in zip(sketches[0].values(), sketches[1].values()):
+        assert np.array_equal(a, b)
+
+
+def test_frequency_sketch_exact():
+    values = make_strings(1000)
+    sketch = make_frequency_sketch(values, max_categories=10)
+    assert len(sketch) == 1000
+    assert sketch.categories() is None
+    assert sketch.token_counts() == document_frequencies(values)
+
+    values = ['A', 'b', 'a', 'c', 'B', 'a']
+    sketch = make_frequency_sketch(values, max_categories=3)
+    assert sketch.categories() == {'a': 3, 'b': 2, 'c': 1}
+
+
+def test_frequency_sketch_pruning():
+    # Misra-Gries counters underestimate document frequencies by at
+    # most m / (max_tokens + 1) for m counted tokens, so frequent
+    # tokens are retained
+    values = make_strings(5000, n_words=500)
+    max_tokens = 20
+    sketch = make_frequency_sketch(values, max_tokens=max_tokens)
+    counts = sketch.token_counts()
+    expected = document_frequencies(values)
+    error = sum(expected.values()) / (max_tokens + 1.0)
+    assert len(counts) <= max_tokens
+    for token, count in expected.items():
+        assert counts.get(token, 0) <= count
+        assert counts.get(token, 0) >= count - error
+        if count > error:
+            assert token in counts
+
+
+def test_frequency_sketch_merge():
+    values = make_strings(2000)
+    sketch = make_frequency_sketch(values[:1000], max_categories=2000)
+    other = make_frequency_sketch(values[1000:], max_categories=2000)
+    other_tokens = other.token_counts()
+    sketch.merge(other)
+    assert other.token_counts() == other_tokens
+    assert len(sketch) == 2000
+
+    expected = make_frequency_sketch(values, max_categories=2000)
+    assert sketch.categories() == expected.categories()
+    assert sketch.token_counts() == expected.token_counts()
+
+    # Categories overflow if either sketch overflows, or if combined
+    # strings exceed the limit
+    small = make_frequency_sketch(['a', 'b'], max_categories=3)
+    small.merge(make_frequency_sketch(['c', 'd'], max_categories=3))
+    assert small.categories() is None
+
+    # Merged counters are pruned with the same error bound
+    values = make_strings(4000, n_words=500, seed=1)
+    sketches = [
+        make_frequency_sketch(values[i::4], max_tokens=20) for i in range(4)
+    ]
+    for other in sketches[1:]:
+        sketches[0].merge(other)
+    counts = sketches[0].token_counts()
+    expected = document_frequencies(values)
+    error = sum(expected.values()) / 21.0
+    assert len(counts) <= 20
+    for token, count in expected.items():
+        assert count - error <= counts.get(token, 0) <= count
+
+
+def test_string_vectorizer_sketch():
+    # Fitting on a sketch within capacity selects the same categories
+    # and tokens as fitting on all values
+    for kwargs, values in [
+        ({'max_categories': 10}, ['Foo', 'bar', 'baz', 'foo', 'bar'] * 20),
+        ({'min_df': 5}, make_strings(1000, n_words=200)),
+        ({'min_df': 0.01, 'max_df': 0.5}, make_strings(1000, n_words=200))
+    ]:
+        expected = StringVectorizer(**kwargs).fit(values)
+        sketch = make_frequency_sketch(values, max_categories=10)
+        vectorizer = StringVectorizer(**kwargs).fit(sketch)
+        assert vectorizer.feature_names_ == expected.feature_names_
+        assert (
+            vectorizer.transform(values) != expected.transform(values)
+        ).nnz == 0
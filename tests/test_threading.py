@@ -0,0 +1,76 @@
+import threading
+
+from jsonvectorizer import JsonVectorizer
+
+
+def run_threads(transform, batches, n_threads=6, n_rounds=5):
+    # Transform batches concurrently, and return results and errors
+    results = {}
+    errors = []
+
+    def worker(i):
+        try:
+            for _ in range(n_rounds):
+                results.setdefault(i, []).append(transform(batches[i]))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=worker, args=(i,)) for i in range(n_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results, errors
+
+
+def check_concurrent(transform, docs, n_threads=6, batch_size=400):
+    batches = [
+        docs[i * batch_size:(i + 1) * batch_size] for i in range(n_threads)
+    ]
+    expected = [transform(batch) for batch in batches]
+    results, errors = run_threads(transform, batches, n_threads=n_threads)
+    assert not errors
+    for i, Xs in results.items():
+        for X in Xs:
+            assert X.shape == expected[i].shape
+            assert (X != expected[i]).nnz == 0
+
+
+def test_transform_threads(make_docs, default_vectorizers):
+    docs = make_docs(2400)
+    vectorizer = JsonVectorizer(transform_cache_size=8)
+    vectorizer.fit(docs, vectorizers=default_vectorizers)
+    check_concurrent(
+        lambda batch: vectorizer.transform(batch, format='csr'), docs
+    )
+
+
+def test_transform_threads_uncompiled(make_docs, default_vectorizers):
+    # Plans and offsets are compiled lazily by the first threads
+    docs = make_docs(2400)
+    vectorizer = JsonVectorizer()
+    vectorizer.fit(docs, vectorizers=default_vectorizers)
+    expected = vectorizer.transform(docs[:400], format='csr')
+    vectorizer.fit(docs, vectorizers=default_vectorizers)
+    results, errors = run_threads(
+        lambda batch: vectorizer.transform(batch, format='csr'),
+        [docs[:400]] * 6, n_rounds=1
+    )
+    assert not errors
+    for Xs in results.values():
+        assert (Xs[0] != expected).nnz == 0
+
+
+def test_feature_selection_threads(make_docs, default_vectorizers):
+    docs = make_docs(2400)
+    vectorizer = JsonVectorizer()
+    vectorizer.fit(docs, vectorizers=default_vectorizers)
+    selection = vectorizer.select_features(
+        range(0, vectorizer.n_features, 2)
+    )
+    check_concurrent(
+        lambda batch: selection.transform(batch, format='csr'), docs
+    )
@@ -0,0 +1,106 @@
+import datetime
+
+import dateutil.parser
+import numpy as np
+import pytest
+import pytz
+
+from jsonvectorizer import Schema
+from jsonvectorizer.utils._timestamps import (
+    EPOCH, parse_timestamp, parse_timestamps
+)
+
+
+TIMESTAMPS = [
+    # Canonical and other ISO 8601 layouts
+    '2017-01-01T00:00:00Z', '2017-12-31T23:59:59Z', '2016-02-29T12:30:00Z',
+    '2017-01-01T00:00:00z', '2017-01-01T00:00:00', '2017-01-01 00:00:00',
+    '2017-01-01T10:20Z', '2017-1-1T0:0:0Z', '1970-01-01T00:00:00Z',
+    '1900-06-15T08:00:00Z', '9999-12-31T23:59:59Z',
+    # Fractional seconds
+    '2017-01-01T00:00:00.5Z', '2017-01-01T00:00:00.123456Z',
+    '2017-01-01T00:00:00.000001', '2017-01-01T00:00:00.1234567Z',
+    # Time zone offsets
+    '2017-01-01T00:00:00+00:00', '2017-01-01T10:00:00+02:00',
+    '2017-01-01T10:00:00-05:30', '2017-01-01T10:00:00.25+0100',
+    '2017-01-01 10:00:00 UTC',
+    # Dates only
+    '2017-01-01', '2016-02-29', '1999-12-31',
+    # Other formats parsed by dateutil
+    'Jan 5 2017 10:00', '2017/01/05', '20170105T101500',
+    # Invalid dates and times
+    '2017-02-30T00:00:00Z', '2017-13-01T00:00:00Z', '2017-01-01T24:00:00Z',
+    '2017-01-01T23:59:60Z', '2017-02-29', '0000-01-01T00:00:00Z',
+    # Not timestamps
+    '', ' ', 'hello world', 'Z', '2017', '2017-', 'abcd-ef-ghTij:kl:mnZ',
+    '2017-01-01T00:00:00ZZ', '2017-01-01T00:00:00Zjunk', 'not a 2017-01-01',
+    '12345678901234567890Z', '2017-01-01T00:00:00+25:00'
+]
+
+
+def parse_dateutil(value):
+    # Reference unix timestamp (naive times are regarded as UTC), or
+    # None if dateutil cannot parse the value
+    try:
+        timestamp = dateutil.parser.parse(value)
+        if timestamp.tzinfo is None:
+            timestamp = pytz.utc.localize(timestamp)
+        return (timestamp - EPOCH).total_seconds()
+    except (ValueError, OverflowError):
+        # Including offsets of 24 hours or more
+        return None
+
+
+def detected_type(value, type_cache_size=0):
+    schema = Schema(type_cache_size=type_cache_size)
+    schema.extend([value, value])
+    return schema.__reduce__()[1][0]['type']
+
+
+@pytest.mark.parametrize('value', TIMESTAMPS)
+def test_parse_timestamp(value):
+    expected = parse_dateutil(value)
+    if expected is None:
+        with pytest.raises((ValueError, OverflowError)):
+            parse_timestamp(value)
+    else:
+        assert parse_timestamp(value) == pytest.approx(expected, abs=1e-6)
+
+
+def test_parse_timestamps():
+    timestamps, valid = parse_timestamps(TIMESTAMPS)
+    expected = [parse_dateutil(value) for value in TIMESTAMPS]
+    assert valid.tolist() == [value is not None for value in expected]
+    assert np.allclose(
+        timestamps[valid], [value for value in expected if value is not None],
+        rtol=0, atol=1e-6
+    )
+
+    # Batches of valid ISO timestamps are converted at once
+    values = [value for value in TIMESTAMPS[:15] if parse_dateutil(value)]
+    timestamps, valid = parse_timestamps(values)
+    assert valid.all()
+    assert np.allclose(
+        timestamps, [parse_dateutil(value) for value in values],
+        rtol=0, atol=1e-6
+    )
+
+
+@pytest.mark.parametrize('type_cache_size', [0, 16])
+@pytest.mark.parametrize('value', TIMESTAMPS)
+def test_is_timestamp(value, type_cache_size):
+    # Strings are regarded as timestamps if they match the format
+    # '%Y-%m-%dT%H:%M:%SZ', in which case dateutil parses them to the
+    # same time
+    try:
+        expected = datetime.datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+    except ValueError:
+        expected = None
+
+    json_type = detected_type(value, type_cache_size)
+    if expected is None:
+        assert json_type == ['string']
+    else:
+        assert json_type == ['timestamp']
+        expected = pytz.utc.localize(expected)
+        assert parse_dateutil(value) == (expected - EPOCH).total_seconds()
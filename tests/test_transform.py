@@ -0,0 +1,231 @@
+import pickle
+import re
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from jsonvectorizer import JsonVectorizer, utils
+
+
+def make_mixed_docs(make_docs, n):
+    # Documents with tuples of mixed types, map-like objects, and
+    # documents of other types
+    docs = make_docs(n)
+    for i, doc in enumerate(docs):
+        doc['tuple'] = [i % 3, 'x' if i % 2 else None, [True]][:i % 4]
+        doc['map'] = {'k{}'.format(j): j * 0.5 for j in range(i % 20)}
+        if i % 10 == 0:
+            doc['n'] = 'not an object'
+
+    return docs + [None, 'string', 1.5, []]
+
+
+def to_rows(X, fmt, n_features):
+    # Convert a transformed matrix to sorted column indices of each row
+    if fmt == 'packbits':
+        X = utils.packbits_to_csr(X, n_features)
+    else:
+        assert X.format == fmt
+        X = X.tocsr()
+
+    X.sort_indices()
+    return [X.indices[X.indptr[i]:X.indptr[i + 1]] for i in range(X.shape[0])]
+
+
+@pytest.mark.parametrize('tuple_items', [False, True])
+@pytest.mark.parametrize('fmt', ['csr', 'coo', 'lil', 'packbits'])
+def test_transform_matches_transform_one(
+    make_docs, tuple_items, fmt, default_vectorizers
+):
+    docs = make_mixed_docs(make_docs, 300)
+    vectorizer = JsonVectorizer(tuple_items=tuple_items, max_properties=10)
+    vectorizer.fit(docs, vectorizers=default_vectorizers)
+    names = vectorizer.feature_names_
+    assert any(name.startswith('root:map:<value>') for name in names)
+    item = 'root:tuple:1' if tuple_items else 'root:tuple:any'
+    assert any(name.startswith(item) for name in names)
+
+    X = vectorizer.transform(docs, format=fmt)
+    assert X.shape[0] == len(docs)
+    rows = to_rows(X, fmt, vectorizer.n_features)
+    for doc, cols in zip(docs, rows):
+        assert np.array_equal(cols, vectorizer.transform_one(doc))
+
+
+class LengthVectorizer(object):
+    # Minimal vectorizer that does not inherit from BaseVectorizer, and
+    # only implements fit and transform
+
+    def fit(self, values, **kwargs):
+        self.feature_names_ = ['is short', 'is long']
+        return self
+
+    def transform(self, values):
+        X = np.zeros((len(values), 2), dtype=bool)
+        for i, value in enumerate(values):
+            X[i, int(len(value) > 3)] = True
+
+        return sp.csr_matrix(X)
+
+
+@pytest.mark.parametrize('transform_cache_size', [0, 8])
+def test_transform_without_transform_one(make_docs, transform_cache_size):
+    # Small batches (transformed one document at a time) fall back to
+    # the vectorizer's transform method
+    docs = make_docs(100)
+    vectorizer = JsonVectorizer(transform_cache_size=transform_cache_size)
+    vectorizer.fit(
+        docs, vectorizers=[{'type': 'string', 'vectorizer': LengthVectorizer}]
+    )
+    expected = to_rows(
+        vectorizer.transform(docs, format='csr'), 'csr', vectorizer.n_features
+    )
+    for i in range(0, len(docs), 2):
+        X = vectorizer.transform(docs[i:i + 2], format='csr')
+        rows = to_rows(X, 'csr', vectorizer.n_features)
+        for j, cols in enumerate(rows):
+            assert np.array_equal(cols, expected[i + j])
+            assert np.array_equal(cols, vectorizer.transform_one(docs[i + j]))
+
+
+@pytest.mark.parametrize('fmt', ['csr', 'coo'])
+def test_sparse_formats(make_docs, fmt, default_vectorizers):
+    # CSR and COO matrices are built directly, and are identical to
+    # converted LIL matrices
+    docs = make_mixed_docs(make_docs, 300)
+    vectorizer = JsonVectorizer(max_properties=10)
+    vectorizer.fit(docs, vectorizers=default_vectorizers)
+    expected = vectorizer.transform(docs, format='lil')
+    X = vectorizer.transform(iter(docs), format=fmt)
+    assert X.format == fmt and X.dtype == expected.dtype == bool
+    assert X.shape == expected.shape == (len(docs), vectorizer.n_features)
+    assert X.nnz == expected.nnz > 0
+    assert (X != expected.tocsr()).nnz == 0
+    if fmt == 'csr':
+        assert X.has_canonical_format
+
+    X = vectorizer.transform([], format=fmt)
+    assert X.format == fmt and X.shape == (0, vectorizer.n_features)
+
+    with pytest.raises(ValueError):
+        vectorizer.transform(docs, format='dense')
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+@pytest.mark.parametrize('fmt', ['csr', 'coo', 'lil', 'packbits'])
+def test_chunked_transform(make_docs, n_jobs, fmt, default_vectorizers):
+    # Chunks are transformed (possibly in parallel) and stacked in the
+    # same order as documents
+    docs = make_mixed_docs(make_docs, 300)
+    vectorizer = JsonVectorizer(max_properties=10)
+    vectorizer.fit(docs, vectorizers=default_vectorizers)
+    expected = to_rows(
+        vectorizer.transform(docs, format=fmt), fmt, vectorizer.n_features
+    )
+    for chunk_size in [1, 37, 1000]:
+        X = vectorizer.transform(
+            iter(docs), format=fmt, n_jobs=n_jobs, chunk_size=chunk_size
+        )
+        rows = to_rows(X, fmt, vectorizer.n_features)
+        assert len(rows) == len(expected)
+        assert all(np.array_equal(a, b) for a, b in zip(rows, expected))
+
+    X = vectorizer.transform([], format=fmt, n_jobs=n_jobs)
+    assert X.shape[0] == 0
+
+    for kwargs in [{'n_jobs': 0}, {'chunk_size': 0}]:
+        with pytest.raises(ValueError):
+            vectorizer.transform(docs, **kwargs)
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_transform_iter(make_docs, n_jobs, default_vectorizers):
+    docs = make_mixed_docs(make_docs, 300)
+    vectorizer = JsonVectorizer(max_properties=10)
+    vectorizer.fit(docs, vectorizers=default_vectorizers)
+    expected = vectorizer.transform(docs, format='csr')
+
+    # Documents are consumed lazily
+    consumed = []
+
+    def iter_docs():
+        for doc in docs:
+            consumed.append(doc)
+            yield doc
+
+    Xs = vectorizer.transform_iter(iter_docs(), chunk_size=32, n_jobs=n_jobs)
+    X = next(Xs)
+    assert X.format == 'csr' and X.shape == (32, vectorizer.n_features)
+    assert len(consumed) < len(docs)
+
+    Xs = [X] + list(Xs)
+    assert [X.shape[0] for X in Xs] == [32] * 9 + [len(docs) - 288]
+    for i, X in enumerate(Xs):
+        assert (X != expected[i * 32:(i + 1) * 32]).nnz == 0
+
+    # Arguments are validated without consuming the generator
+    with pytest.raises(ValueError):
+        vectorizer.transform_iter(docs, chunk_size=0)
+    with pytest.raises(ValueError):
+        vectorizer.transform_iter(docs, n_jobs=0)
+    with pytest.raises(ValueError):
+        vectorizer.transform_iter(docs, format='dense')
+
+
+@pytest.mark.parametrize('tuple_items', [False, True])
+@pytest.mark.parametrize('compact', [True, False])
+def test_select_features(make_docs, tuple_items, compact, default_vectorizers):
+    docs = make_mixed_docs(make_docs, 300)
+    vectorizer = JsonVectorizer(tuple_items=tuple_items, max_properties=10)
+    vectorizer.fit(docs, vectorizers=default_vectorizers)
+    names = vectorizer.feature_names_
+    expected = vectorizer.transform(docs, format='csr')
+    last = 'root:tuple:2' if tuple_items else 'root:tuple:any'
+    for features in [
+        [0, 3, len(names) - 1, 3],
+        ['^root:n[: ]', '<value>'],
+        ['^root:b ', 1, '^{}[: ]'.format(last)],
+        ['^root:missing'],
+        range(len(names)),
+    ]:
+        selection = vectorizer.select_features(features, compact=compact)
+        indices = [
+            i for i, name in enumerate(names)
+            if i in features or any(
+                re.search(f, name) for f in features if isinstance(f, str)
+            )
+        ]
+        assert selection.indices.tolist() == indices
+        if compact:
+            assert selection.feature_names_ == [names[i] for i in indices]
+            columns = expected[:, indices]
+        else:
+            assert selection.feature_names_ == names
+            columns = expected.multiply(
+                np.isin(np.arange(len(names)), indices)
+            ).tocsr()
+            columns.eliminate_zeros()
+
+        assert selection.n_features == columns.shape[1]
+        expected_rows = to_rows(columns, 'csr', selection.n_features)
+        for fmt in ['csr', 'coo', 'lil', 'packbits']:
+            rows = to_rows(
+                selection.transform(docs, format=fmt), fmt,
+                selection.n_features
+            )
+            assert len(rows) == len(expected_rows)
+            assert all(
+                np.array_equal(a, b) for a, b in zip(rows, expected_rows)
+            )
+
+        loaded = pickle.loads(pickle.dumps(selection))
+        assert loaded.indices.tolist() == indices
+        for i, doc in enumerate(docs[:20]):
+            cols = selection.transform_one(doc)
+            assert np.array_equal(cols, np.sort(columns[i].indices))
+            assert np.array_equal(loaded.transform_one(doc), cols)
+
+    for features in [[-1], [len(names)]]:
+        with pytest.raises(IndexError):
+            vectorizer.select_features(features)
@@ -0,0 +1,105 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from jsonvectorizer import JsonVectorizer, Schema, vectorizers
+
+
+VALUES = [
+    (None, ['null']),
+    (True, ['boolean']),
+    (0, ['number']),
+    (1.5, ['number']),
+    ('text', ['string']),
+    ('2020-01-01T00:00:00Z', ['timestamp']),
+    ('2020-13-01T00:00:00Z', ['string']),
+    ({}, ['object']),
+    ([], ['array']),
+]
+
+VECTORIZERS = [
+    {
+        'type': 'timestamp',
+        'vectorizer': vectorizers.TimestampVectorizer,
+        'kwargs': {'n_bins': 4}
+    },
+    {'type': 'string', 'vectorizer': vectorizers.StringVectorizer}
+]
+
+
+def get_types(schema):
+    # Types of the properties of a schema
+    schema = schema.__reduce__()[1][0]
+    return {
+        name: set(schema['properties'][name]['type'])
+        for name in schema['properties']
+    }
+
+
+def make_time_docs(n, start=0):
+    # Documents with repeated timestamps, and strings that are partly
+    # timestamp-like (with some invalid dates)
+    docs = []
+    for i in range(start, start + n):
+        docs.append({
+            't': '2020-01-{:02d}T10:00:00Z'.format(i % 28 + 1),
+            's': ['abc', '2020-01-{:02d}T10:00:00Z'.format(i % 35 + 1)][i % 2]
+        })
+
+    return docs
+
+
+@pytest.mark.parametrize('type_cache_size', [0, 1, 100])
+def test_detect_types(type_cache_size):
+    doc = {str(i): value for i, (value, _) in enumerate(VALUES)}
+    schema = Schema(type_cache_size=type_cache_size)
+    schema.extend([doc, doc])
+    assert get_types(schema) == {
+        str(i): set(types) for i, (_, types) in enumerate(VALUES)
+    }
+
+    # Mixed types in a single node
+    schema = Schema(type_cache_size=type_cache_size)
+    schema.extend([{'a': value} for value, _ in VALUES] * 2)
+    assert get_types(schema) == {
+        'a': set(t for _, types in VALUES for t in types)
+    }
+
+    with pytest.raises(TypeError):
+        Schema(type_cache_size=type_cache_size).extend([{'a': {1, 2}}])
+
+
+@pytest.mark.parametrize('type_cache_size', [1, 16, 1000])
+def test_type_cache(type_cache_size):
+    # Memoized types do not change the schema or the feature matrix,
+    # including after the cache is full
+    docs = make_time_docs(200)
+    expected = JsonVectorizer()
+    expected.fit(docs, vectorizers=VECTORIZERS)
+    vectorizer = JsonVectorizer(type_cache_size=type_cache_size)
+    vectorizer.fit(docs, vectorizers=VECTORIZERS)
+    assert get_types(vectorizer) == get_types(expected) == {
+        's': {'timestamp', 'string'}, 't': {'timestamp'}
+    }
+    assert vectorizer.feature_names_ == expected.feature_names_
+
+    new_docs = make_time_docs(100, start=200) + [{'t': 'abc', 's': 1}]
+    for docs_ in [docs, new_docs]:
+        X = vectorizer.transform(docs_, format='csr')
+        assert (X != expected.transform(docs_, format='csr')).nnz == 0
+        for i, doc in enumerate(docs_):
+            assert np.array_equal(
+                vectorizer.transform_one(doc), np.sort(X[i].indices)
+            )
+
+    # The option is passed on to child nodes, and preserved by pickling
+    schema = vectorizer.__reduce__()[1][0]
+    assert schema['type_cache_size'] == type_cache_size
+    assert all(
+        child['type_cache_size'] == type_cache_size
+        for child in schema['properties'].values()
+    )
+    loaded = pickle.loads(pickle.dumps(vectorizer))
+    X = loaded.transform(new_docs, format='csr')
+    assert (X != expected.transform(new_docs, format='csr')).nnz == 0
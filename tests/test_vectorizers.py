@@ -0,0 +1,56 @@
+import pickle
+
+import pytest
+
+from jsonvectorizer import vectorizers
+
+
+def test_string_vectorizer_pickle_keeps_caches():
+    # Pickling must not drop cached lookup objects of the original
+    for kwargs, values in [
+        ({'max_categories': 10}, ['a', 'b', 'c']),
+        ({}, ['foo bar', 'bar baz', 'baz qux'])
+    ]:
+        vectorizer = vectorizers.StringVectorizer(**kwargs).fit(values)
+        indices = [vectorizer.transform_one(value) for value in values]
+        state = dict(vectorizer.__dict__)
+        loaded = pickle.loads(pickle.dumps(vectorizer))
+        assert vectorizer.__dict__.keys() == state.keys()
+        assert [loaded.transform_one(value) for value in values] == indices
+        assert [vectorizer.transform_one(value) for value in values] == indices
+
+
+def test_string_vectorizer_hashing():
+    values = ['foo bar', 'bar baz', 'baz qux', 'Foo', 'qux quux']
+    vectorizer = vectorizers.StringVectorizer(hashing=True, n_features=64)
+    assert vectorizer.fit(values) is vectorizer
+    assert len(vectorizer.feature_names_) == 64
+    assert vectorizer.feature_names_[3] == 'has token with hash 3'
+    assert not hasattr(vectorizer._vectorizer, 'vocabulary_')
+
+    # Tokens are hashed to the same columns regardless of the values
+    # used for fitting, including tokens that were not seen
+    other = vectorizers.StringVectorizer(hashing=True, n_features=64)
+    other.fit(['unrelated words', 'and more'])
+    new_values = values + ['unseen tokens', 'FOO BAR', '']
+    X = vectorizer.transform(new_values)
+    assert X.shape == (len(new_values), 64) and X.dtype == bool
+    assert (X != other.transform(new_values)).nnz == 0
+    for i, value in enumerate(new_values):
+        indices = vectorizer.transform_one(value)
+        assert indices == sorted(X[i].indices.tolist())
+        assert len(indices) == len(set(value.lower().split()))
+    assert X[0].nnz == 2 and (X[0] != X[6]).nnz == 0
+
+    loaded = pickle.loads(pickle.dumps(vectorizer))
+    assert (loaded.transform(new_values) != X).nnz == 0
+
+    # Categories are still used for few unique values
+    vectorizer = vectorizers.StringVectorizer(
+        max_categories=3, hashing=True, n_features=64
+    )
+    vectorizer.fit(['a', 'b', 'c', 'a'])
+    assert vectorizer.feature_names_ == ['= a', '= b', '= c']
+
+    with pytest.raises(ValueError):
+        vectorizers.StringVectorizer(hashing=True, n_features=0)